@@ -2,7 +2,6 @@ import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from flask_session import Session
 from flask_talisman import Talisman
 from flask_login import LoginManager
 
@@ -13,25 +12,45 @@ load_dotenv()
 # Initialize extensions
 db = SQLAlchemy()
 # Main application function
-def create_app():
+def create_app(test_config=None):
     # Create Flask app
     app = Flask(__name__)
+    # Stream uploaded files to disk (hashed, size-capped) instead of memory,
+    # and refuse oversized bodies from their Content-Length before reading them
+    from .utils.uploads import UploadRequest, RequestSizeGuard, max_request_bytes
+    app.request_class = UploadRequest
+    app.config['MAX_CONTENT_LENGTH'] = max_request_bytes()
+    app.wsgi_app = RequestSizeGuard(app.wsgi_app, max_request_bytes())
     
     # SQLite Configuration
+    from .configs.config import DATABASE_URL
     basedir = os.path.abspath(os.path.dirname(__file__))
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'app.db')
+    app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL or 'sqlite:///' + os.path.join(basedir, 'app.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
-    # Basic Configuration
-    app.config['SECRET_KEY'] = os.urandom(24)
-    
     # Configure static and template folders
     app.static_folder = os.path.join(os.pardir, 'static')
     app.template_folder = os.path.join(os.pardir, 'templates')
+
+    # Overrides used by tests and benchmarks (temporary DB, plain http, ...)
+    if test_config:
+        app.config.update(test_config)
+
+    # Client address and scheme from the trusted reverse proxies (request.remote_addr is the proxy otherwise)
+    from .configs.config import TRUSTED_PROXY_HOPS
+    proxy_hops = app.config.get('TRUSTED_PROXY_HOPS', TRUSTED_PROXY_HOPS)
+    if proxy_hops:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops, x_proto=proxy_hops)
+
+    # Basic Configuration (the key must be identical across workers, see load_secret_key)
+    if not app.config.get('SECRET_KEY'):
+        from .utils.secret_key import load_secret_key
+        app.config['SECRET_KEY'] = load_secret_key()
     
-    # Session Configuration
-    app.config['SESSION_TYPE'] = 'filesystem'
-    Session(app)
+    # Session Configuration (filesystem / sqlite / cookie, see SESSION_BACKEND)
+    from .utils.sessions import init_session
+    init_session(app)
     
     # CORS Configuration
     CORS(app)
@@ -40,18 +59,27 @@ def create_app():
     Talisman(
         app,
         content_security_policy=None,
-        force_https=True
+        force_https=app.config.get('FORCE_HTTPS', True),
+        session_cookie_secure=app.config.get('FORCE_HTTPS', True)
     )
     
     # Initialize extensions with app
     db.init_app(app)
     
+    # Request ids + queue-based logging, request timing metrics, SQL query audit
+    from .utils import logging_config, metrics, query_audit
+    logging_config.init_app(app)
+    metrics.init_app(app)
+    query_audit.init_app(app)
+
     # Register blueprints
     from .views.routes import routes_bp
     from .api.chat import chat_bp
+    from .api.metrics import metrics_bp
     
     app.register_blueprint(routes_bp)
     app.register_blueprint(chat_bp, url_prefix="/app")
+    app.register_blueprint(metrics_bp)
 
     login_manager = LoginManager()
     login_manager.login_view = 'routes.login'
@@ -59,11 +87,18 @@ def create_app():
     
     @login_manager.user_loader
     def load_user(user_id):
-        # since the user_id is just the primary key of our user table, use it in the query for the user
-        return User.query.get(int(user_id))
+        # since the user_id is just the primary key of our user table, use it in the query for the user;
+        # the identity is cached so most requests skip the DB round trip
+        return user_cache.load(int(user_id), lambda uid: db.session.get(User, uid))
     # Import models AFTER db is initialized
     from .database.models import User
+    from .utils import user_cache as user_cache_module
+    user_cache = user_cache_module.init_app(app, User)
     
+    # Retention: incremental auto-vacuum for new SQLite files, optional in-process archival job
+    from .utils import retention
+    retention.init_app(app)
+
     # Create database tables
     with app.app_context():
         db.create_all()
@@ -1,27 +1,95 @@
 # builtin modules
+import logging
 from datetime import datetime
 # third-party modules
 from flask import (
     Blueprint,
-    jsonify,
+    Response,
+    current_app,
     request,
-    render_template
+    render_template,
+    stream_with_context
     )
 from flask_login import login_required, current_user
 
 from openai import APIError, RateLimitError
 from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.datastructures import FileStorage
 # local modules
 from backend.utils.assistant import assistant
-from backend.utils.file_utils import extract_text_secure 
-from backend.database.models import Conversations, Files
+from backend.utils.file_utils import allowed_file, extract_document
+from backend.database.models import Conversations, Files, FileHash, FileSummary, FileTextStats
 from backend import db
-from backend.utils.helpers import validate_chat_request, validate_file_upload
+from backend.utils.helpers import validate_file_upload
+from backend.api.schemas import (
+    ChatRequest, ChatResponse, ChunkedUploadInit, ChunkedUploadStatus, ExportQuery, InvalidPayload, SimilarFile,
+    SimilarQuery, SimilarResponse, TextStats, UploadForm, UploadResponse, error_response, json_response, parse_args, parse_request
+)
+from backend.utils.metrics import timed
+from backend.utils.disconnect import CLIENT_CLOSED_REQUEST, ClientDisconnected, disconnect_check, record_cancellation
+from backend.utils.deadlines import Deadline, DeadlineExceeded, record_deadline_exceeded
+from backend.utils.rate_limit import UPLOAD_COUNTER, check_quota
+from backend.utils.uploads import REJECTED_UPLOADS, stream_sha256
+from backend.utils.chunked_uploads import UploadSessionError, create_upload, load_upload, sweep_expired
+from backend.utils.summaries import (
+    enqueue_summary, is_broad_question, is_summary_question, mentions_summary, ready_summary
+)
+from backend.utils.semantic_index import enqueue_index, retrieve_context, similar_files
+from backend.utils.near_duplicates import fingerprint_document, original_of, store_fingerprint
+from backend.utils.export import EXPORTS, MIME_TYPES, export_filename, stream_export
+from backend.configs.config import (
+    UPLOAD_QUOTA_COUNT, UPLOAD_QUOTA_WINDOW_SECONDS, PRECOMPUTE_SUMMARIES, SUMMARY_AS_CONTEXT,
+    SEMANTIC_INDEX, SEMANTIC_CONTEXT, SEMANTIC_CONTEXT_MIN_CHARS, CANCEL_ON_DISCONNECT, CHAT_DEADLINE_SECONDS,
+    MAX_PDF_SIZE_MB, CHUNKED_UPLOAD_DIR, UPLOAD_CHUNK_SIZE_KB, CHUNKED_UPLOAD_TTL_SECONDS, NEAR_DUPLICATES
+)
 
 chat_bp = Blueprint('chat', __name__)
+logger = logging.getLogger(__name__)
 
 
 
+@chat_bp.before_request
+def enforce_upload_quota():
+    """
+    Reject uploads from users over their quota before the request body is read.
+    Only the session cookie is needed, so abusive traffic is turned away cheaply.
+    """
+    if request.endpoint not in ('chat.upload_file', 'chat.start_chunked_upload') or not current_user.is_authenticated:
+        return None
+
+    allowed, retry_after = check_quota(
+        UPLOAD_COUNTER, current_user.id, UPLOAD_QUOTA_COUNT, UPLOAD_QUOTA_WINDOW_SECONDS
+    )
+    if allowed:
+        return None
+
+    REJECTED_UPLOADS.inc(reason="quota")
+    response = error_response(
+        f"Upload quota exceeded ({UPLOAD_QUOTA_COUNT} uploads). Please try again later.", 429
+    )
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+@chat_bp.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    """Bodies without a Content-Length are cut off by MAX_CONTENT_LENGTH while being read."""
+    REJECTED_UPLOADS.inc(reason="too_large")
+    return error_response("Request is too large", 413)
+
+
+@chat_bp.errorhandler(InvalidPayload)
+def invalid_payload(e):
+    """Every schema violation gets the same error body."""
+    return error_response(str(e), e.status_code)
+
+
+@chat_bp.errorhandler(UploadSessionError)
+def upload_session_error(e):
+    return error_response(str(e), e.status_code)
+
+
 @chat_bp.route('/dashboard', methods=['GET'])
 @login_required
 def dashboard():
@@ -43,11 +111,14 @@ def dashboard():
         hints='Default conversation start.'
     )
     db.session.add(conversation)
+    # Read the id after flush: after commit it would cost a refresh SELECT
+    db.session.flush()
+    conversation_id = conversation.id
     db.session.commit()
     # Log the conversation creation message
-    print(f"Created default conversation with ID: {conversation.id} for user ID: {current_user.id}")
+    logger.debug("Created default conversation %s for user %s", conversation_id, current_user.id)
     # Render the dashboard template, passing the conversation ID
-    return render_template('dashboard.html', conversation_id=conversation.id)
+    return render_template('dashboard.html', conversation_id=conversation_id)
 
 
 @chat_bp.route('/upload', methods=['POST'])
@@ -59,62 +130,173 @@ def upload_file():
     Returns file_id and conversation_id for use in chat requests.
     """
     if request.method != 'POST':
-        return jsonify({"status": "error", "message": "Method not allowed"}), 405
+        return error_response("Method not allowed", 405)
 
     data = request.files
     files = data.getlist('files')
     if not files or len(files) == 0:
-        return jsonify({"status": "error", "message": "No file part in the request"}), 400
+        return error_response("No file part in the request", 400)
     # check the len of files, if more than 1, return error
     if len(data.getlist('files')) != 1:
-        return jsonify({"status": "error", "message": "Only single file upload is supported at this time."}), 400
-    
-    conversation_id = request.form.get('conversation_id')
-    if not conversation_id or not conversation_id.isdigit():
-        return jsonify({"status": "error", "message": "Missing conversation id"}), 500
+        return error_response("Only single file upload is supported at this time.", 400)
+
+    with timed("validation"):
+        conversation_id = parse_request(UploadForm).conversation_id
     # Get the current conversation
-    conversation = Conversations.query.filter_by(id=int(conversation_id), user=current_user.id).first_or_404()
+    with timed("db_lookup"):
+        conversation = Conversations.query.filter_by(id=conversation_id, user=current_user.id).first_or_404()
 
-    errors, status_codes = validate_file_upload(data)
+    with timed("validation"):
+        errors, status_codes = validate_file_upload(data)
     for error, status_code in zip(errors, status_codes):
-        return jsonify({"status": "error", "message": error}), status_code
+        return error_response(error, status_code)
+
+    # Process the first file (single file upload for now)
+    return save_upload(conversation, files[0])
 
+
+def save_upload(conversation, file):
+    """
+    Extract an uploaded PDF, store it linked to `conversation` and answer with
+    the new file id. Shared by the single-request and the chunked upload.
+    """
+    conversation_id = conversation.id
     try:
-        # Process the first file (single file upload for now)
-        file = files[0]
-        
-        # Extract text from PDF
-        text_content = extract_text_secure(file)
-        print(f"Using existing conversation with ID: {conversation.id} for the uploaded file by user ID: {current_user.id}")
+        # Streamed uploads were hashed on the way in; chunked ones are hashed here
+        sha256 = getattr(file.stream, "sha256", None) or stream_sha256(file.stream)
+        # Extract text from PDF (normalized once here, so every later prompt is smaller)
+        with timed("extraction"):
+            document = extract_document(file)
+        text_content = document.text
+        # A near-duplicate of a document the user already has is linked to it and reuses its summary
+        fingerprint = None
+        if current_app.config.get('NEAR_DUPLICATES', NEAR_DUPLICATES):
+            with timed("near_duplicates"):
+                fingerprint = fingerprint_document(current_user.id, text_content)
+        duplicate_of = fingerprint.duplicate_of if fingerprint else None
         # update the existing conversation data
         conversation.user_message = 'File uploaded'
         conversation.bot_message = 'File received. You can now ask questions about its content.'
         conversation.time_of_message = datetime.now()
-        db.session.commit()
-        
-        # Create file record linked to the conversation
+
+        # Create file record linked to the conversation (same transaction as the update)
         file_record = Files(
-            conversation_id=int(conversation_id),
+            conversation_id=conversation_id,
             file_name=secure_filename(file.filename),
             text_version_of_the_file=text_content
         )
+        file_record.text_stats = FileTextStats(
+            raw_chars=document.raw_chars,
+            normalized_chars=document.chars,
+            raw_tokens=document.raw_tokens,
+            normalized_tokens=document.tokens,
+        )
+        # Recorded for uploads too, so bulk ingestion skips files the user already uploaded
+        file_record.content_hash = FileHash(user=current_user.id, sha256=sha256)
         db.session.add(file_record)
-        db.session.commit()
+        precompute_summary = current_app.config.get('PRECOMPUTE_SUMMARIES', PRECOMPUTE_SUMMARIES) and not duplicate_of
+        if precompute_summary:
+            file_record.summary = FileSummary(status='pending', updated_at=datetime.now())
+        with timed("db_commit"):
+            # ids are read before commit so the (possibly large) row isn't re-SELECTed
+            db.session.flush()
+            file_id = file_record.id
+            if fingerprint is not None:
+                store_fingerprint(current_user.id, file_id, fingerprint)
+            db.session.commit()
+        if precompute_summary:
+            enqueue_summary(current_app._get_current_object(), file_id)
+        if current_app.config.get('SEMANTIC_INDEX', SEMANTIC_INDEX):
+            enqueue_index(current_user.id, file_id, text_content)
         
-        print(f"Created file record with ID: {file_record.id} linked to conversation ID: {conversation.id}")
-        return jsonify({
-            "status": "success",
-            "message": "File uploaded successfully",
-            "file_id": file_record.id
-        }), 200
+        logger.info(
+            "Created file record %s (sha256=%s) linked to conversation %s for user %s",
+            file_id, sha256, conversation_id, current_user.id
+        )
+        return json_response(UploadResponse(
+            file_id=file_id,
+            text_stats=TextStats(
+                raw_chars=document.raw_chars,
+                chars=document.chars,
+                char_reduction=round(document.char_reduction, 4),
+                token_reduction=round(document.token_reduction, 4),
+            ),
+            duplicate_of=duplicate_of,
+            similarity=round(fingerprint.similarity, 4) if duplicate_of else None,
+        ))
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error processing file: {str(e)}")
-        return jsonify({
-            "status": "error",
-            "message": f"Error processing file: {str(e)}"
-        }), 500
+        logger.warning("Error processing file: %s", e)
+        return error_response(f"Error processing file: {str(e)}", 500)
+
+
+@chat_bp.route('/uploads', methods=['POST'])
+@login_required
+def start_chunked_upload():
+    """
+    Open a resumable upload of `size` bytes for `conversation_id`. The file is
+    then sent with PUT /uploads/<upload_id>/chunks/<n> (any order, in parallel,
+    optionally with an X-Chunk-SHA256 header) and finished with
+    POST /uploads/<upload_id>/complete. Counts against the upload quota.
+    """
+    payload = parse_request(ChunkedUploadInit)
+    if not allowed_file(payload.file_name):
+        return error_response(f"[validate_file_upload] File {payload.file_name} is not a PDF", 400)
+    if payload.size > MAX_PDF_SIZE_MB * 1024 * 1024:
+        REJECTED_UPLOADS.inc(reason="too_large")
+        return error_response(f"File is too large (max {MAX_PDF_SIZE_MB}MB)", 413)
+    Conversations.query.filter_by(id=payload.conversation_id, user=current_user.id).first_or_404()
+
+    root = current_app.config.get('CHUNKED_UPLOAD_DIR', CHUNKED_UPLOAD_DIR)
+    sweep_expired(root, current_app.config.get('CHUNKED_UPLOAD_TTL_SECONDS', CHUNKED_UPLOAD_TTL_SECONDS))
+    upload = create_upload(
+        root, current_user.id, payload.conversation_id, payload.file_name, payload.size,
+        current_app.config.get('UPLOAD_CHUNK_SIZE_KB', UPLOAD_CHUNK_SIZE_KB) * 1024
+    )
+    return json_response(upload_status(upload, []), 201)
+
+
+@chat_bp.route('/uploads/<upload_id>', methods=['GET'])
+@login_required
+def chunked_upload_status(upload_id):
+    """Which chunks have arrived, to resume an interrupted upload."""
+    upload = load_upload(current_app.config.get('CHUNKED_UPLOAD_DIR', CHUNKED_UPLOAD_DIR), upload_id, current_user.id)
+    return json_response(upload_status(upload, upload.received()))
+
+
+@chat_bp.route('/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+@login_required
+def upload_chunk(upload_id, index):
+    """Store chunk `index` (the raw request body), verified against X-Chunk-SHA256 when sent."""
+    upload = load_upload(current_app.config.get('CHUNKED_UPLOAD_DIR', CHUNKED_UPLOAD_DIR), upload_id, current_user.id)
+    with timed("upload_chunk"):
+        upload.write_chunk(index, request.stream, request.headers.get('X-Chunk-SHA256'))
+    return json_response(upload_status(upload, upload.received()))
+
+
+@chat_bp.route('/uploads/<upload_id>/complete', methods=['POST'])
+@login_required
+def complete_chunked_upload(upload_id):
+    """
+    Hand a fully received upload to extraction, exactly like a single-request
+    upload. The chunks were written in place, so there is nothing to assemble.
+    """
+    upload = load_upload(current_app.config.get('CHUNKED_UPLOAD_DIR', CHUNKED_UPLOAD_DIR), upload_id, current_user.id)
+    conversation = Conversations.query.filter_by(id=upload.conversation_id, user=current_user.id).first_or_404()
+    upload.claim()
+
+    try:
+        with upload.open() as data:
+            return save_upload(conversation, FileStorage(stream=data, filename=upload.file_name,
+                                                         content_type="application/pdf"))
+    finally:
+        upload.discard()
+
+
+def upload_status(upload, received):
+    return ChunkedUploadStatus(upload_id=upload.upload_id, chunk_size=upload.chunk_size,
+                               chunks=upload.chunks, received=received)
 
 
 @chat_bp.route('/chat', methods=['POST'])
@@ -122,41 +304,62 @@ def upload_file():
 def chat():
     """
     Handle chat messages using file_id from previously uploaded files.
-    Accepts JSON and form-data (multipart/form-data / application/x-www-form-urlencoded).
+    Accepts JSON and form-data (multipart/form-data / application/x-www-form-urlencoded),
+    decoded and validated in one pass by the ChatRequest schema.
     Only returns question and answer in a live chat style.
+    If the client disconnects while the answer is generated, the completion
+    is cancelled and nothing is saved; if it takes longer than
+    CHAT_DEADLINE_SECONDS, the request fails with a 504.
     """
-    print(f"Request received: {request.content_type}")
+    deadline = Deadline(current_app.config.get('CHAT_DEADLINE_SECONDS', CHAT_DEADLINE_SECONDS))
     if request.method != 'POST':
-        return jsonify({"status": "error", "message": "Method not allowed"}), 405
-
-    # Support JSON and form-data
-    if request.is_json:
-        data = request.get_json(silent=True)
-    else:
-        # covers multipart/form-data and application/x-www-form-urlencoded
-        data = request.form.to_dict() if request.form else None
-
-    if not data:
-        return jsonify({"status": "error", "message": "No data provided"}), 400
+        return error_response("Method not allowed", 405)
 
-    errors, status_codes, file_id, conversation_id, question, hints = validate_chat_request(data)
-
-    for error, status_code in zip(errors, status_codes):
-        return jsonify({"status": "error", "message": error}), status_code
+    with timed("validation"):
+        payload = parse_request(ChatRequest)
+    file_id, conversation_id = payload.file_id, payload.conversation_id
+    question, hints = payload.question, payload.hints
+    cancel_check = disconnect_check() if current_app.config.get('CANCEL_ON_DISCONNECT', CANCEL_ON_DISCONNECT) else None
 
     try:
         # Retrieve file from database using file_id
-        file_record = Files.query.filter_by(id=file_id, conversation_id=conversation_id).first()
+        with timed("db_lookup"):
+            file_record = Files.query.filter_by(id=file_id, conversation_id=conversation_id).first()
 
         if not file_record:
-            return jsonify({
-                "status": "error",
-                "message": "File not found or does not belong to this conversation."
-            }), 404
+            return error_response("File not found or does not belong to this conversation.", 404)
+
+        # Requests for the whole summary are answered from the precomputed summary when it's ready;
+        # with SUMMARY_AS_CONTEXT, broad questions and questions about a summary use it as compact
+        # context instead of the whole document
+        summary = None
+        if current_app.config.get('PRECOMPUTE_SUMMARIES', PRECOMPUTE_SUMMARIES):
+            summary_question = is_summary_question(question)
+            summary_context = current_app.config.get('SUMMARY_AS_CONTEXT', SUMMARY_AS_CONTEXT) and (
+                mentions_summary(question) or is_broad_question(question)
+            )
+            if summary_question or summary_context:
+                summary = ready_summary(file_record.id)
+                # Near-duplicates don't get their own summary: use the original's
+                if summary is None and current_app.config.get('NEAR_DUPLICATES', NEAR_DUPLICATES):
+                    original = original_of(file_record.id)
+                    summary = ready_summary(original) if original else None
 
-        # Get file content
-        file_content = file_record.text_version_of_the_file
-        assistant_response = assistant(hints, question, file_content)
+        if summary is not None and summary_question:
+            assistant_response = summary
+        elif summary is not None:
+            assistant_response = assistant(hints, question, summary, cancel_check=cancel_check, deadline=deadline)
+        else:
+            # Get file content
+            file_content = file_record.text_version_of_the_file
+            # Very long documents: send only the passages most relevant to the question
+            if (current_app.config.get('SEMANTIC_CONTEXT', SEMANTIC_CONTEXT)
+                    and len(file_content) >= SEMANTIC_CONTEXT_MIN_CHARS):
+                file_content = retrieve_context(current_user.id, file_record.id, question, file_content) or file_content
+            assistant_response = assistant(hints, question, file_content, cancel_check=cancel_check, deadline=deadline)
+
+        if cancel_check is not None and cancel_check():
+            raise ClientDisconnected("db_write")
 
         # Save conversation to database
         try:
@@ -168,30 +371,85 @@ def chat():
                 hints=hints
             )
             db.session.add(conversation)
-            db.session.commit()
+            with timed("db_commit"):
+                db.session.flush()
+                new_conversation_id = conversation.id
+                db.session.commit()
         except Exception as e:
             db.session.rollback()
-            print(f"Database error: {str(e)}")
-            return jsonify({
-                "status": "error",
-                "message": "Error saving conversation"
-            }), 500
+            logger.error("Database error while saving conversation: %s", e)
+            return error_response("Error saving conversation", 500)
         # Return the answer
-        return jsonify({
-            "status": "success",
-            "assistant_response": assistant_response,
-            "conversation_id": conversation.id
-        }), 200
-    
+        return json_response(ChatResponse(assistant_response=assistant_response, conversation_id=new_conversation_id))
+
+    except ClientDisconnected as e:
+        record_cancellation(e.stage)
+        return error_response("Client closed request", CLIENT_CLOSED_REQUEST)
+    except DeadlineExceeded as e:
+        record_deadline_exceeded(e.stage)
+        return error_response("The assistant took too long to answer. Please try again.", 504)
     except RateLimitError as e:
-        return jsonify({
-            "status": "error", "message": "Rate limit exceeded. Please try again later."
-        }), 429
+        return error_response("Rate limit exceeded. Please try again later.", 429)
     except APIError as e:
-        return jsonify({
-            "status": "error", "message": "Assistant service temporarily unavailable"
-        }), 503
+        return error_response("Assistant service temporarily unavailable", 503)
     except Exception as e:
-        return jsonify({
-            "status": "error", "message": "Error generating response"
-        }), 500
+        return error_response("Error generating response", 500)
+
+
+@chat_bp.route('/files/<int:file_id>/similar', methods=['GET'])
+@login_required
+def similar_candidates(file_id):
+    """
+    Return the current user's documents most similar to `file_id`
+    (top `k`, 1 to 50, default SEMANTIC_TOP_K), by cosine similarity in the semantic index.
+    """
+    if not current_app.config.get('SEMANTIC_INDEX', SEMANTIC_INDEX):
+        return error_response("Semantic index is disabled", 404)
+
+    owned = db.session.execute(
+        db.select(Files.id)
+        .join(Conversations, Files.conversation_id == Conversations.id)
+        .where(Files.id == file_id, Conversations.user == current_user.id)
+    ).scalar_one_or_none()
+    if owned is None:
+        return error_response("File not found", 404)
+
+    k = parse_args(SimilarQuery).k
+    with timed("similarity_search"):
+        matches = similar_files(current_user.id, file_id, k)
+    # Also drops files deleted since they were indexed (e.g. by the retention job)
+    names = dict(db.session.execute(
+        db.select(Files.id, Files.file_name).where(Files.id.in_([match_id for match_id, _ in matches]))
+    ).all())
+    return json_response(SimilarResponse(
+        file_id=file_id,
+        similar=[
+            SimilarFile(file_id=match_id, file_name=names[match_id], score=round(score, 4))
+            for match_id, score in matches if match_id in names
+        ]
+    ))
+
+
+@chat_bp.route('/export/<export>', methods=['GET'])
+@login_required
+def export_history(export):
+    """
+    Stream the current user's conversations or extracted files as CSV or JSON
+    Lines (`format`), optionally limited to a date range (`start`/`end`,
+    inclusive) or one `file_id`, and gzipped on the fly with `gzip=1`.
+    Rows are read and sent in batches, so the export runs in constant memory.
+    """
+    if export not in EXPORTS:
+        return error_response("Unknown export", 404)
+    query = parse_args(ExportQuery)
+    chunks = stream_export(
+        export, query.format, query.gzip,
+        user_id=current_user.id, start=query.start, end=query.end, file_id=query.file_id
+    )
+    response = Response(
+        stream_with_context(chunks),
+        mimetype="application/gzip" if query.gzip else MIME_TYPES[query.format]
+    )
+    response.headers["Content-Disposition"] = \
+        f'attachment; filename="{export_filename(export, query.format, query.gzip)}"'
+    return response
@@ -0,0 +1,40 @@
+# builtin modules
+import hmac
+import ipaddress
+# third-party modules
+from flask import Blueprint, Response, current_app, request
+# local modules
+from backend.utils.metrics import REGISTRY
+from backend.configs.config import METRICS_TOKEN
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def is_local_scrape() -> bool:
+    """A scrape from this host that didn't come through a proxy."""
+    try:
+        loopback = ipaddress.ip_address(request.remote_addr or "").is_loopback
+    except ValueError:
+        return False
+    return loopback and "X-Forwarded-For" not in request.headers
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Expose the counters and histograms (of all workers, see REGISTRY) in the Prometheus text format.
+    Requires METRICS_TOKEN as a bearer token when set; without one only local scrapes are answered.
+    Parameters:
+        None
+    Returns:
+        A text/plain response in Prometheus exposition format version 0.0.4.
+    """
+    token = current_app.config.get('METRICS_TOKEN', METRICS_TOKEN)
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, token):
+            return Response("Unauthorized\n", status=401, mimetype="text/plain")
+    elif not is_local_scrape():
+        return Response("Forbidden: set METRICS_TOKEN to scrape from another host\n", status=403, mimetype="text/plain")
+
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
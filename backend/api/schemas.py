@@ -0,0 +1,171 @@
+"""
+Typed request and response payloads of the JSON API.
+
+Requests are decoded straight into msgspec Structs: parsing, type coercion
+and the length/range checks happen in one pass over the body, and
+__post_init__ runs the security sanitation on the decoded strings. Anything
+that doesn't fit raises InvalidPayload, which the chat blueprint turns into
+the usual {"status": "error", "message": ...} body with a 400.
+
+Responses are Structs too and are encoded by a shared msgspec encoder.
+"""
+from datetime import date
+from typing import Annotated, List, Literal, Optional
+
+import msgspec
+from msgspec import Meta, Struct
+from flask import Response, request
+
+from backend.configs.config import MAX_HINTS_LENGTH, MAX_QUESTION_LENGTH, SEMANTIC_TOP_K
+from backend.utils.helpers import sanitize_text
+
+# Database ids; form fields and the frontend send them as strings, hence strict=False below
+Id = Annotated[int, Meta(gt=0)]
+
+_encoder = msgspec.json.Encoder()
+
+
+class InvalidPayload(ValueError):
+    """A request body or query string that doesn't match its schema."""
+
+    status_code = 400
+
+
+# ---------------------------------------------------------
+# REQUESTS
+# ---------------------------------------------------------
+
+class ChatRequest(Struct):
+    hints: Annotated[str, Meta(min_length=1, max_length=MAX_HINTS_LENGTH)]
+    question: Annotated[str, Meta(min_length=1, max_length=MAX_QUESTION_LENGTH)]
+    file_id: Id
+    conversation_id: Id
+
+    def __post_init__(self):
+        # Lengths are checked on the raw input above, sanitation runs on what passed
+        self.hints = sanitize_text(self.hints, "hints")
+        self.question = sanitize_text(self.question, "question")
+
+
+class UploadForm(Struct):
+    conversation_id: Id
+
+
+class ChunkedUploadInit(Struct):
+    conversation_id: Id
+    file_name: Annotated[str, Meta(min_length=1, max_length=255)]
+    size: Annotated[int, Meta(gt=0)]
+
+
+class SimilarQuery(Struct):
+    k: Annotated[int, Meta(ge=1, le=50)] = min(SEMANTIC_TOP_K, 50)
+
+
+class ExportQuery(Struct):
+    format: Literal["csv", "jsonl"] = "jsonl"
+    start: Optional[date] = None   # first day, inclusive
+    end: Optional[date] = None     # last day, inclusive
+    file_id: Optional[Id] = None
+    gzip: bool = False
+
+
+# ---------------------------------------------------------
+# RESPONSES
+# ---------------------------------------------------------
+
+class ErrorResponse(Struct):
+    message: str
+    status: str = "error"
+
+
+class TextStats(Struct):
+    raw_chars: int
+    chars: int
+    char_reduction: float
+    token_reduction: float
+
+
+class UploadResponse(Struct):
+    file_id: int
+    text_stats: TextStats
+    # Set when the document nearly duplicates one the user uploaded before (NEAR_DUPLICATES)
+    duplicate_of: Optional[int] = None
+    similarity: Optional[float] = None
+    message: str = "File uploaded successfully"
+    status: str = "success"
+
+
+class ChunkedUploadStatus(Struct):
+    upload_id: str
+    chunk_size: int
+    chunks: int
+    received: List[int]
+    status: str = "success"
+
+
+class ChatResponse(Struct):
+    assistant_response: str
+    conversation_id: int
+    status: str = "success"
+
+
+class SimilarFile(Struct):
+    file_id: int
+    file_name: str
+    score: float
+
+
+class SimilarResponse(Struct):
+    file_id: int
+    similar: List[SimilarFile]
+    status: str = "success"
+
+
+# ---------------------------------------------------------
+# DECODING / ENCODING
+# ---------------------------------------------------------
+
+def decode(schema, data, source: Optional[str] = None):
+    """
+    Decode JSON bytes, or convert an already parsed mapping (form fields,
+    query args), into `schema`.
+
+    Raises
+    ------
+    InvalidPayload
+        When the data is malformed or fails validation.
+    """
+    try:
+        if isinstance(data, (bytes, bytearray, memoryview, str)):
+            return msgspec.json.decode(data, type=schema, strict=False)
+        return msgspec.convert(data, schema, strict=False)
+    except msgspec.ValidationError as e:
+        raise InvalidPayload(f"Invalid {source or 'request'}: {e}") from e
+    except msgspec.DecodeError as e:
+        raise InvalidPayload(f"Invalid {source or 'request'}: malformed JSON ({e})") from e
+
+
+def parse_request(schema):
+    """Decode the current request body (JSON, or form fields otherwise) into `schema`."""
+    if request.is_json:
+        body = request.get_data(cache=False)
+        if not body:
+            raise InvalidPayload("No data provided")
+        return decode(schema, body)
+    # covers multipart/form-data and application/x-www-form-urlencoded
+    if not request.form:
+        raise InvalidPayload("No data provided")
+    return decode(schema, request.form.to_dict())
+
+
+def parse_args(schema):
+    """Decode the current query string into `schema`."""
+    return decode(schema, request.args.to_dict(), source="query string")
+
+
+def json_response(payload: Struct, status: int = 200) -> Response:
+    return Response(_encoder.encode(payload), status=status, mimetype="application/json")
+
+
+def error_response(message: str, status: int) -> Response:
+    return json_response(ErrorResponse(message=message), status)
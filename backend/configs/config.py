@@ -9,6 +9,9 @@ without splitting into many small modules.
 import os
 import sys
 import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------
 # SYSTEM PATH CONFIGURATION
@@ -20,10 +23,36 @@ PROJECT_ROOT = os.path.abspath(
 )
 
 if PROJECT_ROOT not in sys.path:
-    print(f"[config] Adding {PROJECT_ROOT} to sys.path")
+    logger.debug("Adding %s to sys.path", PROJECT_ROOT)
     sys.path.insert(0, PROJECT_ROOT)
-else:
-    print(f"[config] {PROJECT_ROOT} already in sys.path")
+
+# ---------------------------------------------------------
+# DEPLOYMENT
+# ---------------------------------------------------------
+
+APP_ENV = os.environ.get("APP_ENV", "development")     # development | production
+
+# Signing key shared by all workers/nodes: SECRET_KEY, else the contents of SECRET_KEY_FILE.
+# Outside production a key is generated once into DEV_SECRET_KEY_FILE.
+SECRET_KEY = (os.environ.get("SECRET_KEY") or "").strip()
+SECRET_KEY_FILE = os.environ.get("SECRET_KEY_FILE") or None
+DEV_SECRET_KEY_FILE = os.path.join(PROJECT_ROOT, "backend", ".secret_key")
+
+# Defaults to the local SQLite file; point every node at the same server DB to scale out
+DATABASE_URL = os.environ.get("DATABASE_URL") or None
+
+# Shared store for sessions (SESSION_BACKEND=redis) and counters (COUNTER_BACKEND=redis)
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
+# Reverse proxies in front of the app whose X-Forwarded-For/-Proto are trusted (0 = none).
+# Behind one nginx this must be 1, or every client shares the proxy's address (login throttling).
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", 0))
+
+# Directory through which worker processes merge their /metrics values (unset = this process only)
+METRICS_DIR = os.environ.get("METRICS_DIR") or None
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", 5))
+# Bearer token for /metrics; without one only local, unproxied scrapes are answered
+METRICS_TOKEN = (os.environ.get("METRICS_TOKEN") or "").strip()
 
 # ---------------------------------------------------------
 # CHAT VALIDATION LIMITS
@@ -42,6 +71,11 @@ UNSAFE_UNICODE_PATTERN = re.compile(
     r"|[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]"
 )
 
+# A single repeated character is rejected above this length (0 disables)
+SANITIZE_REPEAT_MAX_LENGTH = int(os.environ.get("SANITIZE_REPEAT_MAX_LENGTH", 100))
+# Inputs made only of base64 characters are rejected from this length (0 disables)
+SANITIZE_ENCODED_MIN_LENGTH = int(os.environ.get("SANITIZE_ENCODED_MIN_LENGTH", 2000))
+
 # ---------------------------------------------------------
 # PDF & FILE PROCESSING LIMITS
 # ---------------------------------------------------------
@@ -49,6 +83,174 @@ UNSAFE_UNICODE_PATTERN = re.compile(
 MAX_PAGES = 200                       # Maximum PDF pages allowed
 MAX_TEXT_CHARS = 5_000_000            # Maximum extracted text allowed
 MAX_PARSE_SECONDS = 10                # Timeout for PDF parsing
+MAX_PDF_SIZE_MB = int(os.environ.get("MAX_PDF_SIZE_MB", 10))  # Maximum upload size
+
+# Reject image-only/empty PDFs from a resource scan of a few pages before full extraction
+PDF_PRESCAN = os.environ.get("PDF_PRESCAN", "1").lower() in ("1", "true", "yes")
+PRESCAN_SAMPLE_PAGES = int(os.environ.get("PRESCAN_SAMPLE_PAGES", 5))
+
+# Allowance on top of MAX_PDF_SIZE_MB for multipart headers and form fields
+MAX_REQUEST_OVERHEAD_KB = 64
+
+# Directory uploads are streamed into (None = system temp dir)
+UPLOAD_TMP_DIR = os.environ.get("UPLOAD_TMP_DIR") or None
+
+# Resumable chunked uploads (/app/uploads): where partial uploads live, chunk size, and
+# how long an unfinished upload is kept
+CHUNKED_UPLOAD_DIR = os.environ.get("CHUNKED_UPLOAD_DIR", os.path.join(PROJECT_ROOT, "backend", "chunked_uploads"))
+UPLOAD_CHUNK_SIZE_KB = int(os.environ.get("UPLOAD_CHUNK_SIZE_KB", 1024))
+CHUNKED_UPLOAD_TTL_SECONDS = int(os.environ.get("CHUNKED_UPLOAD_TTL_SECONDS", 24 * 3600))
+
+# ---------------------------------------------------------
+# UPLOAD QUOTAS
+# ---------------------------------------------------------
+
+UPLOAD_QUOTA_COUNT = int(os.environ.get("UPLOAD_QUOTA_COUNT", 60))               # uploads per user...
+UPLOAD_QUOTA_WINDOW_SECONDS = int(os.environ.get("UPLOAD_QUOTA_WINDOW_SECONDS", 3600))  # ...per window
+
+# Where quota/throttle counters live: memory (per worker) | redis (shared by all workers)
+COUNTER_BACKEND = os.environ.get("COUNTER_BACKEND", "memory")
+
+# ---------------------------------------------------------
+# SESSIONS
+# ---------------------------------------------------------
+
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "filesystem")   # filesystem | sqlite | cookie | redis
+SESSION_SQLITE_PATH = os.environ.get(
+    "SESSION_SQLITE_PATH", os.path.join(PROJECT_ROOT, "backend", "sessions.db")
+)
+SESSION_SWEEP_SECONDS = int(os.environ.get("SESSION_SWEEP_SECONDS", 300))   # 0 disables sweeping
+
+# ---------------------------------------------------------
+# PASSWORDS & LOGIN THROTTLING
+# ---------------------------------------------------------
+
+# Any werkzeug method string, e.g. "pbkdf2:sha256:600000" or "scrypt:32768:8:1".
+# Existing hashes are upgraded on the next successful login when this changes.
+PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "pbkdf2:sha256:600000")
+PASSWORD_SALT_LENGTH = 16
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))          # concurrent hashes per process
+PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", 16))             # waiting hashes before "busy"
+PASSWORD_HASH_TIMEOUT_SECONDS = float(os.environ.get("PASSWORD_HASH_TIMEOUT_SECONDS", 10))
+
+LOGIN_ATTEMPTS_PER_IP = int(os.environ.get("LOGIN_ATTEMPTS_PER_IP", 20))          # login POSTs per IP...
+LOGIN_WINDOW_SECONDS = int(os.environ.get("LOGIN_WINDOW_SECONDS", 60))            # ...per window
+
+# ---------------------------------------------------------
+# USER IDENTITY CACHE (Flask-Login user_loader)
+# ---------------------------------------------------------
+
+USER_CACHE_BACKEND = os.environ.get("USER_CACHE_BACKEND", "memory")   # memory | filesystem | redis | none
+USER_CACHE_TTL_SECONDS = int(os.environ.get("USER_CACHE_TTL_SECONDS", 60))
+USER_CACHE_MAX_SIZE = int(os.environ.get("USER_CACHE_MAX_SIZE", 10_000))
+USER_CACHE_DIR = os.environ.get("USER_CACHE_DIR", os.path.join(PROJECT_ROOT, "backend", ".user_cache"))
+
+# ---------------------------------------------------------
+# ASSISTANT SETTINGS
+# ---------------------------------------------------------
+
+# Stub mode replaces the OpenAI call with a canned answer.
+# Used by the benchmark suite so runs don't depend on (or pay for) the API.
+ASSISTANT_STUB = os.environ.get("ASSISTANT_STUB", "").lower() in ("1", "true", "yes")
+ASSISTANT_STUB_LATENCY_MS = int(os.environ.get("ASSISTANT_STUB_LATENCY_MS", 0))
+
+# Send a per-document prompt_cache_key so follow-ups hit the same provider prefix cache
+OPENAI_PROMPT_CACHE_KEY = os.environ.get("OPENAI_PROMPT_CACHE_KEY", "1").lower() in ("1", "true", "yes")
+
+# Stop streaming the completion (and skip saving it) when the chat client disconnects
+CANCEL_ON_DISCONNECT = os.environ.get("CANCEL_ON_DISCONNECT", "1").lower() in ("1", "true", "yes")
+DISCONNECT_POLL_SECONDS = float(os.environ.get("DISCONNECT_POLL_SECONDS", 0.25))  # min interval between socket checks
+
+# Time budget of a chat request, passed down to the LLM call (keep below the gunicorn timeout)
+CHAT_DEADLINE_SECONDS = float(os.environ.get("CHAT_DEADLINE_SECONDS", 60))
+# LLM calls without a request deadline (background summaries)
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", 120))
+
+# Hedged requests: fire a second identical LLM request when the first has no token after
+# the recent p-HEDGE_PERCENTILE time to first token; at most HEDGE_MAX_RATE hedges per request
+LLM_HEDGING = os.environ.get("LLM_HEDGING", "").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.environ.get("HEDGE_PERCENTILE", 95))
+HEDGE_MIN_SAMPLES = int(os.environ.get("HEDGE_MIN_SAMPLES", 20))        # no hedging until this many latencies are known
+HEDGE_WINDOW = int(os.environ.get("HEDGE_WINDOW", 200))                 # recent latencies the percentile is taken over
+HEDGE_MAX_RATE = float(os.environ.get("HEDGE_MAX_RATE", 0.05))
+HEDGE_MIN_DELAY_MS = int(os.environ.get("HEDGE_MIN_DELAY_MS", 250))
+
+# Summarize every upload in the background and answer "summarize this candidate" from storage
+PRECOMPUTE_SUMMARIES = os.environ.get("PRECOMPUTE_SUMMARIES", "").lower() in ("1", "true", "yes")
+SUMMARY_WORKERS = int(os.environ.get("SUMMARY_WORKERS", 2))
+# Also answer broad questions ("overall fit", "strengths", ...) with the summary as context
+SUMMARY_AS_CONTEXT = os.environ.get("SUMMARY_AS_CONTEXT", "").lower() in ("1", "true", "yes")
+
+# ---------------------------------------------------------
+# SEMANTIC INDEX
+# ---------------------------------------------------------
+
+# Per-user chunk embeddings for "similar candidates" and (optionally) chat context retrieval
+SEMANTIC_INDEX = os.environ.get("SEMANTIC_INDEX", "").lower() in ("1", "true", "yes")
+SEMANTIC_INDEX_DIR = os.environ.get("SEMANTIC_INDEX_DIR", os.path.join(PROJECT_ROOT, "backend", "semantic_index"))
+# "hashed" (no model, NumPy only) or a sentence-transformers model name, e.g. "all-MiniLM-L6-v2"
+SEMANTIC_MODEL = os.environ.get("SEMANTIC_MODEL", "hashed")
+SEMANTIC_HASH_DIM = int(os.environ.get("SEMANTIC_HASH_DIM", 512))
+SEMANTIC_CHUNK_CHARS = int(os.environ.get("SEMANTIC_CHUNK_CHARS", 800))
+SEMANTIC_CHUNK_OVERLAP = int(os.environ.get("SEMANTIC_CHUNK_OVERLAP", 100))
+SEMANTIC_TOP_K = int(os.environ.get("SEMANTIC_TOP_K", 6))
+# Send only the most relevant chunks (instead of the whole document) for documents longer than this.
+# Off by default: a per-question context defeats the provider's prompt prefix cache.
+SEMANTIC_CONTEXT = os.environ.get("SEMANTIC_CONTEXT", "").lower() in ("1", "true", "yes")
+SEMANTIC_CONTEXT_MIN_CHARS = int(os.environ.get("SEMANTIC_CONTEXT_MIN_CHARS", 30000))
+
+# ---------------------------------------------------------
+# NEAR-DUPLICATE DETECTION
+# ---------------------------------------------------------
+
+# MinHash/LSH fingerprint of every upload; near-duplicates of a user's earlier document are
+# linked to it and reuse its summary instead of paying for a new one
+NEAR_DUPLICATES = os.environ.get("NEAR_DUPLICATES", "").lower() in ("1", "true", "yes")
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", 0.8))  # estimated Jaccard similarity
+SHINGLE_WORDS = 5          # words per shingle
+MINHASH_BINS = 128         # signature length; changing it invalidates stored fingerprints
+LSH_BANDS = 32             # bands of MINHASH_BINS / LSH_BANDS rows each
+
+# ---------------------------------------------------------
+# LOGGING
+# ---------------------------------------------------------
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# Per-module overrides, e.g. "backend.utils.file_utils=DEBUG,backend.api.chat=WARNING"
+LOG_LEVELS = os.environ.get("LOG_LEVELS", "")
+# Hot loops (e.g. per-page extraction) only log every N-th iteration at DEBUG
+LOG_SAMPLE_EVERY = int(os.environ.get("LOG_SAMPLE_EVERY", 25))
+
+# ---------------------------------------------------------
+# QUERY AUDIT
+# ---------------------------------------------------------
+
+# Count and time every SQL query per request; log slow queries with their plan
+QUERY_AUDIT = os.environ.get("QUERY_AUDIT", "").lower() in ("1", "true", "yes")
+QUERY_SLOW_MS = float(os.environ.get("QUERY_SLOW_MS", 50))
+# The same statement running this many times in one request is reported as a likely N+1
+QUERY_REPEAT_WARN = int(os.environ.get("QUERY_REPEAT_WARN", 5))
+
+# ---------------------------------------------------------
+# DATA RETENTION
+# ---------------------------------------------------------
+
+# Conversations (and their files) older than this are archived and deleted; 0 keeps everything
+RETENTION_DAYS = int(os.environ.get("RETENTION_DAYS", 0))
+RETENTION_ARCHIVE_DIR = os.environ.get("RETENTION_ARCHIVE_DIR", os.path.join(PROJECT_ROOT, "backend", "archive"))
+RETENTION_BATCH_SIZE = int(os.environ.get("RETENTION_BATCH_SIZE", 200))       # conversations per delete transaction
+RETENTION_VACUUM_PAGES = int(os.environ.get("RETENTION_VACUUM_PAGES", 2000))  # pages freed per incremental_vacuum step
+# Run the job in-process every N seconds (0 = only via `python -m backend.utils.retention`, e.g. from cron)
+RETENTION_INTERVAL_SECONDS = int(os.environ.get("RETENTION_INTERVAL_SECONDS", 0))
+
+# ---------------------------------------------------------
+# EXPORTS
+# ---------------------------------------------------------
+
+# Rows fetched from the database per round trip while streaming an export
+EXPORT_BATCH_ROWS = int(os.environ.get("EXPORT_BATCH_ROWS", 1000))
+# Encoded output is sent (and compressed) in chunks of about this size
+EXPORT_CHUNK_KB = int(os.environ.get("EXPORT_CHUNK_KB", 64))
 
 # ---------------------------------------------------------
 # OTHER MISC SETTINGS (placeholder)
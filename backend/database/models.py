@@ -8,7 +8,8 @@ class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(20), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password = db.Column(db.String(60), nullable=False)
+    # "method:params$salt$hash" strings are ~100 chars for pbkdf2/scrypt
+    password = db.Column(db.String(255), nullable=False)
 
     def __repr__(self):
         return f"User('{self.username}', '{self.email}')"
@@ -40,6 +41,87 @@ class Files(db.Model):
     file_name = db.Column(db.String(120), nullable=False)
     text_version_of_the_file = db.Column(db.Text, nullable=False)
 
+    summary = db.relationship('FileSummary', backref='file', uselist=False, lazy=True)
+    text_stats = db.relationship('FileTextStats', backref='file', uselist=False, lazy=True)
+    content_hash = db.relationship('FileHash', backref='file', uselist=False, lazy=True)
+    fingerprint = db.relationship('FileFingerprint', backref='file', uselist=False, lazy=True,
+                                  foreign_keys='FileFingerprint.file_id')
+
     def __repr__(self):
         return f"Files('File Name: {self.file_name} in Conversation ID: {self.conversation_id}')"
+
+
+class FileSummary(db.Model):
+    # Kept out of `files` so existing databases only need the new table (db.create_all)
+    __tablename__ = 'file_summaries'
+
+    id = db.Column(db.Integer, primary_key=True)
+    file_id = db.Column(db.Integer, db.ForeignKey('files.id'), nullable=False, unique=True)
+
+    status = db.Column(db.String(10), nullable=False, default='pending')   # pending | ready | failed
+    summary = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"FileSummary('File ID: {self.file_id}', 'Status: {self.status}')"
     
+
+
+class FileTextStats(db.Model):
+    # Size of the extracted text before and after normalization (tokens are estimates)
+    __tablename__ = 'file_text_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    file_id = db.Column(db.Integer, db.ForeignKey('files.id'), nullable=False, unique=True)
+
+    raw_chars = db.Column(db.Integer, nullable=False)
+    normalized_chars = db.Column(db.Integer, nullable=False)
+    raw_tokens = db.Column(db.Integer, nullable=False)
+    normalized_tokens = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f"FileTextStats('File ID: {self.file_id}', '{self.raw_chars} -> {self.normalized_chars} chars')"
+
+
+class FileHash(db.Model):
+    # SHA-256 of an uploaded or bulk-ingested PDF, so bulk ingestion skips a user's known files
+    __tablename__ = 'file_hashes'
+    __table_args__ = (db.Index('ix_file_hashes_user_sha256', 'user', 'sha256'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    file_id = db.Column(db.Integer, db.ForeignKey('files.id'), nullable=False, unique=True)
+    user = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False)
+
+    def __repr__(self):
+        return f"FileHash('File ID: {self.file_id}', '{self.sha256[:12]}')"
+
+
+class FileFingerprint(db.Model):
+    # MinHash signature of the extracted text, and the earlier document it nearly duplicates (see near_duplicates)
+    __tablename__ = 'file_fingerprints'
+
+    id = db.Column(db.Integer, primary_key=True)
+    file_id = db.Column(db.Integer, db.ForeignKey('files.id'), nullable=False, unique=True)
+    user = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    signature = db.Column(db.LargeBinary, nullable=False)
+    duplicate_of = db.Column(db.Integer, db.ForeignKey('files.id'), nullable=True, index=True)
+    similarity = db.Column(db.Float, nullable=True)
+
+    def __repr__(self):
+        return f"FileFingerprint('File ID: {self.file_id}', 'Duplicate of: {self.duplicate_of}')"
+
+
+class LshBucket(db.Model):
+    # One row per LSH band of a fingerprint: documents sharing a bucket are near-duplicate candidates
+    __tablename__ = 'lsh_buckets'
+    __table_args__ = (db.Index('ix_lsh_buckets_user_bucket', 'user', 'bucket'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    bucket = db.Column(db.BigInteger, nullable=False)
+    file_id = db.Column(db.Integer, db.ForeignKey('files.id'), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"LshBucket('File ID: {self.file_id}', '{self.bucket}')"
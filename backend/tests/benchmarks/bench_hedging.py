@@ -0,0 +1,99 @@
+"""
+Simulated tail latency of LLM requests with and without hedging.
+
+Each request's time to first token is drawn from a log-normal distribution
+with a share of stragglers (an upstream stuck on a slow replica), and runs
+through deadlines.race with the same seed twice: once plain, once with a
+HedgePolicy. Reports p50/p95/p99 latency, hedge rate and hedge win rate.
+Time is scaled down (`--scale`) so a run takes seconds, not minutes.
+
+Usage:
+    python -m backend.tests.benchmarks.bench_hedging --requests 400 --straggler-rate 0.03 --output hedging.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+# Ensure project root is in sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.utils.deadlines import LLM_HEDGES, Deadline, DeadlineExceeded, HedgePolicy, race
+from backend.utils.metrics import percentile
+from backend.tests.benchmarks.bench_upload_chat import git_commit
+
+
+def upstream(rng: random.Random, median: float, straggler_rate: float, straggler_factor: float):
+    """start() for race(): each call (first request or hedge) draws its own latency."""
+    def start():
+        latency = rng.lognormvariate(0, 0.35) * median
+        if rng.random() < straggler_rate:
+            latency *= straggler_factor
+        time.sleep(latency)
+        return latency
+    return start
+
+
+def run(args, policy):
+    rng = random.Random(args.seed)
+    latencies, timeouts = [], 0
+    before = {result: LLM_HEDGES.value(result=result) for result in ("fired", "won", "skipped")}
+    for _ in range(args.requests):
+        start = upstream(rng, args.median_ms / 1000, args.straggler_rate, args.straggler_factor)
+        started = time.perf_counter()
+        try:
+            race(start, Deadline(args.deadline_ms / 1000), policy, poll=0.01)
+        except DeadlineExceeded:
+            timeouts += 1
+        latencies.append(time.perf_counter() - started)
+    hedges = {result: LLM_HEDGES.value(result=result) - before[result] for result in before}
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "deadline_exceeded": timeouts,
+        "hedge_rate": round(hedges["fired"] / args.requests, 3),
+        "hedges_skipped": hedges["skipped"],
+        "hedge_win_rate": round(hedges["won"] / hedges["fired"], 3) if hedges["fired"] else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate LLM tail latency with and without hedged requests.")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--median-ms", type=float, default=20, help="Median time to first token (scaled down)")
+    parser.add_argument("--straggler-rate", type=float, default=0.03, help="Share of requests stuck on a slow upstream")
+    parser.add_argument("--straggler-factor", type=float, default=15, help="How much slower a straggler is")
+    parser.add_argument("--deadline-ms", type=float, default=1000)
+    parser.add_argument("--max-rate", type=float, default=0.05, help="Hedge budget per request (HEDGE_MAX_RATE)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = {"meta": {"commit": git_commit(), **vars(args)}, "results": {}}
+    policies = {
+        "no_hedging": None,
+        "hedging": HedgePolicy(max_rate=args.max_rate, min_samples=20, min_delay=0),
+    }
+    for name, policy in policies.items():
+        result = run(args, policy)
+        report["results"][name] = result
+        print(f"[bench] {name:10}: {result}")
+    report["first_token"] = policies["hedging"].report()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output)
+        print(f"[bench] Report written to {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
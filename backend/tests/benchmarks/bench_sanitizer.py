@@ -0,0 +1,164 @@
+"""
+Fuzz and throughput harness for the chat input sanitizer.
+
+  - fuzz:       random inputs (HTML, unsafe unicode, repeated characters,
+                base64 runs, mixed scripts) must get exactly the same result,
+                or the same error, from Sanitizer.clean and the previous
+                multi-pass implementation kept below as the reference.
+  - throughput: MB/s of both on 1 KB to 1 MB inputs of several profiles.
+
+Usage:
+    python -m backend.tests.benchmarks.bench_sanitizer --fuzz 20000
+    python -m backend.tests.benchmarks.bench_sanitizer --sizes 1024 65536 1048576 --output sanitizer.json
+"""
+import os
+import re
+import sys
+import json
+import html
+import time
+import random
+import string
+import argparse
+
+# Ensure project root is in sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.configs.config import UNSAFE_UNICODE_PATTERN
+from backend.utils.sanitizer import sanitizer
+from backend.tests.benchmarks.bench_upload_chat import git_commit
+
+DEFAULT_SIZES = (1024, 16 * 1024, 256 * 1024, 1024 * 1024)
+
+
+def reference_sanitize(value, field_name):
+    """The sanitize_text implementation before backend/utils/sanitizer.py (one pass per rule)."""
+    if not isinstance(value, str):
+        raise ValueError(f"[validate_chat_request] Invalid type for {field_name}. Expected string.")
+    value = value.strip()
+    if UNSAFE_UNICODE_PATTERN.search(value):
+        raise ValueError(f"[validate_chat_request] {field_name} contains unsupported characters")
+    value = html.escape(value)
+    if len(set(value)) == 1 and len(value) > 100:
+        raise ValueError(f"[validate_chat_request] {field_name} appears malicious (repetitive payload detected).")
+    if re.fullmatch(r"[A-Za-z0-9+/=]{2000,}", value):
+        raise ValueError(f"[validate_chat_request] {field_name} looks like a suspicious encoded payload.")
+    return value
+
+
+# -----------------------------
+# Input generation
+# -----------------------------
+PROSE = (
+    "Senior backend engineer with eight years of Python and SQL experience, "
+    "led a team of five and migrated the data warehouse to the cloud. "
+)
+HTML_HEAVY = "<script>alert('x')</script> & \"quoted\" <b>bold</b> Tom & Jerry's CV > 5 years; "
+UNICODE_TEXT = "Ingénieure logiciel — 8 ans d'expérience, Python & SQL. Déploiement à grande échelle. "
+BASE64_ALPHABET = string.ascii_letters + string.digits + "+/="
+SPECIALS = ["‮", "​", "﻿", "\x00", "\x07", "\x7f", "\t", "\n", "\r", " ", "&", "<", ">", "'", '"']
+
+PROFILES = {
+    "prose": lambda rng, n: (PROSE * (n // len(PROSE) + 1))[:n],
+    "html_heavy": lambda rng, n: (HTML_HEAVY * (n // len(HTML_HEAVY) + 1))[:n],
+    "unicode": lambda rng, n: (UNICODE_TEXT * (n // len(UNICODE_TEXT) + 1))[:n],
+    # base64 with one space in the middle: the worst case for the encoded-payload check
+    "base64_like": lambda rng, n: "".join(rng.choice(BASE64_ALPHABET) if i != n // 2 else " " for i in range(n)),
+}
+
+
+def random_input(rng: random.Random) -> str:
+    """One fuzz case, biased towards the edges of every rule."""
+    shape = rng.randrange(6)
+    if shape == 0:  # single repeated character around the repetition threshold
+        return rng.choice(["A", "&", "<", " ", "é", "="]) * rng.choice([1, 99, 100, 101, 102, 500])
+    if shape == 1:  # base64 run around the encoded-payload threshold, maybe broken by one character
+        run = "".join(rng.choice(BASE64_ALPHABET) for _ in range(rng.choice([1999, 2000, 2001, 3000])))
+        if rng.random() < 0.3:
+            pos = rng.randrange(len(run))
+            run = run[:pos] + rng.choice(SPECIALS) + run[pos + 1:]
+        return run
+    if shape == 2:  # text with specials and unsafe characters sprinkled in
+        chars = list(PROSE[:rng.randrange(1, len(PROSE))])
+        for _ in range(rng.randrange(4)):
+            chars.insert(rng.randrange(len(chars) + 1), rng.choice(SPECIALS))
+        return "".join(chars)
+    if shape == 3:  # a word padded with whitespace
+        return rng.choice([" ", "\n", "\t"]) * rng.randrange(3) + rng.choice(PROSE.split()) + " " * rng.randrange(3)
+    if shape == 4:  # arbitrary code points, mostly printable
+        return "".join(chr(rng.choice([rng.randrange(32, 127), rng.randrange(0, 0x3000)])) for _ in range(rng.randrange(50)))
+    return rng.choice(["", " ", 42, None, b"bytes", "&" * 101, "=" * 2000])
+
+
+def _outcome(func, value):
+    try:
+        return "ok", func(value, "question")
+    except ValueError as e:
+        return "error", str(e)
+
+
+def fuzz(iterations: int, seed: int = 0) -> int:
+    """Compare the sanitizer with the reference on `iterations` random inputs. Returns the number of cases run."""
+    rng = random.Random(seed)
+    for case in range(iterations):
+        value = random_input(rng)
+        expected, actual = _outcome(reference_sanitize, value), _outcome(sanitizer.clean, value)
+        if expected != actual:
+            raise AssertionError(f"[fuzz] case {case} {value!r:.120}: reference {expected!r:.200} != {actual!r:.200}")
+    return iterations
+
+
+# -----------------------------
+# Throughput
+# -----------------------------
+def throughput(func, value: str, min_seconds: float = 0.2) -> float:
+    """Millions of characters per second (MB/s for ASCII input) over repeated calls for at least `min_seconds`."""
+    calls, started = 0, time.perf_counter()
+    while True:
+        try:
+            func(value, "question")
+        except ValueError:
+            pass
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return calls * len(value) / elapsed / 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fuzz and benchmark the chat input sanitizer.")
+    parser.add_argument("--fuzz", type=int, default=5000, help="Random cases compared with the reference")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Input sizes in characters")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    print(f"[bench] fuzz: {fuzz(args.fuzz, args.seed)} cases match the reference")
+
+    rng = random.Random(args.seed)
+    report = {"meta": {"commit": git_commit(), "fuzz_cases": args.fuzz}, "throughput_mb_s": {}}
+    for profile, make in PROFILES.items():
+        for size in args.sizes:
+            value = make(rng, size)
+            result = {
+                "reference": round(throughput(reference_sanitize, value), 1),
+                "sanitizer": round(throughput(sanitizer.clean, value), 1),
+            }
+            result["speedup"] = round(result["sanitizer"] / result["reference"], 2)
+            report["throughput_mb_s"][f"{profile}/{size}"] = result
+            print(f"[bench] {profile:12} {size:>8} chars: {result}")
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output)
+        print(f"[bench] Report written to {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
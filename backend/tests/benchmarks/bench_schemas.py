@@ -0,0 +1,151 @@
+"""
+Microbenchmark of chat request decoding/validation and response encoding.
+
+Compares, inside a Flask request context and without the DB or the LLM:
+  - legacy:  request.get_json + the hand-written validator it replaced + jsonify(dict)
+  - msgspec: parse_request(ChatRequest) + json_response(ChatResponse)
+for a short question and one at the maximum allowed lengths.
+
+Usage:
+    python -m backend.tests.benchmarks.bench_schemas --iterations 20000 --output schemas.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+# Ensure project root is in sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from flask import Flask, jsonify, request
+
+from backend.api.schemas import ChatRequest, ChatResponse, json_response, parse_request
+from backend.configs.config import MAX_HINTS_LENGTH, MAX_QUESTION_LENGTH
+from backend.utils.helpers import sanitize_text
+from backend.utils.metrics import percentile
+from backend.tests.benchmarks.bench_upload_chat import git_commit
+
+ANSWER = "The candidate has eight years of Python and SQL experience and led a team of five. " * 8
+
+PAYLOADS = {
+    "short": {
+        "hints": "Focus on backend experience",
+        "question": "How many years of Python experience does the candidate have",
+        "file_id": "42",
+        "conversation_id": "1337",
+    },
+    "max_length": {
+        "hints": ("Focus on backend experience, " * 40)[:MAX_HINTS_LENGTH],
+        "question": ("Describe the candidate's experience with distributed systems, " * 40)[:MAX_QUESTION_LENGTH],
+        "file_id": "42",
+        "conversation_id": "1337",
+    },
+}
+
+
+def legacy_validate_chat_request(data: dict):
+    """The chat request validator before the msgspec schemas (helpers.validate_chat_request)."""
+    errors, status_codes = [], []
+    if not data:
+        return ["[validate_chat_request] No form data provided"], [400], None, None, "", ""
+
+    raw_hints = data.get('hints', '')
+    raw_question = data.get('question', '')
+    if not raw_hints:
+        errors.append("[validate_chat_request] Hints are required")
+        status_codes.append(400)
+    if not raw_question:
+        errors.append("[validate_chat_request] Question is required")
+        status_codes.append(400)
+
+    file_id = data.get('file_id', '').strip()
+    conversation_id = data.get('conversation_id', '').strip()
+    if not file_id and not conversation_id:
+        errors.append("[validate_chat_request] Internal Server Error. Please try again.")
+        status_codes.append(500)
+    try:
+        file_id = int(file_id) if file_id else None
+        conversation_id = int(conversation_id) if conversation_id else None
+    except ValueError:
+        errors.append("[validate_chat_request] Invalid type for file_id or conversation_id")
+        status_codes.append(400)
+
+    if len(raw_hints) > MAX_HINTS_LENGTH:
+        errors.append(f"[validate_chat_request] Hints must be less than {MAX_HINTS_LENGTH} characters")
+        status_codes.append(400)
+    if len(raw_question) > MAX_QUESTION_LENGTH:
+        errors.append(f"[validate_chat_request] Question must be less than {MAX_QUESTION_LENGTH} characters")
+        status_codes.append(400)
+
+    try:
+        hints = sanitize_text(raw_hints, "hints")
+        question = sanitize_text(raw_question, "question")
+    except ValueError as e:
+        return errors + [str(e)], status_codes + [400], None, None, "", ""
+    return errors, status_codes, file_id, conversation_id, question, hints
+
+
+def legacy_path():
+    data = request.get_json(silent=True)
+    errors, status_codes, file_id, conversation_id, question, hints = legacy_validate_chat_request(data)
+    assert not errors, errors
+    return jsonify({"status": "success", "assistant_response": ANSWER, "conversation_id": conversation_id}).get_data()
+
+
+def msgspec_path():
+    payload = parse_request(ChatRequest)
+    return json_response(ChatResponse(assistant_response=ANSWER, conversation_id=payload.conversation_id)).get_data()
+
+
+PATHS = {"legacy": legacy_path, "msgspec": msgspec_path}
+
+
+def time_path(app, body, path, n):
+    """Per-call latencies; the request context is set up outside the timed part."""
+    latencies = []
+    for _ in range(n):
+        with app.test_request_context("/app/chat", method="POST", data=body, content_type="application/json"):
+            started = time.perf_counter()
+            path()
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark chat request/response (de)serialization.")
+    parser.add_argument("--iterations", type=int, default=10000, help="Calls per payload and path")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    app = Flask(__name__)
+    report = {"meta": {"commit": git_commit(), "iterations": args.iterations}, "payloads": {}}
+    for name, payload in PAYLOADS.items():
+        body = json.dumps(payload)
+        result = {}
+        for path_name, path in PATHS.items():
+            time_path(app, body, path, min(args.iterations, 500))  # warm-up
+            latencies = time_path(app, body, path, args.iterations)
+            result[path_name] = {
+                "p50_us": round(percentile(latencies, 50) * 1e6, 2),
+                "p95_us": round(percentile(latencies, 95) * 1e6, 2),
+                "mean_us": round(sum(latencies) / len(latencies) * 1e6, 2),
+            }
+        result["speedup_p50"] = round(result["legacy"]["p50_us"] / result["msgspec"]["p50_us"], 2)
+        report["payloads"][name] = result
+        print(f"[bench] {name} ({len(body)} bytes): {result}")
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output)
+        print(f"[bench] Report written to {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Per-request session overhead of each SESSION_BACKEND.
+
+For every backend a fresh app is created on a temporary directory and a
+bare endpoint is hit through the test client in two modes:
+  - read:  the session is loaded but not modified (typical authenticated GET)
+  - write: the session is modified, so the backend has to persist it
+The same loop against an app with session handling switched off gives the
+baseline that is subtracted out.
+
+Usage:
+    python -m backend.tests.benchmarks.bench_sessions --requests 2000 --output sessions.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+# Ensure project root is in sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from flask import session
+from flask.sessions import SessionInterface
+
+from backend import create_app
+from backend.utils.sessions import SESSION_BACKENDS
+from backend.utils.metrics import percentile
+from backend.tests.benchmarks.bench_upload_chat import git_commit
+
+
+class NoSessionInterface(SessionInterface):
+    """Never loads or saves anything; used for the baseline."""
+
+    def open_session(self, app, request):
+        return self.make_null_session(app)
+
+    def save_session(self, app, session, response):
+        pass
+
+
+def build_app(backend, workdir):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(workdir, "bench.db"),
+        "SESSION_BACKEND": backend,
+        "SESSION_FILE_DIR": os.path.join(workdir, "flask_session"),
+        "SESSION_SQLITE_PATH": os.path.join(workdir, "sessions.db"),
+        "FORCE_HTTPS": False,
+    })
+
+    @app.route("/_bench/none")
+    def bench_none():
+        return "ok"
+
+    @app.route("/_bench/read")
+    def bench_read():
+        return str(session.get("_user_id"))
+
+    @app.route("/_bench/write")
+    def bench_write():
+        session["counter"] = session.get("counter", 0) + 1
+        return "ok"
+
+    return app
+
+
+def time_requests(client, path, n):
+    latencies = []
+    for _ in range(n):
+        started = time.perf_counter()
+        client.get(path)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def bench_backend(backend, n):
+    workdir = tempfile.mkdtemp(prefix=f"hr_bench_sessions_{backend}_")
+    app = build_app(backend, workdir)
+    client = app.test_client()
+
+    # Populate a session shaped like a logged-in one before measuring
+    with client.session_transaction() as sess:
+        sess["_user_id"] = "1"
+        sess["_fresh"] = True
+        sess["_id"] = "x" * 128
+
+    baseline_app = build_app("cookie", workdir)
+    baseline_app.session_interface = NoSessionInterface()
+    baseline = percentile(time_requests(baseline_app.test_client(), "/_bench/none", n), 50)
+    result = {}
+    for mode in ("read", "write"):
+        latencies = time_requests(client, f"/_bench/{mode}", n)
+        result[mode] = {
+            "p50_us": round(percentile(latencies, 50) * 1e6, 1),
+            "p95_us": round(percentile(latencies, 95) * 1e6, 1),
+            "overhead_p50_us": round((percentile(latencies, 50) - baseline) * 1e6, 1),
+        }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-request session overhead by backend.")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per backend and mode")
+    parser.add_argument("--backends", nargs="+", default=list(SESSION_BACKENDS), choices=SESSION_BACKENDS)
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = {"meta": {"commit": git_commit(), "requests": args.requests}, "backends": {}}
+    for backend in args.backends:
+        report["backends"][backend] = bench_backend(backend, args.requests)
+        print(f"[bench] {backend}: {report['backends'][backend]}")
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output)
+        print(f"[bench] Report written to {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,360 @@
+"""
+End-to-end benchmark / load test for the upload and chat paths.
+
+Drives `/app/upload` and `/app/chat` with a configurable number of concurrent
+clients and reports latency percentiles, throughput, DB write contention and
+memory per worker. Results are written as JSON so two commits can be compared.
+
+By default an in-process server is started on a temporary database with the
+LLM stubbed out (ASSISTANT_STUB). Pass --base-url to hit an already running
+server instead (start it with ASSISTANT_STUB=1 to keep the LLM out of the numbers,
+and raise LOGIN_ATTEMPTS_PER_IP / UPLOAD_QUOTA_COUNT so throttling doesn't kick in).
+
+Usage:
+    python -m backend.tests.benchmarks.bench_upload_chat --concurrency 8 --iterations 20
+    python -m backend.tests.benchmarks.bench_upload_chat --output new.json --compare old.json
+"""
+import os
+import sys
+import re
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+import subprocess
+from io import BytesIO
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure project root is in sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# third-party modules
+import dotenv
+import requests
+from fpdf import FPDF
+
+from backend.utils.metrics import percentile
+
+dotenv.load_dotenv()
+
+BASE_URL_TEST = os.getenv("BASE_URL_TEST", "http://localhost:5000")
+TEST_EMAIL = os.getenv("TEST_EMAIL")
+TEST_PASSWORD = os.getenv("TEST_PASSWORD")
+
+BENCH_EMAIL = "bench.user@example.com"
+BENCH_PASSWORD = "BenchPassword123!"
+
+CONVERSATION_ID_PATTERN = re.compile(r'data-conversation-id=["\'](?P<cid>\d+)["\']')
+
+
+# -----------------------------
+# PDF generation
+# -----------------------------
+def create_sized_pdf(pages: int, lines_per_page: int = 40) -> bytes:
+    """Generate an extractable PDF with the given number of text pages."""
+    pdf = FPDF()
+    pdf.set_font("Arial", size=10)
+    for page in range(pages):
+        pdf.add_page()
+        for line in range(lines_per_page):
+            pdf.cell(0, 6, f"Page {page + 1} line {line + 1}: Senior engineer, Python, SQL, team lead, 8 years.", ln=1)
+    return pdf.output(dest="S").encode("latin1")
+
+
+# -----------------------------
+# Statistics helpers
+# -----------------------------
+def summarize(latencies, errors, wall_seconds):
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall_seconds, 3) if wall_seconds else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+def rss_of_pid(pid):
+    """Current and peak resident set size (kB) of a process, read from /proc."""
+    result = {"pid": pid, "rss_kb": None, "peak_rss_kb": None}
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    result["rss_kb"] = int(line.split()[1])
+                elif line.startswith("VmHWM:"):
+                    result["peak_rss_kb"] = int(line.split()[1])
+    except OSError:
+        # Not Linux, or the process is gone: fall back to our own peak
+        if pid == os.getpid():
+            result["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+# -----------------------------
+# In-process server
+# -----------------------------
+class WriteTimer:
+    """Records the duration of every INSERT/UPDATE/DELETE on the engine."""
+
+    def __init__(self):
+        self.durations = []
+        self.lock = threading.Lock()
+
+    def attach(self, engine):
+        from sqlalchemy import event
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("bench_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info["bench_start"].pop()
+            if statement.lstrip()[:6].upper() in ("INSERT", "UPDATE", "DELETE"):
+                with self.lock:
+                    self.durations.append(time.perf_counter() - started)
+
+
+def start_in_process_server(workdir):
+    """Start the app on a random local port with a temporary DB and a stubbed LLM."""
+    os.environ["ASSISTANT_STUB"] = "1"
+    os.environ.setdefault("MAX_PDF_SIZE_MB", "10")
+    # Every simulated user logs in from 127.0.0.1 as the same account
+    os.environ.setdefault("LOGIN_ATTEMPTS_PER_IP", "1000000")
+    os.environ.setdefault("UPLOAD_QUOTA_COUNT", "1000000")
+
+    from werkzeug.serving import make_server
+    from werkzeug.security import generate_password_hash
+    from backend import create_app, db
+    from backend.database.models import User
+
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(workdir, "bench.db"),
+        "SESSION_FILE_DIR": os.path.join(workdir, "sessions"),
+        "FORCE_HTTPS": False,
+    })
+
+    write_timer = WriteTimer()
+    with app.app_context():
+        write_timer.attach(db.engine)
+        db.session.add(User(
+            email=BENCH_EMAIL,
+            username="benchuser01",
+            password=generate_password_hash(BENCH_PASSWORD, method="pbkdf2:sha256"),
+        ))
+        db.session.commit()
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}", write_timer
+
+
+# -----------------------------
+# Client workload
+# -----------------------------
+def run_client(base_url, email, password, pdfs, iterations, chats_per_upload, results, lock):
+    """One simulated user: login, then repeatedly open dashboard, upload, chat."""
+    session = requests.Session()
+    resp = session.post(f"{base_url}/login", data={"email": email, "password": password})
+    if resp.status_code != 200 or "dashboard" not in resp.url:
+        with lock:
+            results["login_failures"] += 1
+        return
+
+    for i in range(iterations):
+        resp = session.get(f"{base_url}/app/dashboard")
+        match = CONVERSATION_ID_PATTERN.search(resp.text)
+        if not match:
+            with lock:
+                results["upload"]["errors"].append(resp.status_code)
+            continue
+        conversation_id = match.group("cid")
+
+        name, pdf_bytes = pdfs[i % len(pdfs)]
+        started = time.perf_counter()
+        resp = session.post(
+            f"{base_url}/app/upload",
+            files={"files": (f"{name}.pdf", BytesIO(pdf_bytes), "application/pdf")},
+            data={"conversation_id": conversation_id},
+        )
+        elapsed = time.perf_counter() - started
+        with lock:
+            if resp.status_code == 200:
+                results["upload"]["latencies"].append(elapsed)
+                results["upload_by_size"].setdefault(name, []).append(elapsed)
+            else:
+                results["upload"]["errors"].append(resp.status_code)
+        if resp.status_code != 200:
+            continue
+        file_id = resp.json()["file_id"]
+
+        for _ in range(chats_per_upload):
+            started = time.perf_counter()
+            resp = session.post(f"{base_url}/app/chat", json={
+                "hints": "Focus on technical skills.",
+                "question": "Summarize the candidate",
+                "file_id": str(file_id),
+                "conversation_id": str(conversation_id),
+            })
+            elapsed = time.perf_counter() - started
+            with lock:
+                if resp.status_code == 200:
+                    results["chat"]["latencies"].append(elapsed)
+                else:
+                    results["chat"]["errors"].append(resp.status_code)
+
+
+def run_benchmark(args):
+    workdir = tempfile.mkdtemp(prefix="hr_bench_")
+    server = None
+    write_timer = None
+
+    if args.base_url:
+        base_url, email, password = args.base_url, args.email or TEST_EMAIL, args.password or TEST_PASSWORD
+        worker_pids = args.server_pids
+    else:
+        server, base_url, write_timer = start_in_process_server(workdir)
+        email, password = BENCH_EMAIL, BENCH_PASSWORD
+        worker_pids = [os.getpid()]
+
+    print(f"[bench] Target: {base_url} | concurrency={args.concurrency} | iterations={args.iterations}")
+    pdfs = [(f"{pages}p", create_sized_pdf(pages)) for pages in args.pages]
+    for name, pdf_bytes in pdfs:
+        print(f"[bench] Generated {name} PDF: {len(pdf_bytes)} bytes")
+
+    results = {
+        "upload": {"latencies": [], "errors": []},
+        "chat": {"latencies": [], "errors": []},
+        "upload_by_size": {},
+        "login_failures": 0,
+    }
+    lock = threading.Lock()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [
+            pool.submit(run_client, base_url, email, password, pdfs,
+                        args.iterations, args.chats_per_upload, results, lock)
+            for _ in range(args.concurrency)
+        ]
+        for future in futures:
+            future.result()
+    wall_seconds = time.perf_counter() - started
+
+    if server:
+        server.shutdown()
+
+    errors = results["upload"]["errors"] + results["chat"]["errors"]
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "target": base_url,
+            "in_process": not args.base_url,
+            "concurrency": args.concurrency,
+            "iterations": args.iterations,
+            "chats_per_upload": args.chats_per_upload,
+            "pages": args.pages,
+        },
+        "wall_seconds": round(wall_seconds, 3),
+        "login_failures": results["login_failures"],
+        "upload": summarize(results["upload"]["latencies"], len(results["upload"]["errors"]), wall_seconds),
+        "chat": summarize(results["chat"]["latencies"], len(results["chat"]["errors"]), wall_seconds),
+        "upload_by_size": {
+            name: summarize(latencies, 0, wall_seconds) for name, latencies in results["upload_by_size"].items()
+        },
+        "db_contention": {
+            # 5xx responses are what lock timeouts on the SQLite file surface as
+            "server_errors": sum(1 for code in errors if code >= 500),
+            "write_statements": summarize(write_timer.durations, 0, wall_seconds) if write_timer else None,
+        },
+        "memory": [rss_of_pid(pid) for pid in worker_pids],
+    }
+    return report
+
+
+# -----------------------------
+# Regression comparison
+# -----------------------------
+def compare_reports(baseline, current, max_regression_pct):
+    """Print p50/p95/p99 deltas and return the list of metrics that regressed."""
+    regressions = []
+    for section in ("upload", "chat"):
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            old = baseline.get(section, {}).get(metric)
+            new = current.get(section, {}).get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            # Higher latency is worse; lower throughput is worse
+            worse = change if metric.endswith("_ms") else -change
+            flag = "REGRESSION" if worse > max_regression_pct else "ok"
+            print(f"[bench] {section}.{metric}: {old} -> {new} ({change:+.1f}%) {flag}")
+            if worse > max_regression_pct:
+                regressions.append(f"{section}.{metric}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark /app/upload and /app/chat.")
+    parser.add_argument("--base-url", default=None,
+                        help=f"Benchmark a running server (e.g. {BASE_URL_TEST}) instead of an in-process one")
+    parser.add_argument("--email", default=None, help="Login email for --base-url (default: TEST_EMAIL)")
+    parser.add_argument("--password", default=None, help="Login password for --base-url (default: TEST_PASSWORD)")
+    parser.add_argument("--server-pids", type=int, nargs="*", default=[],
+                        help="PIDs of the server workers to sample memory from (with --base-url)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Number of concurrent simulated users")
+    parser.add_argument("--iterations", type=int, default=10, help="Uploads per simulated user")
+    parser.add_argument("--chats-per-upload", type=int, default=3, help="Chat requests after each upload")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50], help="PDF sizes to cycle through, in pages")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON report to compare against")
+    parser.add_argument("--max-regression-pct", type=float, default=10.0,
+                        help="Exit non-zero if any compared metric is worse by more than this")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run_benchmark(args)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output)
+        print(f"[bench] Report written to {args.output}")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        regressions = compare_reports(baseline, report, args.max_regression_pct)
+        if regressions:
+            print(f"[bench] Regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
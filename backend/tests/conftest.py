@@ -0,0 +1,30 @@
+import os
+import sys
+from contextlib import contextmanager
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+
+from backend.utils.query_audit import capture_queries, instrument_engines
+
+
+@pytest.fixture
+def max_queries():
+    """
+    Assert an upper bound on the SQL queries run inside a block:
+
+        with max_queries(3):
+            client.get("/app/dashboard")
+    """
+    instrument_engines()
+
+    @contextmanager
+    def _check(limit):
+        with capture_queries() as stats:
+            yield stats
+        assert stats.count <= limit, f"expected at most {limit} queries, got {stats.describe()}"
+
+    return _check
@@ -145,7 +145,8 @@ class TestUploadWorkflow:
             data={"conversation_id": conversation_id}
         )
 
-        assert resp.status_code in (400, 500)
+        # 413 when rejected from Content-Length at the WSGI layer, 400 from validation
+        assert resp.status_code in (400, 413)
         assert "too large" in resp.text.lower()
         self._success("Large PDF correctly rejected for exceeding size limits.")
 
@@ -0,0 +1,116 @@
+import os
+import re
+import sys
+import shutil
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+from fpdf import FPDF
+
+from backend import create_app, db
+from backend.database.models import Conversations, Files, FileFingerprint, FileHash, FileTextStats, User
+from backend.utils import bulk_ingest
+from backend.utils.bulk_ingest import ingest_directory, resolve_user
+from backend.utils.passwords import hash_password
+
+
+def write_pdf(path, name):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=10)
+    pdf.cell(0, 6, f"{name}: backend engineer, Python and SQL, 6 years.", ln=1)
+    pdf.output(str(path))
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SECRET_KEY": "ingest-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+    })
+    with app.app_context():
+        db.session.add(User(email="ingest@example.com", username="ingest01", password=hash_password("Ingest123!")))
+        db.session.commit()
+    return app
+
+
+def test_ingest_directory_skips_duplicates_and_reports_failures(app, tmp_path):
+    cvs = tmp_path / "cvs"
+    (cvs / "agency_b").mkdir(parents=True)
+    for i in range(5):
+        write_pdf(cvs / f"candidate_{i}.pdf", f"Candidate {i}")
+    # The same CV sent by a second agency, a broken file and something that isn't a PDF at all
+    shutil.copy(cvs / "candidate_0.pdf", cvs / "agency_b" / "candidate_0_copy.pdf")
+    (cvs / "agency_b" / "broken.pdf").write_bytes(b"%PDF-1.4\nnot really a pdf")
+    (cvs / "agency_b" / "photo.pdf").write_bytes(b"\x89PNG" + b"\0" * 2000)
+    (cvs / "notes.txt").write_text("ignored")
+
+    with app.app_context():
+        user_id = resolve_user("ingest@example.com")
+        report = ingest_directory(str(cvs), user_id, workers=2, batch_size=2, semantic_index=False)
+        assert (report.found, report.ingested, report.duplicates_in_run, len(report.failed)) == (8, 5, 1, 2)
+        assert db.session.query(Files).count() == 5
+        assert db.session.query(FileTextStats).count() == db.session.query(FileHash).count() == 5
+        assert db.session.query(Conversations).filter_by(user=user_id).count() == 5
+        texts = sorted(f.text_version_of_the_file for f in db.session.query(Files))
+        assert "Candidate 4" in texts[-1]
+
+        # A second run finds everything already ingested
+        again = ingest_directory(str(cvs), user_id, workers=2, semantic_index=False)
+        assert (again.ingested, again.already_ingested) == (0, 6)
+    print(f"✅ Ingested {report.ingested} PDFs, skipped duplicates by hash: {report.as_dict()}")
+
+
+def test_ingest_skips_uploaded_files_and_fingerprints_in_the_batch(app, tmp_path):
+    cvs = tmp_path / "cvs"
+    cvs.mkdir()
+    for i in range(3):
+        write_pdf(cvs / f"candidate_{i}.pdf", f"Candidate {i}")
+
+    # The recruiter already uploaded one of them through the browser
+    client = app.test_client()
+    client.post("/login", data={"email": "ingest@example.com", "password": "Ingest123!"})
+    conversation_id = re.search(r'data-conversation-id="(\d+)"', client.get("/app/dashboard").text).group(1)
+    with open(cvs / "candidate_1.pdf", "rb") as fh:
+        resp = client.post("/app/upload", data={"conversation_id": conversation_id, "files": (fh, "candidate_1.pdf")},
+                           content_type="multipart/form-data")
+    assert resp.status_code == 200, resp.get_json()
+
+    with app.app_context():
+        user_id = resolve_user("ingest@example.com")
+        report = ingest_directory(str(cvs), user_id, workers=1, batch_size=5,
+                                  semantic_index=False, near_duplicates=True)
+        assert (report.ingested, report.already_ingested) == (2, 1)
+        # Fingerprints are written in the batch's own transaction, one per ingested file
+        ingested = db.session.execute(db.select(FileHash.file_id).where(FileHash.file_id != resp.json["file_id"])).scalars()
+        fingerprinted = db.session.execute(db.select(FileFingerprint.file_id)).scalars()
+        assert sorted(ingested) == sorted(fingerprinted)
+    print("✅ A CV uploaded through the browser isn't ingested again; ingested files are fingerprinted.")
+
+
+def test_failed_batch_is_reported_and_the_run_goes_on(app, tmp_path, monkeypatch):
+    cvs = tmp_path / "cvs"
+    cvs.mkdir()
+    for i in range(4):
+        write_pdf(cvs / f"candidate_{i}.pdf", f"Candidate {i}")
+    insert_batch, calls = bulk_ingest.insert_batch, []
+
+    def flaky_insert_batch(user_id, batch, near_duplicates=False):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return insert_batch(user_id, batch, near_duplicates)
+
+    monkeypatch.setattr(bulk_ingest, "insert_batch", flaky_insert_batch)
+    with app.app_context():
+        report = ingest_directory(str(cvs), resolve_user("ingest@example.com"), workers=1, batch_size=2,
+                                  semantic_index=False)
+        assert (report.ingested, len(report.failed)) == (2, 2)
+        assert all("database is locked" in reason for _, reason in report.failed)
+        assert db.session.query(Files).count() == 2
+    print("✅ A batch that fails to store is reported and the other batches are still ingested.")
@@ -0,0 +1,201 @@
+import os
+import re
+import sys
+import time
+import hashlib
+import threading
+from io import BytesIO
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+from fpdf import FPDF
+
+from backend import create_app, db
+from backend.database.models import Files, User
+from backend.utils.chunked_uploads import create_upload, load_upload, sweep_expired
+from backend.utils.passwords import hash_password
+
+TEST_EMAIL = "chunked.test@example.com"
+TEST_PASSWORD = "ChunkedPassword123!"
+CHUNK_SIZE = 1024
+
+
+def make_pdf(pages=6):
+    pdf = FPDF()
+    for page in range(pages):
+        pdf.add_page()
+        pdf.set_font("Arial", size=10)
+        for line in range(20):
+            pdf.cell(0, 6, f"Dossier page {page + 1}: Python, SQL and team leadership, item {line}.", ln=1)
+    return pdf.output(dest="S").encode("latin1")
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SECRET_KEY": "chunked-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+        "CHUNKED_UPLOAD_DIR": str(tmp_path / "chunks"),
+        "UPLOAD_CHUNK_SIZE_KB": CHUNK_SIZE // 1024,
+    })
+    with app.app_context():
+        db.session.add(User(email=TEST_EMAIL, username="chunked01", password=hash_password(TEST_PASSWORD)))
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.post("/login", data={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    return client
+
+
+def start(client, data, name="dossier.pdf"):
+    conversation_id = re.search(r'data-conversation-id="(\d+)"', client.get("/app/dashboard").text).group(1)
+    resp = client.post("/app/uploads", json={"conversation_id": conversation_id, "file_name": name, "size": len(data)})
+    assert resp.status_code == 201, resp.get_json()
+    return resp.get_json()
+
+
+def put(client, upload, data, index, checksum=True, body=None):
+    body = data[index * CHUNK_SIZE:(index + 1) * CHUNK_SIZE] if body is None else body
+    headers = {"X-Chunk-SHA256": hashlib.sha256(body).hexdigest()} if checksum else {}
+    return client.put(f"/app/uploads/{upload['upload_id']}/chunks/{index}", data=body, headers=headers,
+                      content_type="application/octet-stream")
+
+
+def test_chunks_out_of_order_then_complete(app, client):
+    data = make_pdf()
+    upload = start(client, data)
+    assert upload["chunks"] == -(-len(data) // CHUNK_SIZE) and upload["received"] == []
+
+    for index in reversed(range(upload["chunks"])):
+        assert put(client, upload, data, index, checksum=index % 2 == 0).status_code == 200
+
+    resp = client.post(f"/app/uploads/{upload['upload_id']}/complete")
+    body = resp.get_json()
+    assert resp.status_code == 200, body
+    with app.app_context():
+        text = db.session.get(Files, body["file_id"]).text_version_of_the_file
+    assert "Dossier page 6" in text
+    assert os.listdir(app.config["CHUNKED_UPLOAD_DIR"]) == []
+    print(f"✅ {upload['chunks']} chunks uploaded in reverse order, assembled in place and extracted.")
+
+
+def test_interrupted_upload_resumes(client):
+    data = make_pdf()
+    upload = start(client, data)
+    sent = list(range(0, upload["chunks"], 2))
+    for index in sent:
+        put(client, upload, data, index)
+
+    # The connection drops; the client asks what made it before sending the rest
+    status = client.get(f"/app/uploads/{upload['upload_id']}").get_json()
+    assert status["received"] == sent
+    assert client.post(f"/app/uploads/{upload['upload_id']}/complete").status_code == 409
+
+    for index in set(range(upload["chunks"])) - set(status["received"]):
+        put(client, upload, data, index)
+    assert client.post(f"/app/uploads/{upload['upload_id']}/complete").status_code == 200
+    print("✅ Interrupted upload resumed from the chunks already received.")
+
+
+def test_bad_chunks_are_rejected(client):
+    data = make_pdf()
+    upload = start(client, data)
+    chunk = data[CHUNK_SIZE:2 * CHUNK_SIZE]
+
+    mismatch = client.put(f"/app/uploads/{upload['upload_id']}/chunks/1", data=chunk,
+                          headers={"X-Chunk-SHA256": "0" * 64})
+    assert mismatch.status_code == 422
+    assert put(client, upload, data, 1, body=chunk[:-1]).status_code == 400
+    assert put(client, upload, data, upload["chunks"]).status_code == 400
+    assert put(client, upload, data, 0, body=b"MZ" + b"\0" * (CHUNK_SIZE - 2)).status_code == 400
+    assert client.get(f"/app/uploads/{upload['upload_id']}").get_json()["received"] == []
+
+    assert client.get("/app/uploads/../../etc").status_code == 404
+    assert client.get("/app/uploads/" + "0" * 32).status_code == 404
+    too_large = client.post("/app/uploads", json={"conversation_id": 1, "file_name": "a.pdf", "size": 10 ** 9})
+    assert too_large.status_code == 413
+    print("✅ Checksum mismatches, wrong sizes, non-PDFs, unknown and oversized uploads rejected.")
+
+
+def test_bad_resend_of_stored_chunk_is_not_completed(app, client):
+    data = make_pdf()
+    upload = start(client, data)
+    for index in range(upload["chunks"]):
+        put(client, upload, data, index)
+    chunk = data[CHUNK_SIZE:2 * CHUNK_SIZE]
+
+    # A retry after a lost response arrives truncated, then corrupted
+    assert put(client, upload, data, 1, body=chunk[:-100]).status_code == 400
+    assert client.get(f"/app/uploads/{upload['upload_id']}").get_json()["received"] == [
+        index for index in range(upload["chunks"]) if index != 1
+    ]
+    corrupted = bytes(len(chunk))
+    resp = client.put(f"/app/uploads/{upload['upload_id']}/chunks/1", data=corrupted,
+                      headers={"X-Chunk-SHA256": hashlib.sha256(chunk).hexdigest()})
+    assert resp.status_code == 422
+    assert client.post(f"/app/uploads/{upload['upload_id']}/complete").status_code == 409
+
+    put(client, upload, data, 1)
+    resp = client.post(f"/app/uploads/{upload['upload_id']}/complete")
+    assert resp.status_code == 200, resp.get_json()
+    with app.app_context():
+        assert "Dossier page 6" in db.session.get(Files, resp.get_json()["file_id"]).text_version_of_the_file
+    print("✅ A bad copy of a stored chunk unmarks it instead of completing a corrupted file.")
+
+
+def test_concurrent_complete_stores_the_file_once(app, client):
+    data = make_pdf()
+    upload = start(client, data)
+    for index in range(upload["chunks"]):
+        put(client, upload, data, index)
+
+    # A double click: the first /complete has claimed the upload and is still extracting
+    claimed = load_upload(app.config["CHUNKED_UPLOAD_DIR"], upload["upload_id"], 1)
+    claimed.claim()
+    assert client.post(f"/app/uploads/{upload['upload_id']}/complete").status_code == 409
+    assert put(client, upload, data, 0).status_code == 409
+    with app.app_context():
+        assert db.session.query(Files).count() == 0
+    claimed.discard()
+    assert client.post(f"/app/uploads/{upload['upload_id']}/complete").status_code == 404
+    print("✅ Only the request that claims an upload completes it; the other gets 409.")
+
+
+def test_parallel_writes_and_expiry(tmp_path):
+    data = make_pdf(pages=12)
+    upload = create_upload(str(tmp_path), 7, 1, "dossier.pdf", len(data), CHUNK_SIZE)
+
+    def send(indexes):
+        for index in indexes:
+            upload.write_chunk(index, BytesIO(data[index * CHUNK_SIZE:(index + 1) * CHUNK_SIZE]))
+    threads = [threading.Thread(target=send, args=(range(worker, upload.chunks, 4),)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert load_upload(str(tmp_path), upload.upload_id, 7).missing() == []
+    with upload.open() as fh:
+        assert fh.read() == data
+    with pytest.raises(ValueError):
+        load_upload(str(tmp_path), upload.upload_id, 8)
+
+    assert sweep_expired(str(tmp_path), 3600) == 0
+    old = time.time() - 7200
+    os.utime(upload.path, (old, old))
+    # Still uploading after the TTL: a chunk counts as activity
+    upload.write_chunk(0, BytesIO(data[:CHUNK_SIZE]))
+    assert sweep_expired(str(tmp_path), 3600) == 0
+    os.utime(upload.path, (old, old))
+    assert sweep_expired(str(tmp_path), 3600) == 1
+    assert not os.path.exists(upload.path)
+    print("✅ Parallel chunk writes assemble the exact file; expired uploads are swept.")
@@ -0,0 +1,59 @@
+import os
+import sys
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from sqlalchemy import select
+
+from backend import create_app, db
+from backend.database.models import User, Conversations, Files
+from backend.utils.db_seeder import seed_database
+
+
+def make_app(tmp_path, name):
+    return create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / f"{name}.db"),
+        "SECRET_KEY": "seeder-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+    })
+
+
+def snapshot(app):
+    with app.app_context():
+        users = db.session.execute(select(User.id, User.username, User.email).order_by(User.id)).all()
+        conversations = db.session.execute(select(
+            Conversations.id, Conversations.user, Conversations.user_message, Conversations.time_of_message
+        ).order_by(Conversations.id)).all()
+        files = db.session.execute(select(
+            Files.conversation_id, Files.file_name, Files.text_version_of_the_file
+        ).order_by(Files.id)).all()
+    return users, conversations, files
+
+
+def test_seed_counts_and_reproducibility(tmp_path):
+    first, second = make_app(tmp_path, "a"), make_app(tmp_path, "b")
+    counts = seed_database(users=30, conversations_per_user=4, files_per_conversation=2, batch_size=7, seed=7, app=first)
+    seed_database(users=30, conversations_per_user=4, files_per_conversation=2, batch_size=50, seed=7, app=second)
+
+    assert counts == {"users": 30, "conversations": 120, "files": 240}
+    users, conversations, files = snapshot(first)
+    assert (len(users), len(conversations), len(files)) == (30, 120, 240)
+    assert all(len(text) > 100 for _, _, text in files)
+    # Same seed -> identical data, regardless of batch size
+    assert snapshot(first) == snapshot(second)
+    print("✅ Seeder inserts the requested row counts reproducibly.")
+
+
+def test_seed_appends_after_existing_rows(tmp_path):
+    app = make_app(tmp_path, "c")
+    seed_database(users=5, conversations_per_user=2, seed=1, app=app)
+    seed_database(users=5, conversations_per_user=2, seed=1, app=app)
+
+    users, conversations, _ = snapshot(app)
+    assert [u.id for u in users] == list(range(1, 11))
+    assert len({u.username for u in users}) == 10
+    assert {c.user for c in conversations} == set(range(1, 11))
+    print("✅ Re-running the seeder appends new users without collisions.")
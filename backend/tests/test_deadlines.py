@@ -0,0 +1,164 @@
+import os
+import re
+import sys
+import time
+import threading
+from io import BytesIO
+from types import SimpleNamespace
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+from fpdf import FPDF
+
+from backend import create_app, db
+from backend.database.models import User
+from backend.utils import assistant as assistant_module
+from backend.utils.deadlines import LLM_HEDGES, Deadline, DeadlineExceeded, HedgePolicy, race
+from backend.utils.passwords import hash_password
+
+TEST_EMAIL = "deadline.test@example.com"
+TEST_PASSWORD = "DeadlinePassword123!"
+
+
+def warmed_policy(latency=0.05, **kwargs):
+    policy = HedgePolicy(min_samples=10, min_delay=0.01, **kwargs)
+    for _ in range(10):
+        policy.observe(latency)
+    return policy
+
+
+def sleeper(*delays):
+    """start() whose n-th call sleeps delays[n] and returns n."""
+    calls = iter(range(len(delays)))
+
+    def start():
+        n = next(calls)
+        time.sleep(delays[n])
+        return n
+    return start
+
+
+def test_hedge_wins_against_a_straggler_and_the_loser_is_closed():
+    closed = []
+    before = (LLM_HEDGES.value(result="fired"), LLM_HEDGES.value(result="won"))
+    started = time.perf_counter()
+
+    attempt, value = race(sleeper(2.0, 0.05), Deadline(5), warmed_policy(max_rate=1.0), close=closed.append)
+
+    assert (attempt, value) == (1, 1)
+    assert time.perf_counter() - started < 0.5
+    assert (LLM_HEDGES.value(result="fired"), LLM_HEDGES.value(result="won")) == (before[0] + 1, before[1] + 1)
+    deadline = time.perf_counter() + 3
+    while not closed and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    assert closed == [0]
+    print("✅ Hedge fired after the p95 delay, won, and the straggler was closed when it finished.")
+
+
+def test_hedges_are_capped():
+    policy = warmed_policy(max_rate=0.5)
+    skipped = LLM_HEDGES.value(result="skipped")
+    # First race earns 0.5 of a hedge: not enough to fire
+    assert race(sleeper(0.1), Deadline(5), policy) == (0, 0)
+    assert LLM_HEDGES.value(result="skipped") == skipped + 1
+    # Second race has a full token
+    assert race(sleeper(0.3, 0.0), Deadline(5), policy)[0] == 1
+    print("✅ Hedges are limited to HEDGE_MAX_RATE per request.")
+
+
+def test_deadline_returns_while_the_upstream_call_is_stuck():
+    stuck = threading.Event()
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceeded) as info:
+        race(lambda: stuck.wait(10), Deadline(0.2))
+    stuck.set()
+    assert info.value.stage == "llm_first_token"
+    assert time.perf_counter() - started < 0.5
+    print("✅ Deadline exceeded while waiting for the first token, worker freed.")
+
+
+def test_errors_are_raised_without_waiting_for_a_hedge():
+    def fail():
+        raise ValueError("upstream 500")
+    with pytest.raises(ValueError, match="upstream 500"):
+        race(fail, Deadline(5), warmed_policy(latency=3, max_rate=1.0))
+    print("✅ A failing request isn't held back until the hedge delay.")
+
+
+def test_assistant_hedges_a_slow_first_token(monkeypatch):
+    chunk = SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="fast answer"))], usage=None)
+
+    class Stream:
+        def __init__(self, delay):
+            self.delay = delay
+            self.closed = False
+
+        def __iter__(self):
+            time.sleep(self.delay)
+            yield chunk
+
+        def close(self):
+            self.closed = True
+
+    streams = [Stream(2.0), Stream(0.0)]
+    create_kwargs = []
+
+    def create(**kwargs):
+        create_kwargs.append(kwargs)
+        return streams[len(create_kwargs) - 1]
+
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(assistant_module, "ASSISTANT_STUB", False)
+    monkeypatch.setattr(assistant_module, "LLM_HEDGING", True)
+    monkeypatch.setattr(assistant_module, "OpenAI", lambda **kwargs: fake_client)
+    monkeypatch.setattr(assistant_module, "hedge_policy", warmed_policy(max_rate=1.0))
+
+    started = time.perf_counter()
+    answer = assistant_module.assistant("hints", "question", "doc", deadline=Deadline(10))
+
+    assert answer == "fast answer"
+    assert time.perf_counter() - started < 1.0
+    assert 0 < create_kwargs[0]["timeout"] <= 10
+    print(f"✅ Hedged answer in {time.perf_counter() - started:.2f}s instead of 2s; timeout from the deadline.")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(assistant_module, "ASSISTANT_STUB", True)
+    monkeypatch.setattr(assistant_module, "ASSISTANT_STUB_LATENCY_MS", 3000)
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SECRET_KEY": "deadline-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+        "CHAT_DEADLINE_SECONDS": 0.3,
+    })
+    with app.app_context():
+        db.session.add(User(email=TEST_EMAIL, username="deadline01", password=hash_password(TEST_PASSWORD)))
+        db.session.commit()
+    client = app.test_client()
+    client.post("/login", data={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    return client
+
+
+def test_chat_route_enforces_its_deadline(client):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=10)
+    pdf.cell(0, 6, "Senior engineer, Python, SQL, 8 years.", ln=1)
+    conversation_id = re.search(r'data-conversation-id="(\d+)"', client.get("/app/dashboard").text).group(1)
+    file_id = client.post("/app/upload", data={
+        "conversation_id": conversation_id,
+        "files": (BytesIO(pdf.output(dest="S").encode("latin1")), "cv.pdf", "application/pdf"),
+    }, content_type="multipart/form-data").get_json()["file_id"]
+
+    started = time.perf_counter()
+    resp = client.post("/app/chat", json={"hints": "Backend", "question": "Years of Python",
+                                          "file_id": file_id, "conversation_id": conversation_id})
+    assert resp.status_code == 504
+    assert resp.get_json()["status"] == "error"
+    assert time.perf_counter() - started < 1.5
+    print("✅ Chat request answered 504 at its deadline instead of waiting 3s for the LLM.")
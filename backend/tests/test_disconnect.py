@@ -0,0 +1,140 @@
+import os
+import re
+import sys
+import json
+import time
+import socket
+import threading
+from io import BytesIO
+from types import SimpleNamespace
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+import requests
+from fpdf import FPDF
+from werkzeug.serving import make_server
+
+from backend import create_app, db
+from backend.database.models import Conversations, User
+from backend.utils import assistant as assistant_module
+from backend.utils.disconnect import CANCELLED_REQUESTS, ClientDisconnected, disconnect_check, socket_closed
+from backend.utils.passwords import hash_password
+
+TEST_EMAIL = "disconnect.test@example.com"
+TEST_PASSWORD = "DisconnectPassword123!"
+
+
+def test_socket_closed_detects_peer_close_without_consuming_data():
+    server_side, client_side = socket.socketpair()
+    try:
+        assert not socket_closed(server_side)
+        client_side.sendall(b"GET / HTTP/1.1\r\n")
+        assert not socket_closed(server_side)
+        assert server_side.recv(100) == b"GET / HTTP/1.1\r\n"
+        client_side.close()
+        assert socket_closed(server_side)
+    finally:
+        server_side.close()
+    print("✅ Peer close detected; pending bytes are left in the socket.")
+
+
+def test_disconnect_check_is_rate_limited_and_sticky():
+    server_side, client_side = socket.socketpair()
+    check = disconnect_check({"werkzeug.socket": server_side}, interval=60)
+    assert check() is False
+    client_side.close()
+    assert check() is False  # next socket check only after the interval
+    check = disconnect_check({"gunicorn.socket": server_side}, interval=0)
+    assert check() is True and check() is True
+    assert disconnect_check({}, interval=0) is None
+    server_side.close()
+    print("✅ Checks are rate limited, sticky, and disabled without a socket.")
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        for text in self.chunks:
+            if self.closed:
+                return
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+
+    def close(self):
+        self.closed = True
+
+
+def test_streamed_completion_is_closed_on_disconnect(monkeypatch):
+    stream = FakeStream(["tok "] * 100)
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: stream)))
+    monkeypatch.setattr(assistant_module, "ASSISTANT_STUB", False)
+    monkeypatch.setattr(assistant_module, "OpenAI", lambda **kwargs: fake_client)
+
+    calls = []
+    with pytest.raises(ClientDisconnected) as info:
+        assistant_module.assistant("hints", "question", "doc", cancel_check=lambda: calls.append(1) or len(calls) > 5)
+
+    assert info.value.stage == "llm_stream"
+    assert stream.closed and len(calls) == 6
+    print("✅ Upstream stream closed after the disconnect was seen.")
+
+
+@pytest.fixture
+def live_server(tmp_path, monkeypatch):
+    monkeypatch.setattr(assistant_module, "ASSISTANT_STUB", True)
+    monkeypatch.setattr(assistant_module, "ASSISTANT_STUB_LATENCY_MS", 5000)
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SECRET_KEY": "disconnect-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+    })
+    with app.app_context():
+        db.session.add(User(email=TEST_EMAIL, username="disconnect01", password=hash_password(TEST_PASSWORD)))
+        db.session.commit()
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield app, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_chat_request_is_abandoned_when_client_disconnects(live_server):
+    app, base_url = live_server
+    session = requests.Session()
+    session.post(f"{base_url}/login", data={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    conversation_id = re.search(r'data-conversation-id="(\d+)"', session.get(f"{base_url}/app/dashboard").text).group(1)
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=10)
+    pdf.cell(0, 6, "Senior engineer, Python, SQL, 8 years.", ln=1)
+    file_id = session.post(f"{base_url}/app/upload", data={"conversation_id": conversation_id}, files={
+        "files": ("cv.pdf", BytesIO(pdf.output(dest="S").encode("latin1")), "application/pdf"),
+    }).json()["file_id"]
+
+    before = CANCELLED_REQUESTS.value(stage="llm_stream")
+    body = json.dumps({"hints": "Backend", "question": "Never read answer", "file_id": file_id,
+                       "conversation_id": conversation_id}).encode()
+    cookies = "; ".join(f"{c.name}={c.value}" for c in session.cookies)
+    port = int(base_url.rsplit(":", 1)[1])
+    started = time.perf_counter()
+    with socket.create_connection(("127.0.0.1", port)) as raw:
+        raw.sendall(
+            b"POST /app/chat HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+            + f"Cookie: {cookies}\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        time.sleep(0.5)  # the stubbed LLM is now "streaming"
+
+    while CANCELLED_REQUESTS.value(stage="llm_stream") == before and time.perf_counter() - started < 4:
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+
+    assert CANCELLED_REQUESTS.value(stage="llm_stream") == before + 1
+    assert elapsed < 4, "the request ran for the full stubbed LLM latency"
+    with app.app_context():
+        assert Conversations.query.filter_by(user_message="Never read answer").count() == 0
+    print(f"✅ Disconnected chat request abandoned after {elapsed:.2f}s of a 5s answer, nothing saved.")
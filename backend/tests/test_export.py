@@ -0,0 +1,127 @@
+import io
+import os
+import csv
+import sys
+import gzip
+import json
+import tracemalloc
+from datetime import date, datetime
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+from sqlalchemy import func, select
+
+from backend import create_app, db
+from backend.database.models import Conversations, Files
+from backend.utils.db_seeder import DEFAULT_PASSWORD, seed_database
+from backend.utils.export import encode_csv, stream_export
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("export")
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SECRET_KEY": "export-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+    })
+    seed_database(users=3, conversations_per_user=60, files_per_conversation=1, file_chars=800, seed=3, app=app)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.post("/login", data={"email": "user_1@example.com", "password": DEFAULT_PASSWORD})
+    return client
+
+
+def test_csv_export_of_own_conversations(client):
+    resp = client.get("/app/export/conversations?format=csv")
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/csv"
+    assert resp.headers["Content-Disposition"].endswith('.csv"')
+
+    rows = list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+    assert len(rows) == 60
+    assert {row["user"] for row in rows} == {"1"}
+    assert all(row["file_name"] for row in rows)
+    print(f"✅ CSV export streamed {len(rows)} conversations of the current user only.")
+
+
+def test_gzipped_jsonl_export_filtered_by_date(app, client):
+    start, end = date(2024, 12, 10), date(2024, 12, 20)
+    resp = client.get(f"/app/export/conversations?format=jsonl&gzip=1&start={start}&end={end}")
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/gzip"
+
+    rows = [json.loads(line) for line in gzip.decompress(resp.get_data()).splitlines()]
+    with app.app_context():
+        expected = db.session.execute(
+            select(func.count()).select_from(Conversations).where(
+                Conversations.user == 1,
+                Conversations.time_of_message >= datetime(2024, 12, 10),
+                Conversations.time_of_message < datetime(2024, 12, 21),
+            )
+        ).scalar()
+    assert 0 < len(rows) == expected
+    assert all(str(start) <= row["time_of_message"][:10] <= str(end) for row in rows)
+    print(f"✅ Gzipped JSONL export of {len(rows)} rows between {start} and {end}.")
+
+
+def test_files_export_by_file_and_bad_queries(app, client):
+    with app.app_context():
+        file_id, text = db.session.execute(
+            select(Files.id, Files.text_version_of_the_file)
+            .join(Conversations, Files.conversation_id == Conversations.id)
+            .where(Conversations.user == 1)
+        ).first()
+        other_file_id = db.session.execute(
+            select(Files.id).join(Conversations, Files.conversation_id == Conversations.id).where(Conversations.user == 2)
+        ).scalar()
+
+    rows = [json.loads(line) for line in client.get(f"/app/export/files?file_id={file_id}").get_data().splitlines()]
+    assert [(row["file_id"], row["text"]) for row in rows] == [(file_id, text)]
+    # Other users' files are never exported
+    assert client.get(f"/app/export/files?file_id={other_file_id}").get_data() == b""
+
+    assert client.get("/app/export/files?format=xml").status_code == 400
+    assert client.get("/app/export/files?start=yesterday").status_code == 400
+    assert client.get("/app/export/passwords").status_code == 404
+    print("✅ Files export filtered by file id; invalid formats, dates and exports rejected.")
+
+
+def test_csv_cells_are_not_run_as_formulas():
+    rows = [(1, "=HYPERLINK(\"http://evil.example\")", "+1 555 0100", "-2", "@SUM(A1)", "Python, SQL", None)]
+    lines = "".join(encode_csv(("id", "a", "b", "c", "d", "e", "f"), rows))
+    assert list(csv.reader(io.StringIO(lines)))[1] == [
+        "1", "'=HYPERLINK(\"http://evil.example\")", "'+1 555 0100", "'-2", "'@SUM(A1)", "Python, SQL", "",
+    ]
+    print("✅ CSV cells starting with =, +, - or @ are escaped with a leading quote.")
+
+
+def test_export_runs_in_constant_memory(tmp_path):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "big.db"),
+        "SECRET_KEY": "export-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+    })
+    seed_database(users=20, conversations_per_user=1000, files_per_conversation=0, seed=5, app=app)
+
+    with app.app_context():
+        tracemalloc.start()
+        size = rows = 0
+        for chunk in stream_export("conversations", "csv", batch_rows=500):
+            size += len(chunk)
+            rows += chunk.count(b"\n")
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    assert rows >= 20000
+    assert peak < size / 5, f"peak {peak} bytes for {size} bytes exported"
+    print(f"✅ Exported {rows} rows ({size / 1e6:.1f} MB) with a {peak / 1e6:.2f} MB memory peak.")
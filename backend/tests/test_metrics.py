@@ -0,0 +1,105 @@
+import os
+import sys
+import subprocess
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend import create_app
+from backend.utils.metrics import Counter, Histogram, Registry, RETIRED_SNAPSHOT, percentile
+
+WORKER = """
+import sys
+from backend.utils.metrics import Counter, Histogram, Registry
+registry = Registry()
+counter = registry.register(Counter("t_requests_total", "Requests.", ("endpoint",)))
+hist = registry.register(Histogram("t_seconds", "Timings.", buckets=(1.0,)))
+registry.share_through(sys.argv[1])
+counter.inc(5, endpoint="chat")
+hist.observe(0.5)
+registry.write_snapshot()
+"""
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    hist = registry.register(Histogram("t_stage_seconds", "Stage timings.", ("stage",), buckets=(0.1, 1.0)))
+    hist.observe(0.05, stage="db_lookup")
+    hist.observe(0.5, stage="db_lookup")
+    hist.observe(5.0, stage="db_lookup")
+
+    text = registry.render()
+    assert "# TYPE t_stage_seconds histogram" in text
+    assert 't_stage_seconds_bucket{stage="db_lookup",le="0.1"} 1' in text
+    assert 't_stage_seconds_bucket{stage="db_lookup",le="1.0"} 2' in text
+    assert 't_stage_seconds_bucket{stage="db_lookup",le="+Inf"} 3' in text
+    assert 't_stage_seconds_count{stage="db_lookup"} 3' in text
+    print("✅ Histogram buckets are cumulative and end with +Inf.")
+
+
+def test_counter_escapes_label_values():
+    registry = Registry()
+    counter = registry.register(Counter("t_requests_total", "Requests.", ("endpoint",)))
+    counter.inc(endpoint='chat"x')
+    counter.inc(2, endpoint='chat"x')
+
+    assert 't_requests_total{endpoint="chat\\"x"} 3' in registry.render()
+    print("✅ Counter label values are escaped.")
+
+
+def test_percentile_uses_nearest_rank():
+    assert percentile([], 50) == 0.0
+    assert percentile([1, 2], 50) == 1
+    assert percentile(list(range(100)), 95) == 94
+    assert percentile(list(range(100)), 99) == 98
+    assert percentile(list(range(100)), 100) == 99
+    assert percentile([3, 1, 2], 0) == 1
+    # pct / 100 * n rounds up past the whole number for these
+    assert [percentile(list(range(100)), pct) for pct in (7, 29, 57)] == [6, 28, 56]
+    print("✅ Percentiles use the nearest rank, also when pct * n is a whole number.")
+
+
+def test_workers_are_merged_through_the_metrics_dir(tmp_path):
+    registry = Registry()
+    counter = registry.register(Counter("t_requests_total", "Requests.", ("endpoint",)))
+    hist = registry.register(Histogram("t_seconds", "Timings.", buckets=(1.0,)))
+    registry.share_through(str(tmp_path))
+    counter.inc(2, endpoint="chat")
+    hist.observe(3.0)
+
+    # Two other workers record and exit (as recycled gunicorn workers do)
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", WORKER, str(tmp_path)], cwd=project_root, check=True)
+
+    for _ in range(2):
+        text = registry.render()
+        assert 't_requests_total{endpoint="chat"} 12' in text
+        assert 't_seconds_bucket{le="1.0"} 2' in text
+        assert 't_seconds_count 3' in text
+    snapshots = sorted(name for name in os.listdir(tmp_path) if name.endswith(".json"))
+    assert len(snapshots) == 2 and RETIRED_SNAPSHOT in snapshots
+    print("✅ A scrape of one worker sums all workers; exited workers are folded in once.")
+
+
+def test_metrics_endpoint_is_local_only_without_a_token(tmp_path):
+    def make_app(token):
+        return create_app({
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+            "SECRET_KEY": "metrics-test-key",
+            "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+            "FORCE_HTTPS": False,
+            "METRICS_TOKEN": token,
+        })
+
+    client = make_app("").test_client()
+    assert client.get("/metrics", environ_base={"REMOTE_ADDR": "127.0.0.1"}).status_code == 200
+    assert client.get("/metrics", environ_base={"REMOTE_ADDR": "203.0.113.7"}).status_code == 403
+    assert client.get("/metrics", environ_base={"REMOTE_ADDR": "127.0.0.1"},
+                      headers={"X-Forwarded-For": "203.0.113.7"}).status_code == 403
+
+    client = make_app("s3cret").test_client()
+    remote = {"REMOTE_ADDR": "203.0.113.7"}
+    assert client.get("/metrics", environ_base=remote).status_code == 401
+    assert client.get("/metrics", environ_base=remote, headers={"Authorization": "Bearer s3cret"}).status_code == 200
+    print("✅ /metrics answers local scrapes, or remote ones with the token.")
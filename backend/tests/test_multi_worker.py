@@ -0,0 +1,117 @@
+import os
+import sys
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from backend import create_app, db
+from backend.database.models import User
+from backend.utils.secret_key import _dev_key
+
+TEST_EMAIL = "worker.test@example.com"
+TEST_PASSWORD = "WorkerPassword123!"
+SHARED_KEY = "multi-worker-smoke-test-key"
+
+
+def make_worker(tmp_path, backend, secret_key=SHARED_KEY, proxy_hops=0):
+    """A separate app instance stands in for a separate gunicorn worker."""
+    return create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SECRET_KEY": secret_key,
+        "SESSION_BACKEND": backend,
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "SESSION_SQLITE_PATH": str(tmp_path / "sessions.db"),
+        "FORCE_HTTPS": False,
+        "TRUSTED_PROXY_HOPS": proxy_hops,
+    })
+
+
+def add_user(app):
+    with app.app_context():
+        db.session.add(User(
+            email=TEST_EMAIL,
+            username="workertest1",
+            password=generate_password_hash(TEST_PASSWORD, method="pbkdf2:sha256"),
+        ))
+        db.session.commit()
+
+
+def copy_cookies(source, target):
+    """Hand the browser's cookies from one worker's client to the other's."""
+    for name in ("session", "remember_token"):
+        cookie = source.get_cookie(name)
+        if cookie is not None:
+            target.set_cookie(cookie.key, cookie.value, domain=cookie.domain, path=cookie.path)
+
+
+@pytest.mark.parametrize("backend", ["filesystem", "sqlite", "cookie"])
+def test_login_survives_round_robin(tmp_path, backend):
+    workers = [make_worker(tmp_path, backend), make_worker(tmp_path, backend)]
+    add_user(workers[0])
+    clients = [worker.test_client() for worker in workers]
+
+    resp = clients[0].post("/login", data={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    assert resp.status_code == 302 and resp.headers["Location"].endswith("/app/dashboard")
+    print(f"✅ [{backend}] Logged in on worker 0.")
+
+    # Round-robin the same browser session across both workers
+    for i in range(6):
+        source, target = clients[i % 2], clients[(i + 1) % 2]
+        copy_cookies(source, target)
+        resp = target.get("/app/dashboard")
+        assert resp.status_code == 200, f"request {i} lost the login on worker {(i + 1) % 2}"
+        assert re.search(r'data-conversation-id="\d+"', resp.text)
+    print(f"✅ [{backend}] Login survived 6 round-robin requests across 2 workers.")
+
+
+def test_login_lost_with_per_worker_keys(tmp_path):
+    """What happened with os.urandom(24) per worker: the other worker rejects the cookie."""
+    workers = [make_worker(tmp_path, "cookie", "key-a"), make_worker(tmp_path, "cookie", "key-b")]
+    add_user(workers[0])
+    clients = [worker.test_client() for worker in workers]
+
+    clients[0].post("/login", data={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    copy_cookies(clients[0], clients[1])
+    resp = clients[1].get("/app/dashboard")
+    assert resp.status_code == 302
+    print("✅ Different keys per worker drop the login, as expected.")
+
+
+def test_login_throttle_is_per_forwarded_client(tmp_path, monkeypatch):
+    """Behind the proxy every request comes from its address; the limit must follow X-Forwarded-For."""
+    monkeypatch.setattr("backend.views.routes.LOGIN_ATTEMPTS_PER_IP", 2)
+    worker = make_worker(tmp_path, "cookie", proxy_hops=1)
+    add_user(worker)
+    client = worker.test_client()
+
+    def login(client_ip):
+        return client.post("/login", data={"email": TEST_EMAIL, "password": "wrong"},
+                           headers={"X-Forwarded-For": client_ip},
+                           environ_base={"REMOTE_ADDR": "10.0.0.1"})
+
+    assert [login("203.0.113.7").status_code for _ in range(3)] == [302, 302, 429]
+    assert login("198.51.100.23").status_code == 302
+    print("✅ A throttled client behind the proxy doesn't lock out another client.")
+
+
+def test_dev_key_is_shared_by_racing_workers(tmp_path):
+    """Workers booting together all read the one key that won, never an empty file."""
+    path = str(tmp_path / ".secret_key")
+    barrier = threading.Barrier(8)
+
+    def boot():
+        barrier.wait()
+        return _dev_key(path)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        keys = list(pool.map(lambda _: boot(), range(8)))
+    assert len(set(keys)) == 1 and len(keys[0]) == 64
+    assert os.listdir(tmp_path) == [".secret_key"]
+    print("✅ 8 workers racing at boot agreed on one development key.")
@@ -0,0 +1,149 @@
+import os
+import re
+import sys
+import random
+from io import BytesIO
+from datetime import datetime
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+from fpdf import FPDF
+
+from backend import create_app, db
+from backend.api import chat as chat_module
+from backend.database.models import FileSummary, User
+from backend.utils.near_duplicates import (
+    MAX_CANDIDATES, Fingerprint, band_keys, fingerprint_document, minhash, shingle_hashes, similarity, store_fingerprint,
+)
+from backend.utils.passwords import hash_password
+
+TEST_EMAIL = "dupes.test@example.com"
+TEST_PASSWORD = "DupesPassword123!"
+VOCABULARY = ("python sql team lead backend data warehouse cloud migration api design mentoring "
+              "kubernetes testing agile delivery customers analytics pipeline reporting hiring").split()
+
+
+def cv_words(seed, n=400):
+    rng = random.Random(seed)
+    return [rng.choice(VOCABULARY) + str(rng.randrange(50)) for _ in range(n)]
+
+
+def agency_version(words, seed, every=60):
+    """The same CV with a word changed every `every` words, as re-typed by another agency."""
+    rng = random.Random(seed)
+    return [rng.choice(VOCABULARY) if i % every == every // 2 else word for i, word in enumerate(words)]
+
+
+def make_pdf(words):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=10)
+    for i in range(0, len(words), 12):
+        pdf.cell(0, 6, " ".join(words[i:i + 12]), ln=1)
+    return pdf.output(dest="S").encode("latin1")
+
+
+def test_signatures_estimate_jaccard():
+    original = cv_words(1)
+    variant = agency_version(original, 2)
+    a, b = shingle_hashes(" ".join(original)), shingle_hashes(" ".join(variant))
+    jaccard = len(a & b) / len(a | b)
+    sig_a, sig_b, sig_other = minhash(a), minhash(b), minhash(shingle_hashes(" ".join(cv_words(3))))
+
+    assert abs(similarity(sig_a, sig_b) - jaccard) < 0.1
+    assert similarity(sig_a, sig_other) < 0.1
+    assert set(band_keys(sig_a)) & set(band_keys(sig_b))
+    assert not set(band_keys(sig_a)) & set(band_keys(sig_other))
+    assert minhash(set()) is None
+    print(f"✅ MinHash estimate {similarity(sig_a, sig_b):.2f} for a true Jaccard of {jaccard:.2f}.")
+
+
+def test_strong_match_wins_over_many_weak_candidates(tmp_path):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SECRET_KEY": "dupes-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+    })
+    text = " ".join(cv_words(1))
+    signature = minhash(shingle_hashes(text))
+    keys = band_keys(signature)
+    rows = len(signature) // len(keys)
+    # Weak candidates share only the band with the lowest key (the one an index scan reaches first);
+    # the strong match shares every band but that one
+    shared = range(keys.index(min(keys)) * rows, (keys.index(min(keys)) + 1) * rows)
+    rng = random.Random(7)
+
+    def variant(keep_shared):
+        return tuple(value if (i in shared) == keep_shared else rng.getrandbits(64) for i, value in enumerate(signature))
+
+    with app.app_context():
+        for file_id in range(1, MAX_CANDIDATES + 21):
+            store_fingerprint(1, file_id, Fingerprint(variant(keep_shared=True)))
+        strong = variant(keep_shared=False)
+        store_fingerprint(1, 1000, Fingerprint(strong))
+        db.session.commit()
+
+        fingerprint = fingerprint_document(1, text)
+    assert fingerprint.duplicate_of == 1000
+    assert fingerprint.similarity >= 0.8
+    print(f"✅ Strong match ({fingerprint.similarity:.2f}) found among {MAX_CANDIDATES + 20} weak candidates.")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # Summaries are written by hand below instead of by the background job
+    monkeypatch.setattr(chat_module, "enqueue_summary", lambda app, file_id: None)
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SECRET_KEY": "dupes-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+        "NEAR_DUPLICATES": True,
+        "PRECOMPUTE_SUMMARIES": True,
+    })
+    with app.app_context():
+        db.session.add(User(email=TEST_EMAIL, username="dupes01", password=hash_password(TEST_PASSWORD)))
+        db.session.commit()
+    client = app.test_client()
+    client.application = app
+    client.post("/login", data={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    return client
+
+
+def upload(client, words):
+    conversation_id = re.search(r'data-conversation-id="(\d+)"', client.get("/app/dashboard").text).group(1)
+    resp = client.post("/app/upload", data={
+        "conversation_id": conversation_id,
+        "files": (BytesIO(make_pdf(words)), "cv.pdf", "application/pdf"),
+    }, content_type="multipart/form-data")
+    assert resp.status_code == 200, resp.get_json()
+    return conversation_id, resp.get_json()
+
+
+def test_near_duplicate_uploads_are_linked_and_reuse_the_summary(client):
+    original_words = cv_words(1)
+    _, original = upload(client, original_words)
+    assert original["duplicate_of"] is None
+
+    conversation_id, variant = upload(client, agency_version(original_words, 2))
+    assert variant["duplicate_of"] == original["file_id"]
+    assert variant["similarity"] >= 0.8
+    # A copy of the copy still points at the first version; an unrelated CV isn't linked
+    assert upload(client, agency_version(original_words, 4))[1]["duplicate_of"] == original["file_id"]
+    assert upload(client, cv_words(5))[1]["duplicate_of"] is None
+
+    with client.application.app_context():
+        assert db.session.query(FileSummary).filter_by(file_id=variant["file_id"]).count() == 0
+        summary = db.session.query(FileSummary).filter_by(file_id=original["file_id"]).one()
+        summary.status, summary.summary, summary.updated_at = "ready", "Stored summary of the original.", datetime.now()
+        db.session.commit()
+
+    resp = client.post("/app/chat", json={"hints": "Backend", "question": "Can you summarize this candidate",
+                                          "file_id": variant["file_id"], "conversation_id": conversation_id})
+    assert resp.status_code == 200, resp.get_json()
+    assert resp.get_json()["assistant_response"] == "Stored summary of the original."
+    print(f"✅ Near-duplicate ({variant['similarity']:.2f}) linked to file {original['file_id']}, summary reused.")
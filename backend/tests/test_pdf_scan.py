@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+from io import BytesIO
+
+import pytest
+from fpdf import FPDF
+import pypdf
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+from werkzeug.datastructures import FileStorage
+
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.utils import pdf_scan
+from backend.utils.file_utils import extract_document
+from backend.utils.pdf_scan import classify_pdf, sample_indexes
+
+SAMPLE_PNG = os.path.join(os.path.dirname(__file__), "sample.png")
+
+
+def make_pdf(pages: str) -> bytes:
+    """One page per character: "t" text, "i" image, "b" blank."""
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer)
+    for kind in pages:
+        if kind == "t":
+            c.setFont("Helvetica", 12)
+            c.drawString(72, 720, "Senior engineer, Python, SQL, 8 years of experience.")
+        elif kind == "i":
+            c.drawImage(SAMPLE_PNG, 50, 300, width=400, height=400)
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def upload(data: bytes) -> FileStorage:
+    return FileStorage(stream=BytesIO(data), filename="cv.pdf", content_type="application/pdf")
+
+
+@pytest.mark.parametrize("pages, kind", [
+    ("ttt", "text"),
+    ("iii", "image"),
+    ("titi", "mixed"),
+    ("bb", "empty"),
+])
+def test_classification(pages, kind):
+    scan = classify_pdf(PdfReader(BytesIO(make_pdf(pages))))
+    assert scan.kind == kind
+    assert scan.sampled == len(pages)
+    print(f"✅ {pages} classified as {kind}.")
+
+
+def test_sample_spans_the_document():
+    assert sample_indexes(3, 5) == [0, 1, 2]
+    assert sample_indexes(100, 5) == [0, 25, 50, 74, 99]
+    assert sample_indexes(100, 1) == [0]
+    print("✅ Sampled pages include the first and last page.")
+
+
+def test_image_only_pdf_fails_before_extraction(monkeypatch):
+    extracted = []
+    monkeypatch.setattr("pypdf.PageObject.extract_text", lambda self, *a, **k: extracted.append(1) or "")
+    before = pdf_scan.PDF_SCANS.value(kind="image", outcome="rejected")
+
+    with pytest.raises(RuntimeError, match="No extractable text"):
+        extract_document(upload(make_pdf("i" * 20)))
+
+    assert extracted == []
+    assert pdf_scan.PDF_SCANS.value(kind="image", outcome="rejected") == before + 1
+    print("✅ Image-only PDF rejected by the pre-scan without extracting any page.")
+
+
+def test_mixed_pdf_extracts_every_page_and_records_parse_time(monkeypatch):
+    extract_text = pypdf.PageObject.extract_text
+    extracted = []
+    monkeypatch.setattr("pypdf.PageObject.extract_text",
+                        lambda self, *a, **k: extracted.append(1) or extract_text(self, *a, **k))
+    before = pdf_scan.PDF_SCANS.value(kind="mixed", outcome="extracted")
+
+    document = extract_document(upload(make_pdf("tiit")))
+
+    assert "Senior engineer" in document.text
+    # The heuristic only decides on the sample; it never hides a page from extraction
+    assert len(extracted) == 4
+    assert pdf_scan.PDF_SCANS.value(kind="mixed", outcome="extracted") == before + 1
+    assert pdf_scan.PARSE_SECONDS.value(kind="mixed", outcome="extracted") > 0
+    assert 0 <= pdf_scan.wasted_parse_share() < 1
+    print("✅ Mixed PDF extracted and its parse time recorded.")
+
+
+def test_prescan_is_cheaper_than_extraction():
+    reader = PdfReader(BytesIO(make_pdf("t" * 50)))
+    started = time.perf_counter()
+    classify_pdf(reader)
+    scan_seconds = time.perf_counter() - started
+
+    reader = PdfReader(BytesIO(make_pdf("t" * 50)))
+    started = time.perf_counter()
+    for page in reader.pages:
+        page.extract_text()
+    extract_seconds = time.perf_counter() - started
+
+    assert scan_seconds < extract_seconds
+    print(f"✅ Pre-scan {scan_seconds * 1000:.2f} ms vs extraction {extract_seconds * 1000:.2f} ms (50 pages).")
@@ -0,0 +1,38 @@
+import os
+import sys
+from types import SimpleNamespace
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.utils.metrics import CACHE_REQUESTS
+from backend.utils.prompts import build_messages, prompt_cache_key, record_prefix_cache
+
+DOCUMENT = "Jane Doe\nSenior engineer, Python, SQL, team lead, 8 years.\n" * 200
+
+
+def test_document_prefix_is_identical_across_turns():
+    first = build_messages("Focus on Python", "How many years of experience", DOCUMENT)
+    second = build_messages("Be brief", "Which companies", DOCUMENT)
+
+    assert first[:2] == second[:2]
+    assert DOCUMENT in first[1]["content"]
+    # Everything that varies comes after the document
+    assert "Focus on Python" not in first[0]["content"] + first[1]["content"]
+    assert first[-1]["content"] == "Question: How many years of experience?"
+    assert prompt_cache_key(DOCUMENT) == prompt_cache_key(DOCUMENT) != prompt_cache_key(DOCUMENT + " ")
+    print("✅ System prompt and document form a byte-identical prefix.")
+
+
+def test_cached_tokens_are_counted_as_prefix_hits():
+    hits = CACHE_REQUESTS.value(cache="llm_prefix", result="hit")
+    misses = CACHE_REQUESTS.value(cache="llm_prefix", result="miss")
+
+    usage = SimpleNamespace(prompt_tokens=2048, prompt_tokens_details=SimpleNamespace(cached_tokens=1920))
+    assert record_prefix_cache(usage) == (1920, 2048)
+    assert record_prefix_cache(SimpleNamespace(prompt_tokens=2048, prompt_tokens_details=None)) == (0, 2048)
+
+    assert CACHE_REQUESTS.value(cache="llm_prefix", result="hit") == hits + 1
+    assert CACHE_REQUESTS.value(cache="llm_prefix", result="miss") == misses + 1
+    print("✅ Prefix-cache hits and misses are counted from the usage field.")
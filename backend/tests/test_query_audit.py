@@ -0,0 +1,100 @@
+import os
+import re
+import sys
+from io import BytesIO
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+from fpdf import FPDF
+
+from backend import create_app, db
+from backend.database.models import User, Conversations, Files
+from backend.utils.passwords import hash_password
+from backend.utils.query_audit import capture_queries, explain
+
+TEST_EMAIL = "audit.test@example.com"
+TEST_PASSWORD = "AuditPassword123!"
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SECRET_KEY": "query-audit-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+        "QUERY_AUDIT": True,
+    })
+    with app.app_context():
+        db.session.add(User(email=TEST_EMAIL, username="audittest1", password=hash_password(TEST_PASSWORD)))
+        db.session.commit()
+    return app
+
+
+def make_pdf() -> bytes:
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=10)
+    pdf.cell(0, 6, "Senior engineer, Python, SQL, 8 years.", ln=1)
+    return pdf.output(dest="S").encode("latin1")
+
+
+def test_endpoint_query_budgets(app, max_queries, monkeypatch):
+    monkeypatch.setattr("backend.api.chat.assistant", lambda hints, question, content, cancel_check=None, deadline=None: "stub answer")
+    client = app.test_client()
+
+    with max_queries(1):
+        client.post("/login", data={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+
+    with max_queries(2):
+        resp = client.get("/app/dashboard")
+    assert resp.headers["X-Query-Count"] == "2"
+    conversation_id = re.search(r'data-conversation-id="(\d+)"', resp.text).group(1)
+
+    # conversation lookup + update, file insert, text stats and hash inserts
+    with max_queries(5):
+        resp = client.post("/app/upload", data={
+            "conversation_id": conversation_id,
+            "files": (BytesIO(make_pdf()), "cv.pdf", "application/pdf"),
+        }, content_type="multipart/form-data")
+    assert resp.status_code == 200
+
+    with max_queries(2):
+        resp = client.post("/app/chat", data={
+            "file_id": str(resp.json["file_id"]), "conversation_id": conversation_id,
+            "question": "What is the experience", "hints": "none",
+        })
+    assert resp.status_code == 200
+    print("✅ login, dashboard, upload and chat stay within their query budgets.")
+
+
+def test_lazy_relationship_shows_up_as_repeated_statement(app):
+    with app.app_context():
+        user_id = db.session.query(User.id).scalar()
+        for i in range(6):
+            conversation = Conversations(user=user_id, user_message="m", bot_message="b",
+                                         time_of_message=db.func.now(), hints="h")
+            conversation.files.append(Files(file_name=f"{i}.pdf", text_version_of_the_file="text"))
+            db.session.add(conversation)
+        db.session.commit()
+        db.session.expunge_all()
+
+        with capture_queries() as stats:
+            for conversation in Conversations.query.all():
+                conversation.files
+        assert stats.count == 7
+        [(statement, times)] = stats.repeated(5)
+        assert times == 6 and "FROM files" in statement
+    print("✅ N+1 on Conversations.files is reported as a repeated statement.")
+
+
+def test_explain_query_plan_uses_index(app):
+    with app.app_context():
+        conn = db.session.connection()
+        cursor = conn.connection.dbapi_connection.cursor()
+        plan = explain(conn, cursor, "SELECT * FROM files WHERE conversation_id = ?", (1,))
+    assert "ix_files_conversation_id" in plan
+    print("✅ EXPLAIN QUERY PLAN shows the index used by the lookup.")
@@ -0,0 +1,76 @@
+import os
+import sys
+from datetime import datetime, timedelta
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend import create_app, db
+from backend.database.models import User, Conversations, Files
+from backend.utils.retention import run_retention, read_archive, job_lock
+
+NOW = datetime(2025, 6, 15, 12, 0)
+
+
+def make_app(tmp_path):
+    return create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SECRET_KEY": "retention-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+    })
+
+
+def add_conversations(ages_in_days, text="x" * 20000):
+    user = User(email="retention@example.com", username="retention1", password="-")
+    db.session.add(user)
+    db.session.flush()
+    for age in ages_in_days:
+        conversation = Conversations(user=user.id, user_message=f"age {age}", bot_message="b",
+                                     time_of_message=NOW - timedelta(days=age), hints="h")
+        conversation.files.append(Files(file_name=f"{age}.pdf", text_version_of_the_file=text))
+        db.session.add(conversation)
+    db.session.commit()
+
+
+def test_old_conversations_are_archived_then_deleted(tmp_path):
+    app = make_app(tmp_path)
+    archive_dir = str(tmp_path / "archive")
+    with app.app_context():
+        add_conversations([1, 10, 40, 45, 80, 200])
+        counts = run_retention(days=30, archive_dir=archive_dir, batch_size=2, now=NOW)
+
+        assert counts["conversations"] == 4 and counts["files"] == 4
+        remaining = sorted(c.user_message for c in Conversations.query.all())
+        assert remaining == ["age 1", "age 10"]
+        assert Files.query.count() == 2
+
+    archives = sorted(os.listdir(archive_dir))
+    assert archives == [".lock", "conversations-2024-11.jsonl.gz", "conversations-2025-03.jsonl.gz",
+                        "conversations-2025-05.jsonl.gz"]
+    records = [r for name in archives[1:] for r in read_archive(os.path.join(archive_dir, name))]
+    assert sorted(r["user_message"] for r in records) == ["age 200", "age 40", "age 45", "age 80"]
+    assert all(len(r["files"]) == 1 and len(r["files"][0]["text_version_of_the_file"]) == 20000 for r in records)
+    print("✅ Old conversations and files are archived per month, then deleted in batches.")
+
+
+def test_incremental_vacuum_shrinks_the_file(tmp_path):
+    app = make_app(tmp_path)
+    with app.app_context():
+        assert db.session.execute(db.text("PRAGMA auto_vacuum")).scalar() == 2
+        add_conversations(range(40, 140))
+        size_before = os.path.getsize(tmp_path / "app.db")
+
+        counts = run_retention(days=30, archive_dir=str(tmp_path / "archive"), now=NOW)
+        assert counts["vacuumed_pages"] > 0
+        assert db.session.execute(db.text("PRAGMA freelist_count")).scalar() == 0
+    assert os.path.getsize(tmp_path / "app.db") < size_before / 4
+    print("✅ Incremental vacuum returns freed pages to the filesystem.")
+
+
+def test_job_lock_is_exclusive(tmp_path):
+    with job_lock(str(tmp_path)) as first:
+        with job_lock(str(tmp_path)) as second:
+            assert first and not second
+    print("✅ Only one process runs the retention job at a time.")
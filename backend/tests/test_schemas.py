@@ -0,0 +1,97 @@
+import os
+import re
+import sys
+import json
+from io import BytesIO
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+from fpdf import FPDF
+
+from backend import create_app, db
+from backend.api.schemas import ChatRequest, InvalidPayload, decode
+from backend.configs.config import MAX_HINTS_LENGTH
+from backend.database.models import User
+from backend.utils.passwords import hash_password
+
+TEST_EMAIL = "schema.test@example.com"
+TEST_PASSWORD = "SchemaPassword123!"
+
+VALID = {"hints": "Backend focus", "question": "Years of Python", "file_id": "3", "conversation_id": 7}
+
+
+def test_chat_request_decodes_and_sanitizes_in_one_pass():
+    payload = decode(ChatRequest, json.dumps({**VALID, "question": "  <b>Python</b> "}).encode())
+    assert payload.file_id == 3 and payload.conversation_id == 7
+    assert payload.question == "&lt;b&gt;Python&lt;/b&gt;"
+    print("✅ String and int ids accepted, question sanitized.")
+
+
+@pytest.mark.parametrize("body, fragment", [
+    ({**VALID, "hints": ""}, "$.hints"),
+    ({**VALID, "hints": "x" * (MAX_HINTS_LENGTH + 1)}, "$.hints"),
+    ({**VALID, "file_id": "abc"}, "$.file_id"),
+    ({**VALID, "conversation_id": -1}, "$.conversation_id"),
+    ({k: v for k, v in VALID.items() if k != "question"}, "question"),
+    ({**VALID, "question": "A" * 200}, "repetitive payload"),
+])
+def test_invalid_chat_requests(body, fragment):
+    with pytest.raises(InvalidPayload, match=re.escape(fragment)):
+        decode(ChatRequest, json.dumps(body).encode())
+    print(f"✅ Rejected: {fragment}")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.api.chat.assistant", lambda hints, question, content, cancel_check=None, deadline=None: "stub answer")
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SECRET_KEY": "schema-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+    })
+    with app.app_context():
+        db.session.add(User(email=TEST_EMAIL, username="schematest1", password=hash_password(TEST_PASSWORD)))
+        db.session.commit()
+    client = app.test_client()
+    client.post("/login", data={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    return client
+
+
+def upload(client):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=10)
+    pdf.cell(0, 6, "Senior engineer, Python, SQL, 8 years.", ln=1)
+    conversation_id = re.search(r'data-conversation-id="(\d+)"', client.get("/app/dashboard").text).group(1)
+    resp = client.post("/app/upload", data={
+        "conversation_id": conversation_id,
+        "files": (BytesIO(pdf.output(dest="S").encode("latin1")), "cv.pdf", "application/pdf"),
+    }, content_type="multipart/form-data")
+    assert resp.status_code == 200, resp.text
+    return resp.get_json()["file_id"], conversation_id
+
+
+def test_routes_use_one_error_format(client):
+    file_id, conversation_id = upload(client)
+
+    resp = client.post("/app/chat", json={**VALID, "file_id": file_id, "conversation_id": conversation_id})
+    assert resp.status_code == 200 and resp.mimetype == "application/json"
+    assert resp.get_json() == {"assistant_response": "stub answer", "conversation_id": resp.get_json()["conversation_id"],
+                               "status": "success"}
+
+    for resp in (
+        client.post("/app/chat", data="{not json", content_type="application/json"),
+        client.post("/app/chat", json={**VALID, "file_id": "x"}),
+        client.post("/app/chat", data={"question": "Years of Python"}),
+        client.post("/app/upload", data={"conversation_id": "abc", "files": (BytesIO(b"%PDF-"), "cv.pdf")},
+                    content_type="multipart/form-data"),
+    ):
+        body = resp.get_json()
+        assert resp.status_code == 400, body
+        assert set(body) == {"status", "message"} and body["status"] == "error"
+        assert body["message"].startswith("Invalid request")
+    print("✅ Success and error bodies are encoded from the schemas.")
@@ -0,0 +1,111 @@
+import os
+import re
+import sys
+from io import BytesIO
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+from fpdf import FPDF
+
+np = pytest.importorskip("numpy")
+
+from backend import create_app, db
+from backend.database.models import User
+from backend.utils import semantic_index
+from backend.utils.passwords import hash_password
+from backend.utils.semantic_index import HashedEmbedder, UserIndex, chunk_spans
+
+ML_CV = "Jane Doe. Senior ML engineer: built recommendation models in Python and PyTorch. " * 20
+AI_CV = "John Roe. Researcher in machine learning and deep learning, Python, model training. " * 20
+CHEF_CV = "Anna Smith. Head chef: French cuisine, pastry, kitchen staff management, menus. " * 20
+
+
+def test_abbreviations_match_their_expansion():
+    embedder = HashedEmbedder(256)
+    ml, spelled_out, cooking = embedder.embed(["ML", "machine learning", "pastry chef"])
+    assert float(ml @ spelled_out) > 0.99
+    assert abs(float(ml @ cooking)) < 0.5
+    print("✅ 'ML' and 'machine learning' embed to the same vector.")
+
+
+def test_incremental_append_and_search(tmp_path):
+    index = UserIndex(1, root=str(tmp_path), embedder=HashedEmbedder(256))
+    index.append(10, ML_CV)
+    size_after_first = os.path.getsize(tmp_path / "1" / "vectors.f32")
+    index.append(11, AI_CV)
+    index.append(12, CHEF_CV)
+    vectors, meta = index.load()
+
+    # Appends only add rows: the first document's bytes are untouched
+    assert os.path.getsize(tmp_path / "1" / "vectors.f32") > size_after_first
+    assert vectors.dtype == np.float32 and vectors.shape == (len(meta), 256)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+
+    [(file_id, _)] = index.similar_files(10, k=1)
+    assert file_id == 11
+    query = index.embedder.embed(["kitchen and menus"])[0]
+    assert index.search(query, k=1)[0][1] == 12
+    print("✅ Appended documents are searchable and the ML CVs are each other's nearest neighbours.")
+
+
+def test_half_written_append_is_ignored_and_repaired(tmp_path):
+    index = UserIndex(1, root=str(tmp_path), embedder=HashedEmbedder(64))
+    index.append(10, ML_CV)
+    rows = len(index.load()[1])
+    with open(tmp_path / "1" / "vectors.f32", "ab") as f:
+        f.write(b"\0" * 100)   # crash in the middle of the next append
+
+    assert len(index.load()[1]) == rows
+    index.append(11, AI_CV)
+    vectors, meta = index.load()
+    assert set(meta[:, 0].tolist()) == {10, 11}
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    print("✅ A torn append is invisible to readers and trimmed before the next one.")
+
+
+def test_chunks_cover_the_text():
+    text = "word " * 1000
+    spans = chunk_spans(text, size=200, overlap=50)
+    assert spans[0][0] == 0 and spans[-1][1] == len(text)
+    assert all(b[0] < a[1] for a, b in zip(spans, spans[1:]))
+    print("✅ Chunks overlap and cover the whole text.")
+
+
+def test_similar_candidates_endpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic_index, "SEMANTIC_INDEX_DIR", str(tmp_path / "index"))
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SECRET_KEY": "semantic-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+        "SEMANTIC_INDEX": True,
+    })
+    with app.app_context():
+        db.session.add(User(email="semantic@example.com", username="semantic1", password=hash_password("Semantic123!")))
+        db.session.commit()
+    client = app.test_client()
+    client.post("/login", data={"email": "semantic@example.com", "password": "Semantic123!"})
+
+    file_ids = {}
+    for name, text in (("ml", ML_CV), ("ai", AI_CV), ("chef", CHEF_CV)):
+        pdf = FPDF()
+        pdf.add_page()
+        pdf.set_font("Arial", size=10)
+        pdf.multi_cell(0, 6, text)
+        conversation_id = re.search(r'data-conversation-id="(\d+)"', client.get("/app/dashboard").text).group(1)
+        resp = client.post("/app/upload", data={
+            "conversation_id": conversation_id,
+            "files": (BytesIO(pdf.output(dest="S").encode("latin1")), f"{name}.pdf", "application/pdf"),
+        }, content_type="multipart/form-data")
+        file_ids[name] = resp.json["file_id"]
+    # The single index worker runs jobs in order: wait for the uploads' jobs
+    semantic_index._executor.submit(lambda: None).result(timeout=10)
+
+    resp = client.get(f"/app/files/{file_ids['ml']}/similar?k=2")
+    assert resp.status_code == 200
+    assert [m["file_name"] for m in resp.json["similar"]] == ["ai.pdf", "chef.pdf"]
+    assert client.get("/app/files/9999/similar").status_code == 404
+    print("✅ /app/files/<id>/similar ranks the other ML CV first.")
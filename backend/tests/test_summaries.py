@@ -0,0 +1,130 @@
+import os
+import re
+import sys
+import time
+from io import BytesIO
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+from fpdf import FPDF
+
+from backend import create_app, db
+from backend.database.models import User, Files, FileSummary
+from backend.utils.passwords import hash_password
+from backend.utils.summaries import is_summary_question, is_broad_question, mentions_summary
+
+TEST_EMAIL = "summary.test@example.com"
+TEST_PASSWORD = "SummaryPassword123!"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_assistant(hints, question, file_content, cancel_check=None, deadline=None):
+        calls.append((question, file_content))
+        return f"answer from {len(file_content)} chars"
+
+    monkeypatch.setattr("backend.utils.summaries.assistant", fake_assistant)
+    monkeypatch.setattr("backend.api.chat.assistant", fake_assistant)
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "app.db"),
+        "SECRET_KEY": "summary-test-key",
+        "SESSION_FILE_DIR": str(tmp_path / "flask_session"),
+        "FORCE_HTTPS": False,
+        "PRECOMPUTE_SUMMARIES": True,
+    })
+    with app.app_context():
+        db.session.add(User(email=TEST_EMAIL, username="summarytest1", password=hash_password(TEST_PASSWORD)))
+        db.session.commit()
+    client = app.test_client()
+    client.post("/login", data={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    client.calls = calls
+    client.application = app
+    return client
+
+
+def upload(client):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=10)
+    for line in range(30):
+        pdf.cell(0, 6, f"Line {line}: Senior engineer, Python, SQL, team lead, 8 years.", ln=1)
+    resp = client.get("/app/dashboard")
+    conversation_id = re.search(r'data-conversation-id="(\d+)"', resp.text).group(1)
+    resp = client.post("/app/upload", data={
+        "conversation_id": conversation_id,
+        "files": (BytesIO(pdf.output(dest="S").encode("latin1")), "cv.pdf", "application/pdf"),
+    }, content_type="multipart/form-data")
+    return conversation_id, resp.json["file_id"]
+
+
+def wait_for_summary(app, file_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with app.app_context():
+            status = db.session.execute(db.select(FileSummary.status).filter_by(file_id=file_id)).scalar()
+        if status != "pending":
+            return status
+        time.sleep(0.02)
+    return "pending"
+
+
+def ask(client, conversation_id, file_id, question):
+    return client.post("/app/chat", data={
+        "file_id": str(file_id), "conversation_id": conversation_id, "question": question, "hints": "none",
+    }).json["assistant_response"]
+
+
+def test_summary_question_is_served_from_storage(client):
+    conversation_id, file_id = upload(client)
+    assert wait_for_summary(client.application, file_id) == "ready"
+    summary_calls = len(client.calls)
+    assert summary_calls == 1
+
+    stored = ask(client, conversation_id, file_id, "Can you summarize this candidate")
+    assert stored.startswith("answer from ")
+    assert len(client.calls) == summary_calls
+    print("✅ 'Summarize' is answered from the stored summary without an LLM call.")
+
+    ask(client, conversation_id, file_id, "Which databases has the candidate used")
+    assert len(client.calls) == summary_calls + 1
+    assert len(client.calls[-1][1]) > len(stored)
+    print("✅ Other questions still get the full document.")
+
+
+@pytest.mark.parametrize("question", [
+    "Summarize their Python experience",
+    "Does the overview mention Kubernetes?",
+])
+def test_mention_only_question_gets_the_full_document(client, question):
+    conversation_id, file_id = upload(client)
+    assert wait_for_summary(client.application, file_id) == "ready"
+    with client.application.app_context():
+        summary = db.session.execute(db.select(FileSummary.summary).filter_by(file_id=file_id)).scalar()
+        full_text = db.session.execute(db.select(Files.text_version_of_the_file).filter_by(id=file_id)).scalar()
+    summary_calls = len(client.calls)
+
+    ask(client, conversation_id, file_id, question)
+    assert client.calls[summary_calls:] == [(question, full_text)]
+    print(f"✅ '{question}' goes to the LLM with the full document.")
+
+    client.application.config["SUMMARY_AS_CONTEXT"] = True
+    ask(client, conversation_id, file_id, question)
+    assert client.calls[-1] == (question, summary)
+    print(f"✅ With SUMMARY_AS_CONTEXT, '{question}' gets the summary as context.")
+
+
+def test_question_classification():
+    assert is_summary_question("Give me a quick overview")
+    assert is_summary_question("Summarise the CV please")
+    assert not is_summary_question("How many years of Python?")
+    assert not is_summary_question("Summarize their Python experience")
+    assert not is_summary_question("Does the overview mention Kubernetes?")
+    assert mentions_summary("Does the overview mention Kubernetes?")
+    assert is_broad_question("What are the candidate's main strengths?")
+    assert not is_broad_question("Which university did she attend?")
+    print("✅ Summary and broad questions are recognised.")
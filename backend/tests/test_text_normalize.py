@@ -0,0 +1,63 @@
+import os
+import sys
+# make project root (parent of 'backend') available on sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.utils.text_normalize import normalize_pages
+
+DISCLAIMER = "This document is confidential and intended solely for the recruiting team."
+
+
+BODY = [
+    "Senior   data    engineer at Acme since 2019",
+    "Built large-scale data pipe-\nlines for analytics",
+    "Led a team of five engineers",
+    "Migrated the warehouse to the cloud",
+    "Mentored junior developers",
+    "Speaker at PyCon about streaming",
+    "Maintains an open source ETL library",
+    "Fluent in English and German",
+    "Master of Science in Computer Science",
+    "Hobbies: climbing and chess",
+]
+
+
+def make_pages(n):
+    return [
+        f"Jane Doe - Curriculum Vitae\n"
+        f"{BODY[page % len(BODY)]}\n"
+        f"{BODY[(page + 5) % len(BODY)]}\n\n"
+        f"{DISCLAIMER}\n\n"
+        f"Page {page} of {n}"
+        for page in range(1, n + 1)
+    ]
+
+
+def test_headers_footers_and_page_numbers_are_stripped():
+    result = normalize_pages(make_pages(5))
+    text = result.text
+
+    assert text.count("Jane Doe - Curriculum Vitae") == 1
+    assert "Page " not in text
+    assert "Senior data engineer at Acme since 2019" in text
+    assert "Built large-scale data pipelines" in text and "pipe-" not in text
+    assert text.count(DISCLAIMER) == 1
+    assert "\n\n\n" not in text
+    print("✅ Repeated headers, page numbers, hyphenation and boilerplate are removed.")
+
+
+def test_reduction_is_reported():
+    result = normalize_pages(make_pages(10))
+    assert result.raw_chars == sum(len(p) for p in make_pages(10))
+    assert result.chars == len(result.text) < result.raw_chars
+    assert 0.3 < result.char_reduction < 1
+    assert result.tokens < result.raw_tokens and result.token_reduction > 0.3
+    print(f"✅ Reduction reported: -{result.char_reduction:.0%} chars, -{result.token_reduction:.0%} tokens.")
+
+
+def test_short_documents_keep_their_content():
+    result = normalize_pages(["Name: John Roe\n2019\nPython developer\n1"])
+    assert result.text == "Name: John Roe\n2019\nPython developer"
+    print("✅ Years survive; a bare page number is dropped.")
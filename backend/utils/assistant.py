@@ -1,16 +1,47 @@
 import time
 import os
+import logging
+from itertools import chain
 from openai import OpenAI, RateLimitError, APIError
 
+from backend.configs.config import (
+    ASSISTANT_STUB, ASSISTANT_STUB_LATENCY_MS, OPENAI_PROMPT_CACHE_KEY, LLM_TIMEOUT_SECONDS, LLM_HEDGING
+)
+from backend.utils.metrics import timed, observe_stage, record_tokens
+from backend.utils.disconnect import ClientDisconnected
+from backend.utils.deadlines import Deadline, DeadlineExceeded, HedgePolicy, race
+from backend.utils.prompts import build_messages, prompt_cache_key, record_prefix_cache
+
 # Load .env
 from dotenv import load_dotenv
 load_dotenv()
 
-OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY").strip()
-OPENAI_MODEL = os.environ.get("OPENAI_MODEL").strip()
+OPENAI_API_KEY = (os.environ.get("OPENAI_API_KEY") or "").strip()
+OPENAI_MODEL = (os.environ.get("OPENAI_MODEL") or "").strip()
+
+logger = logging.getLogger(__name__)
+
+# Shared by all requests of this process, so the hedge delay tracks recent upstream latency
+hedge_policy = HedgePolicy()
 
 
-def assistant(hints: str, question: str, file_content: str) -> str:
+def stub_response(question: str, file_content: str, cancel_check=None, deadline: Deadline = None) -> str:
+    """
+    Canned answer used instead of the OpenAI API when ASSISTANT_STUB is set.
+    Sleeps for ASSISTANT_STUB_LATENCY_MS to mimic upstream latency, in short
+    steps so that a cancel_check or deadline can interrupt it like a streamed answer.
+    """
+    done_at = time.perf_counter() + ASSISTANT_STUB_LATENCY_MS / 1000
+    while (remaining := done_at - time.perf_counter()) > 0:
+        if cancel_check is not None and cancel_check():
+            raise ClientDisconnected("llm_stream")
+        if deadline is not None:
+            deadline.check("llm_stream")
+        time.sleep(min(remaining, 0.05))
+    return f"[stub] Answer to '{question[:50]}' based on {len(file_content)} characters of file content."
+
+
+def assistant(hints: str, question: str, file_content: str, cancel_check=None, deadline: Deadline = None) -> str:
     """
     Calls the OpenAI chat completion API to generate an assistant response.
 
@@ -22,6 +53,16 @@ def assistant(hints: str, question: str, file_content: str) -> str:
         The user's question to be answered.
     file_content : str
         The extracted text content from the uploaded file.
+    cancel_check : callable, optional
+        Returns True when the answer is no longer wanted (the client
+        disconnected). Checked before the call, while waiting for the first
+        token and between streamed chunks; the stream is then closed, which
+        stops the completion upstream.
+    deadline : Deadline, optional
+        Time budget of the calling request (default LLM_TIMEOUT_SECONDS from now).
+        Upstream timeouts are derived from what is left of it. With
+        LLM_HEDGING, a second request is fired when the first is slow to
+        produce its first token, and the faster one is used.
 
     Returns
     -------
@@ -30,6 +71,10 @@ def assistant(hints: str, question: str, file_content: str) -> str:
 
     Raises
     ------
+    ClientDisconnected
+        If cancel_check returned True.
+    DeadlineExceeded
+        If the deadline passed before the answer was complete.
     RateLimitError
         If the OpenAI API rate limit is exceeded.
     APIError
@@ -37,34 +82,88 @@ def assistant(hints: str, question: str, file_content: str) -> str:
     Exception
         For any other unexpected errors.
     """
+    if cancel_check is not None and cancel_check():
+        raise ClientDisconnected("before_llm")
+
+    deadline = deadline or Deadline(LLM_TIMEOUT_SECONDS)
+
+    if ASSISTANT_STUB:
+        with timed("llm_total"):
+            return stub_response(question, file_content, cancel_check, deadline)
+
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
         client = OpenAI(api_key=OPENAI_API_KEY)
-        print("[assistant] Sending request to OpenAI API...")
 
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a HR Specialist."},
-                {"role": "user", "content": hints},
-                {"role": "user", "content": f"Files: {file_content}\n\nQuestion: {question}?"}
-            ],
-            temperature=0.5
+        with timed("prompt_build"):
+            # Document before hints/question so the prefix is reusable across turns
+            messages = build_messages(hints, question, file_content)
+            cache_options = {"prompt_cache_key": prompt_cache_key(file_content)} if OPENAI_PROMPT_CACHE_KEY else {}
+
+        def open_stream():
+            # Streamed internally so time-to-first-token can be measured;
+            # the final chunk carries the usage block (include_usage).
+            stream = client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                temperature=0.5,
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=max(deadline.remaining(), 0.001),
+                **cache_options,
+            )
+            events = iter(stream)
+            return stream, events, next(events, None)
+
+        # Waits for the first chunk on a background thread, so the deadline, a
+        # disconnect or a hedge can act while the upstream request is still silent
+        attempt, (stream, events, first_event) = race(
+            open_stream, deadline, hedge_policy if LLM_HEDGING else None, cancel_check,
+            close=lambda opened: opened[0].close()
         )
 
-        end_time = time.time()
-        print(f"[assistant] OpenAI API call completed in {end_time - start_time:.2f} seconds")
-        print(f"[assistant] Response received: {response.choices[0].message.content[:100]}...")
-        return response.choices[0].message.content
+        parts = []
+        first_token_at = None
+        for event in chain([first_event] if first_event is not None else [], events):
+            if event.choices and event.choices[0].delta.content:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    observe_stage("llm_first_token", first_token_at - start_time)
+                parts.append(event.choices[0].delta.content)
+            if event.usage is not None:
+                record_tokens(event.usage)
+                record_prefix_cache(event.usage)
+            if cancel_check is not None and cancel_check():
+                # Closing the HTTP response makes the API stop generating (and billing) tokens
+                stream.close()
+                logger.info("Completion cancelled after %d chunks (%.2fs)", len(parts), time.perf_counter() - start_time)
+                raise ClientDisconnected("llm_stream")
+            if deadline.expired:
+                stream.close()
+                raise DeadlineExceeded("llm_stream")
+
+        end_time = time.perf_counter()
+        observe_stage("llm_total", end_time - start_time)
+        answer = "".join(parts)
+        logger.info(
+            "OpenAI API call completed in %.2f seconds (%d chars%s)",
+            end_time - start_time, len(answer), ", hedge won" if attempt else ""
+        )
+        return answer
 
+    except (ClientDisconnected, DeadlineExceeded):
+        raise
     except RateLimitError as e:
-        print(f"[assistant] OpenAI Rate limit error: {str(e)}")
+        logger.warning("OpenAI rate limit error: %s", e)
         raise
     except APIError as e:
-        print(f"[assistant] OpenAI API error: {str(e)}")
+        if deadline.expired:
+            # The SDK timeout derived from the deadline fired first
+            raise DeadlineExceeded("llm_stream") from e
+        logger.error("OpenAI API error: %s", e)
         raise
     except Exception as e:
-        print(f"[assistant] Unexpected assistant error: {str(e)}")
+        logger.exception("Unexpected assistant error: %s", e)
         raise
 
 
@@ -72,47 +171,38 @@ def assistant(hints: str, question: str, file_content: str) -> str:
 def assistant_stream(hints: str, question: str, file_content: str) -> str:
     """
     Streams tokens from the OpenAI Chat Completions API (>=1.0.0).
-    Prints tokens live. Returns the final full message as a string.
+    Returns the final full message as a string.
     """
 
     try:
         start_time = time.time()
         client = OpenAI(api_key=OPENAI_API_KEY)
-        print("[assistant_stream] Sending request to OpenAI API...")
 
         stream = client.chat.completions.create(
             model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a HR Specialist."},
-                {"role": "user", "content": hints},
-                {"role": "user", "content": f"Files: {file_content}\n\nQuestion: {question}?"}
-            ],
+            messages=build_messages(hints, question, file_content),
             temperature=0.5,
             stream=True,
         )
 
         final_answer = ""  # we accumulate the full response
-        print("[assistant_stream] \n--- Stream Start ---\n")
 
         for event in stream:
             # Each event is a token or chunk
             if event.choices and event.choices[0].delta.content:
                 token = event.choices[0].delta.content
                 final_answer += token
-                print(token, end="", flush=True)
-
-        print("[assistant_stream] \n\n--- Stream End ---\n")
 
         end_time = time.time()
-        print(f"[assistant_stream]: Total time taken: {end_time - start_time} seconds")
+        logger.info("Streamed response completed in %.2f seconds", end_time - start_time)
         return final_answer
 
     except RateLimitError as e:
-        print(f"[assistant_stream]: OpenAI Rate limit error: {str(e)}")
+        logger.warning("OpenAI rate limit error: %s", e)
         raise
     except APIError as e:
-        print(f"[assistant_stream]: OpenAI API error: {str(e)}")
+        logger.error("OpenAI API error: %s", e)
         raise
     except Exception as e:
-        print(f"[assistant_stream]: Assistant error: {str(e)}")
+        logger.exception("Assistant error: %s", e)
         raise
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""
+Bulk ingestion of a directory of PDFs (e.g. the CVs of a new requisition).
+
+Every PDF under the directory is hashed first, so files the user already
+has (same SHA-256, recorded in file_hashes by uploads and ingestion alike)
+and copies within the directory are skipped before any parsing. The rest are
+extracted on a process pool, one process per core, by the same
+extract_document() the upload endpoint uses (size, page, length and time
+limits, pre-scan, normalization). Results are written as they come in, in
+transactions of --batch-size files: one conversation per file, like a
+browser upload, plus its Files, FileTextStats and FileHash rows and, with
+NEAR_DUPLICATES on, its fingerprint (linked like uploads, see
+near_duplicates).
+
+Summaries are not precomputed for ingested files; chat falls back to the
+full document for them. With SEMANTIC_INDEX on, each batch is indexed after
+its commit.
+
+Usage:
+    python -m backend.utils.bulk_ingest /data/cvs --user recruiter@example.com
+    python -m backend.utils.bulk_ingest /data/cvs --user 42 --workers 8 --batch-size 100 --report ingest.json
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import multiprocessing
+from datetime import datetime
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Ensure project root is in sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from sqlalchemy import insert, select
+from werkzeug.datastructures import FileStorage
+from werkzeug.utils import secure_filename
+
+from backend import db
+from backend.database.models import User, Conversations, Files, FileHash, FileTextStats, FileFingerprint, LshBucket
+from backend.configs.config import MAX_PDF_SIZE_MB, SEMANTIC_INDEX, NEAR_DUPLICATES
+from backend.utils.file_utils import allowed_file, extract_document
+from backend.utils.uploads import PDF_MAGIC, PDF_HEADER_WINDOW, stream_sha256
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestReport:
+    found: int = 0
+    ingested: int = 0
+    already_ingested: int = 0
+    duplicates_in_run: int = 0
+    near_duplicates: int = 0
+    bytes_extracted: int = 0
+    seconds: float = 0.0
+    failed: list = field(default_factory=list)   # (path, reason)
+
+    def as_dict(self) -> dict:
+        seconds = max(self.seconds, 1e-9)
+        return {
+            "found": self.found,
+            "ingested": self.ingested,
+            "already_ingested": self.already_ingested,
+            "duplicates_in_run": self.duplicates_in_run,
+            "near_duplicates": self.near_duplicates,
+            "failed": len(self.failed),
+            "seconds": round(self.seconds, 2),
+            "files_per_second": round(self.ingested / seconds, 2),
+            "mb_per_second": round(self.bytes_extracted / seconds / 1e6, 2),
+            "failures": [{"path": path, "reason": reason} for path, reason in self.failed],
+        }
+
+
+def find_pdfs(directory: str) -> list:
+    """Paths of the PDF files under `directory`, in a stable order."""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files) if allowed_file(name))
+    return paths
+
+
+def file_sha256(path: str) -> str:
+    with open(path, "rb") as fh:
+        return stream_sha256(fh)
+
+
+def extract_file(path: str, size: int):
+    """Worker: extract one PDF under the upload limits. Returns the NormalizedText."""
+    with open(path, "rb") as fh:
+        if PDF_MAGIC not in fh.read(PDF_HEADER_WINDOW):
+            raise ValueError(f"[extract_file] File {os.path.basename(path)} is not a PDF")
+        fh.seek(0)
+        return extract_document(FileStorage(stream=fh, filename=os.path.basename(path), content_length=size))
+
+
+def _init_worker():
+    # Workers only parse; per-file INFO logs from every process would drown the progress output
+    logging.basicConfig(level=logging.WARNING)
+
+
+def resolve_user(user: str) -> int:
+    """User id from an id or an email address."""
+    condition = User.id == int(user) if user.isdigit() else User.email == user
+    user_id = db.session.execute(select(User.id).where(condition)).scalar()
+    if user_id is None:
+        raise ValueError(f"[resolve_user] No such user: {user}")
+    return user_id
+
+
+def insert_batch(user_id: int, batch: list, near_duplicates: bool = False) -> tuple:
+    """
+    Store a batch of (path, sha256, document) in one transaction: a
+    conversation per file, then the files and their stats and hashes, and
+    with `near_duplicates` their fingerprints. Returns the new file ids, in
+    batch order, and how many of the files are near-duplicates.
+    """
+    now = datetime.now()
+    with db.engine.begin() as conn:
+        conversation_ids = conn.execute(
+            insert(Conversations).returning(Conversations.id, sort_by_parameter_order=True),
+            [{
+                "user": user_id,
+                "user_message": "File uploaded",
+                "bot_message": "File received. You can now ask questions about its content.",
+                "time_of_message": now,
+                "hints": "Bulk ingestion.",
+            } for _ in batch]
+        ).scalars().all()
+        file_ids = conn.execute(
+            insert(Files).returning(Files.id, sort_by_parameter_order=True),
+            [{
+                "conversation_id": conversation_id,
+                "file_name": secure_filename(os.path.basename(path))[:120],
+                "text_version_of_the_file": document.text,
+            } for conversation_id, (path, _, document) in zip(conversation_ids, batch)]
+        ).scalars().all()
+        conn.execute(insert(FileTextStats), [{
+            "file_id": file_id,
+            "raw_chars": document.raw_chars,
+            "normalized_chars": document.chars,
+            "raw_tokens": document.raw_tokens,
+            "normalized_tokens": document.tokens,
+        } for file_id, (_, _, document) in zip(file_ids, batch)])
+        conn.execute(insert(FileHash), [
+            {"file_id": file_id, "user": user_id, "sha256": sha256}
+            for file_id, (_, sha256, _) in zip(file_ids, batch)
+        ])
+        duplicates = 0
+        if near_duplicates:
+            from backend.utils.near_duplicates import fingerprint_document, fingerprint_rows
+            for file_id, (_, _, document) in zip(file_ids, batch):
+                fingerprint = fingerprint_document(user_id, document.text, connection=conn)
+                if fingerprint is None:
+                    continue
+                # Inserted one file at a time so the next file of the batch can match this one
+                row, buckets = fingerprint_rows(user_id, file_id, fingerprint)
+                conn.execute(insert(FileFingerprint), row)
+                conn.execute(insert(LshBucket), buckets)
+                duplicates += fingerprint.duplicate_of is not None
+    return file_ids, duplicates
+
+
+def ingest_directory(directory: str, user_id: int, workers: int = None, batch_size: int = 50,
+                     semantic_index: bool = SEMANTIC_INDEX, near_duplicates: bool = NEAR_DUPLICATES) -> IngestReport:
+    """Ingest every new PDF under `directory` for `user_id`. Needs an app context."""
+    started = time.perf_counter()
+    report = IngestReport()
+    max_bytes = MAX_PDF_SIZE_MB * 1024 * 1024
+    known = set(db.session.execute(select(FileHash.sha256).where(FileHash.user == user_id)).scalars())
+
+    # Hash everything up front: duplicates are skipped before they cost a parse
+    todo, queued = [], set()
+    for path in find_pdfs(directory):
+        report.found += 1
+        try:
+            size = os.path.getsize(path)
+            if size > max_bytes:
+                raise ValueError(f"[extract_text_secure] PDF too large ({size} bytes). Limit is {max_bytes} bytes.")
+            sha256 = file_sha256(path)
+        except (OSError, ValueError) as e:
+            report.failed.append((path, str(e)))
+            continue
+        if sha256 in known:
+            report.already_ingested += 1
+        elif sha256 in queued:
+            report.duplicates_in_run += 1
+        else:
+            queued.add(sha256)
+            todo.append((path, sha256, size))
+    print(f"Found {report.found} PDFs: {len(todo)} new, "
+          f"{report.already_ingested + report.duplicates_in_run} duplicates, {len(report.failed)} unreadable")
+
+    def flush(batch):
+        try:
+            file_ids, duplicates = insert_batch(user_id, batch, near_duplicates)
+        except Exception as e:
+            # The batch's transaction was rolled back: record its files and go on with the next one
+            logger.warning("Storing a batch of %d files failed: %s", len(batch), e)
+            report.failed.extend((path, f"[insert_batch] {e}") for path, _, _ in batch)
+            return
+        report.ingested += len(batch)
+        report.near_duplicates += duplicates
+        if semantic_index:
+            from backend.utils.semantic_index import index_file
+            for file_id, (path, _, document) in zip(file_ids, batch):
+                try:
+                    index_file(user_id, file_id, document.text)
+                except Exception as e:
+                    # The file is stored; it is only missing from similar-candidate search
+                    logger.warning("Indexing %s failed: %s", path, e)
+        rate = report.ingested / max(time.perf_counter() - started, 1e-9)
+        print(f"  {report.ingested}/{len(todo)} files stored ({rate:.1f} files/s)")
+
+    batch = []
+    # spawn: the parent holds DB connections and logging threads that must not be forked
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        futures = {pool.submit(extract_file, path, size): (path, sha256, size) for path, sha256, size in todo}
+        for future in as_completed(futures):
+            path, sha256, size = futures.pop(future)
+            try:
+                document = future.result()
+            except Exception as e:
+                report.failed.append((path, str(e)))
+                continue
+            report.bytes_extracted += size
+            batch.append((path, sha256, document))
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+    if batch:
+        flush(batch)
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract and store every new PDF in a directory for one user.")
+    parser.add_argument("directory")
+    parser.add_argument("--user", required=True, help="id or email of the user the files belong to")
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=50, help="files per insert transaction")
+    parser.add_argument("--report", default=None, help="write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from backend import create_app
+    load_dotenv()
+    args = parse_args()
+
+    with create_app().app_context():
+        result = ingest_directory(args.directory, resolve_user(args.user), args.workers, args.batch_size).as_dict()
+    for failure in result["failures"]:
+        print(f"  FAILED {failure['path']}: {failure['reason']}")
+    summary = {key: value for key, value in result.items() if key != "failures"}
+    print(summary)
+    if args.report:
+        with open(args.report, "w") as fh:
+            json.dump(result, fh, indent=2)
+        print(f"Report written to {args.report}")
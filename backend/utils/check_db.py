@@ -2,6 +2,7 @@ import backend.configs.config as project_paths
 
 from backend import create_app,db # db here is -> db = SQLAlchemy()
 from backend.database.models import User, Conversations, Files
+from backend.utils.query_audit import capture_queries, instrument_engines
 
 # Query the tables to check if they are empty
 def check_table_empty(model):
@@ -28,8 +29,9 @@ if __name__ == "__main__":
     from dotenv import load_dotenv
     load_dotenv()
     app = create_app()
+    instrument_engines()
 
-    with app.app_context():
+    with app.app_context(), capture_queries() as stats:
         if check_specific_row_exists(User, username='testing'):
             print("User 'testing' exists in the database.")
         else:
@@ -38,4 +40,5 @@ if __name__ == "__main__":
         if is_database_seeded():
             print("Database is already seeded.")
         else:
-            print("Database is not seeded.")
\ No newline at end of file
+            print("Database is not seeded.")
+    print(f"Queries: {stats.describe()}")
\ No newline at end of file
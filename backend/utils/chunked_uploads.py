@@ -0,0 +1,242 @@
+"""
+Resumable chunked uploads.
+
+A large dossier is uploaded as numbered chunks instead of one multipart
+POST: the client opens an upload (size and file name), PUTs the chunks in
+any order and in parallel, asks which ones arrived after a dropped
+connection, and finally completes the upload, which hands the file to
+extraction. A lost connection costs at most the chunks in flight.
+
+Every upload lives in its own directory under CHUNKED_UPLOAD_DIR, so any
+worker can serve any chunk:
+
+    manifest.json   owner, conversation, file name, size and chunk size
+    data            the file itself, preallocated to its full size; chunk N
+                    is written in place at offset N * chunk_size
+    chunks/N        SHA-256 of chunk N, written once it is complete and verified
+    completing      created (exclusively) by the one request that completes the upload
+
+Because chunks are written in place, completing an upload doesn't copy or
+concatenate anything: it checks that every chunk is marked and memory-maps
+`data` for extraction like any other disk-backed upload.
+"""
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import logging
+import secrets
+from dataclasses import dataclass, asdict
+from typing import List
+
+from backend.utils.metrics import REGISTRY, Counter
+from backend.utils.uploads import PDF_MAGIC, PDF_HEADER_WINDOW
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNKS = REGISTRY.register(Counter(
+    "hr_upload_chunks_total", "Chunks of resumable uploads, by result.", ("result",)
+))
+
+UPLOAD_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+MANIFEST = "manifest.json"
+COMPLETING = "completing"
+READ_BLOCK = 64 * 1024
+
+
+class UploadSessionError(ValueError):
+    """A chunked upload request that can't be served; carries its HTTP status."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class ChunkedUpload:
+    upload_id: str
+    path: str
+    user_id: int
+    conversation_id: int
+    file_name: str
+    size: int
+    chunk_size: int
+    created_at: float
+
+    @property
+    def chunks(self) -> int:
+        return -(-self.size // self.chunk_size)
+
+    @property
+    def data_path(self) -> str:
+        return os.path.join(self.path, "data")
+
+    def chunk_length(self, index: int) -> int:
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+    def received(self) -> List[int]:
+        """Indexes of the chunks stored and verified so far."""
+        names = os.listdir(os.path.join(self.path, "chunks"))
+        return sorted(int(name) for name in names if name.isdigit())
+
+    def missing(self) -> List[int]:
+        received = set(self.received())
+        return [index for index in range(self.chunks) if index not in received]
+
+    def write_chunk(self, index: int, stream, sha256: str = None) -> str:
+        """
+        Write chunk `index` from `stream` in place and mark it received.
+        Re-sending a chunk overwrites it: its mark is removed first, so a bad
+        copy of a stored chunk leaves it missing rather than corrupted.
+
+        Raises
+        ------
+        UploadSessionError
+            When the index is out of range, the body has the wrong length,
+            the checksum doesn't match, the first chunk isn't a PDF, or the
+            upload is being completed (409).
+        """
+        if not 0 <= index < self.chunks:
+            raise UploadSessionError(f"[write_chunk] Chunk {index} is out of range (0-{self.chunks - 1})")
+        if os.path.exists(os.path.join(self.path, COMPLETING)):
+            raise UploadSessionError("[write_chunk] Upload is already being completed", 409)
+        # Activity keeps the upload from expiring (sweep_expired goes by the directory's mtime)
+        os.utime(self.path)
+        expected = self.chunk_length(index)
+        marker = os.path.join(self.path, "chunks", str(index))
+        try:
+            os.unlink(marker)
+        except FileNotFoundError:
+            pass
+
+        digest, received, head = hashlib.sha256(), 0, b""
+        fd = os.open(self.data_path, os.O_WRONLY)
+        try:
+            while received <= expected:
+                block = stream.read(min(READ_BLOCK, expected + 1 - received))
+                if not block:
+                    break
+                if index == 0 and len(head) < PDF_HEADER_WINDOW:
+                    head += block[:PDF_HEADER_WINDOW - len(head)]
+                if received + len(block) <= expected:
+                    os.pwrite(fd, block, index * self.chunk_size + received)
+                    digest.update(block)
+                received += len(block)
+        finally:
+            os.close(fd)
+
+        if received != expected:
+            UPLOAD_CHUNKS.inc(result="bad_length")
+            raise UploadSessionError(f"[write_chunk] Chunk {index} must be {expected} bytes")
+        if index == 0 and PDF_MAGIC not in head:
+            UPLOAD_CHUNKS.inc(result="not_pdf")
+            raise UploadSessionError(f"[write_chunk] File {self.file_name} is not a PDF")
+        hexdigest = digest.hexdigest()
+        if sha256 is not None and sha256.lower() != hexdigest:
+            # The chunk is left unmarked; the next attempt overwrites what was written
+            UPLOAD_CHUNKS.inc(result="checksum_mismatch")
+            raise UploadSessionError(f"[write_chunk] Checksum mismatch for chunk {index}", 422)
+
+        with open(marker + ".tmp", "w") as fh:
+            fh.write(hexdigest)
+        os.replace(marker + ".tmp", marker)
+        UPLOAD_CHUNKS.inc(result="stored")
+        return hexdigest
+
+    def claim(self):
+        """
+        Claim the upload for completion. Only one request wins, so a retried
+        or double-clicked /complete can't store the file twice.
+
+        Raises
+        ------
+        UploadSessionError
+            409 when another request claimed it first, or chunks are missing
+            (the claim is then released).
+        """
+        try:
+            os.close(os.open(os.path.join(self.path, COMPLETING), os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+        except FileExistsError:
+            raise UploadSessionError("[claim] Upload is already being completed", 409)
+        except FileNotFoundError:
+            # Completed (and discarded) by the request that won
+            raise UploadSessionError("[claim] Upload not found", 404)
+        # Checked after claiming: no chunk can be unmarked and rewritten from now on
+        missing = self.missing()
+        if missing:
+            os.unlink(os.path.join(self.path, COMPLETING))
+            raise UploadSessionError(
+                f"[claim] Upload is incomplete: {len(missing)} of {self.chunks} chunks missing", 409
+            )
+
+    def open(self):
+        """The assembled file, for extraction; only valid once nothing is missing."""
+        return open(self.data_path, "rb")
+
+    def discard(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def create_upload(root: str, user_id: int, conversation_id: int, file_name: str,
+                  size: int, chunk_size: int) -> ChunkedUpload:
+    """Open a new upload: write its manifest and preallocate its data file."""
+    upload_id = secrets.token_hex(16)
+    path = os.path.join(root, upload_id)
+    os.makedirs(os.path.join(path, "chunks"))
+    upload = ChunkedUpload(upload_id, path, user_id, conversation_id, file_name, size, chunk_size, time.time())
+
+    with open(upload.data_path, "wb") as fh:
+        fh.truncate(size)
+    manifest = {key: value for key, value in asdict(upload).items() if key not in ("upload_id", "path")}
+    with open(os.path.join(path, MANIFEST), "w") as fh:
+        json.dump(manifest, fh)
+    logger.debug("Opened chunked upload %s (%d bytes in %d chunks)", upload_id, size, upload.chunks)
+    return upload
+
+
+def load_upload(root: str, upload_id: str, user_id: int) -> ChunkedUpload:
+    """
+    The upload `upload_id` of `user_id`.
+
+    Raises
+    ------
+    UploadSessionError
+        404 when it doesn't exist (any more) or belongs to someone else.
+    """
+    if not UPLOAD_ID_PATTERN.fullmatch(upload_id):
+        raise UploadSessionError("[load_upload] Upload not found", 404)
+    path = os.path.join(root, upload_id)
+    try:
+        with open(os.path.join(path, MANIFEST)) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        raise UploadSessionError("[load_upload] Upload not found", 404)
+    if manifest["user_id"] != user_id:
+        raise UploadSessionError("[load_upload] Upload not found", 404)
+    return ChunkedUpload(upload_id=upload_id, path=path, **manifest)
+
+
+def sweep_expired(root: str, ttl_seconds: int) -> int:
+    """Delete uploads without activity for `ttl_seconds`. Returns how many were removed."""
+    try:
+        entries = os.listdir(root)
+    except FileNotFoundError:
+        return 0
+    cutoff, removed = time.time() - ttl_seconds, 0
+    for upload_id in entries:
+        if not UPLOAD_ID_PATTERN.fullmatch(upload_id):
+            continue
+        path = os.path.join(root, upload_id)
+        try:
+            # The directory's mtime is set when the manifest is written and touched by every chunk
+            expired = os.path.getmtime(path) < cutoff
+        except OSError:
+            continue
+        if expired:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    if removed:
+        logger.info("Removed %d expired chunked uploads", removed)
+    return removed
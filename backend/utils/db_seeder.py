@@ -1,77 +1,224 @@
-import backend.configs.config as project_paths
+"""
+Bulk database seeder for realistic, large test datasets.
 
+Rows are generated in batches and written with Core `insert()` executemany
+inside a single transaction, so millions of rows take minutes instead of
+hours through the ORM. Output is reproducible for a given --seed.
+
+Usage:
+    python -m backend.utils.db_seeder --users 100000 --conversations-per-user 100 --seed 42
+    python -m backend.utils.db_seeder --users 10 --conversations-per-user 5 --files-per-conversation 0   # no file text
+"""
+import os
+import sys
+import time
 import random
-import string
+import argparse
+from datetime import datetime, timedelta
 
-from backend import create_app,db # db here is -> db = SQLAlchemy()
-from backend.database.models import User, Conversations
+# Ensure project root is in sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
+from dotenv import load_dotenv
 from faker import Faker
-# Initialize Faker for generating random data
-fake = Faker()
-
-def generate_random_string(length=8):
-    return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
-
-def create_test_users(n):
-    """Create test users (both persons and companies)"""
-    users = []
-    
-    # Create persons
-    for _ in range(n):
-        person = User(
-            email=f"person_{generate_random_string()}@example.com",
-            username=fake.first_name(),
-            password="test123", # this should be hashed...
-        )
-        users.append(person)
-    
-    return users
-
-def create_test_conversations(user_id, n):
-    """Create test conversations for a given user"""
-    conversations = []
-    for _ in range(n):
-        conversation = Conversations(
-            user=user_id,
-            user_message=fake.sentence(),
-            bot_message=fake.sentence(),
-            time_of_message=fake.date_time_between(start_date='-30d', end_date='now'),
-            hints=fake.text(max_nb_chars=100)
-        )
-        conversations.append(conversation)
-    return conversations
+from sqlalchemy import func, select
+from werkzeug.security import generate_password_hash
+
+from backend import create_app, db # db here is -> db = SQLAlchemy()
+from backend.database.models import User, Conversations, Files
+from backend.configs.config import PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH
+
+DEFAULT_PASSWORD = "test123"
+# Fixed "now" so message timestamps are reproducible too
+SEED_EPOCH = datetime(2025, 1, 1)
+
+
+# -----------------------------
+# Value pools
+# -----------------------------
+class ValuePools:
+    """
+    Pre-generated Faker values, sampled with a seeded RNG.
+
+    Faker is far too slow to call per row at millions of rows, so every
+    free-text column draws from a pool built once up front.
+    """
+
+    def __init__(self, seed: int, pool_size: int = 2000, text_pool_size: int = 200, file_chars: int = 6000):
+        self.rng = random.Random(seed)
+        fake = Faker()
+        fake.seed_instance(seed)
+
+        self.first_names = [fake.first_name().lower() for _ in range(pool_size)]
+        self.user_messages = [fake.sentence(nb_words=12)[:140] for _ in range(pool_size)]
+        self.bot_messages = [fake.sentence(nb_words=14)[:140] for _ in range(pool_size)]
+        self.hints = [fake.text(max_nb_chars=300)[:500] for _ in range(pool_size)]
+        self.file_names = [f"{fake.last_name()}_{fake.first_name()}_CV.pdf"[:120] for _ in range(pool_size)]
+        self.file_texts = [self._resume_text(fake, file_chars) for _ in range(text_pool_size)]
+
+    def _resume_text(self, fake, target_chars):
+        """A CV-shaped text blob of roughly `target_chars` characters (varies +/-50%)."""
+        target = int(target_chars * self.rng.uniform(0.5, 1.5))
+        parts = [
+            fake.name(),
+            f"{fake.job()} | {fake.email()} | {fake.phone_number()}",
+            fake.address().replace("\n", ", "),
+            "",
+            "Summary",
+            fake.paragraph(nb_sentences=5),
+            "",
+            "Experience",
+        ]
+        length = sum(len(p) + 1 for p in parts)
+        while length < target:
+            entry = [
+                f"{fake.job()} at {fake.company()} ({fake.year()} - {fake.year()})",
+                fake.paragraph(nb_sentences=4),
+            ]
+            parts.extend(entry)
+            length += sum(len(p) + 1 for p in entry)
+        parts.extend(["", "Skills", ", ".join(fake.words(nb=15))])
+        return "\n".join(parts)[:target]
+
+    def pick(self, pool):
+        return pool[self.rng.randrange(len(pool))]
+
+
+# -----------------------------
+# Row generators
+# -----------------------------
+def generate_users(pools, first_id, n, password_hash):
+    """Yield `n` user rows with ids first_id.. and unique emails/usernames derived from the id."""
+    for user_id in range(first_id, first_id + n):
+        # username is limited to 20 chars: keep the id suffix, trim the name
+        suffix = str(user_id)
+        yield {
+            "id": user_id,
+            "username": f"{pools.pick(pools.first_names)[:19 - len(suffix)]}_{suffix}",
+            "email": f"user_{user_id}@example.com",
+            "password": password_hash,
+        }
+
+
+def generate_conversations(pools, user_ids, first_id, per_user, now):
+    """Yield `per_user` conversation rows for every user id, with ids first_id.."""
+    conversation_id = first_id
+    for user_id in user_ids:
+        for _ in range(per_user):
+            yield {
+                "id": conversation_id,
+                "user": user_id,
+                "user_message": pools.pick(pools.user_messages),
+                "bot_message": pools.pick(pools.bot_messages),
+                "time_of_message": now - timedelta(seconds=pools.rng.randrange(30 * 24 * 3600)),
+                "hints": pools.pick(pools.hints),
+            }
+            conversation_id += 1
+
+
+def generate_files(pools, conversation_ids, per_conversation):
+    """Yield `per_conversation` file rows for every conversation id."""
+    for conversation_id in conversation_ids:
+        for _ in range(per_conversation):
+            yield {
+                "conversation_id": conversation_id,
+                "file_name": pools.pick(pools.file_names),
+                "text_version_of_the_file": pools.pick(pools.file_texts),
+            }
+
+
+def insert_in_batches(conn, table, rows, batch_size, label):
+    """executemany `rows` into `table` in chunks of `batch_size`; returns the row count."""
+    total = 0
+    batch = []
+    started = time.perf_counter()
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            conn.execute(table.insert(), batch)
+            total += len(batch)
+            batch = []
+            if total % (batch_size * 20) == 0:
+                rate = total / max(time.perf_counter() - started, 1e-9)
+                print(f"  {label}: {total:,} rows ({rate:,.0f} rows/s)")
+    if batch:
+        conn.execute(table.insert(), batch)
+        total += len(batch)
+    print(f"  {label}: {total:,} rows in {time.perf_counter() - started:.1f}s")
+    return total
+
 
 # main function
-def seed_database():
-    """Main function to seed the database with test data"""
-    # Load environment variables
-    load_dotenv()
-    # create app
-    app = create_app()
+def seed_database(users=10, conversations_per_user=5, files_per_conversation=1,
+                  batch_size=5000, seed=42, file_chars=6000, app=None):
+    """
+    Seed the database with test data.
+
+    New rows get ids after the current maximum, so the seeder can be run
+    repeatedly against the same database. Every user's password is
+    DEFAULT_PASSWORD (hashed once and reused).
+
+    Returns
+    -------
+    dict
+        Number of rows inserted per table.
+    """
+    app = app or create_app()
+    pools = ValuePools(seed, file_chars=file_chars)
+    password_hash = generate_password_hash(DEFAULT_PASSWORD, PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH)
 
     with app.app_context():
-        try:
-            # Create and commit users first to get their IDs
+        # One transaction for the whole run: committed at the end, rolled back on any error
+        with db.engine.begin() as conn:
+            first_user_id = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+            first_conversation_id = (conn.execute(select(func.max(Conversations.id))).scalar() or 0) + 1
+            user_ids = range(first_user_id, first_user_id + users)
+            conversation_ids = range(first_conversation_id, first_conversation_id + users * conversations_per_user)
+
             print("Creating test users...")
-            users = create_test_users(10)
-            db.session.add_all(users)
-            db.session.flush()  # This assigns IDs without committing
-    
-            # Create and commit conversations for each user
+            counts = {"users": insert_in_batches(
+                conn, User.__table__, generate_users(pools, first_user_id, users, password_hash), batch_size, "users"
+            )}
             print("Creating test conversations...")
-            for user in users:
-                conversations = create_test_conversations(user.id, n=5)
-                db.session.add_all(conversations)
-            # Finally commit everything to the database
-            db.session.commit()
-            print("Database seeded successfully!")
-            
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error seeding database: {str(e)}")
-            raise
+            counts["conversations"] = insert_in_batches(
+                conn, Conversations.__table__,
+                generate_conversations(pools, user_ids, first_conversation_id, conversations_per_user, SEED_EPOCH),
+                batch_size, "conversations"
+            )
+            if files_per_conversation:
+                print("Creating test files...")
+                counts["files"] = insert_in_batches(
+                    conn, Files.__table__, generate_files(pools, conversation_ids, files_per_conversation),
+                    batch_size, "files"
+                )
+    print("Database seeded successfully!")
+    return counts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the database with bulk test data.")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--conversations-per-user", type=int, default=5)
+    parser.add_argument("--files-per-conversation", type=int, default=1, help="0 skips the file text blobs")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per executemany call")
+    parser.add_argument("--file-chars", type=int, default=6000, help="average length of generated file text")
+    parser.add_argument("--seed", type=int, default=42, help="RNG seed for reproducible data")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    from dotenv import load_dotenv
-    seed_database() 
\ No newline at end of file
+    # Load environment variables
+    load_dotenv()
+    args = parse_args()
+    started = time.perf_counter()
+    seed_database(
+        users=args.users,
+        conversations_per_user=args.conversations_per_user,
+        files_per_conversation=args.files_per_conversation,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        file_chars=args.file_chars,
+    )
+    print(f"Done in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,216 @@
+"""
+Request deadlines and hedged LLM requests.
+
+A Deadline is created when a request starts (CHAT_DEADLINE_SECONDS for
+/app/chat) and passed down to the assistant, which derives its upstream
+timeouts from what is left and gives up with DeadlineExceeded instead of
+holding the worker for the SDK's default of several minutes.
+
+With LLM_HEDGING on, HedgePolicy fires a second, identical request when the
+first has not produced a token after the recent p-HEDGE_PERCENTILE time to
+first token, and the first one to answer wins (the other is closed). Hedges
+cost a full prompt, so they are capped by a token bucket: every request
+earns HEDGE_MAX_RATE of a hedge.
+"""
+import time
+import queue
+import logging
+import threading
+from collections import deque
+
+from backend.configs.config import (
+    HEDGE_PERCENTILE, HEDGE_MIN_SAMPLES, HEDGE_WINDOW, HEDGE_MAX_RATE, HEDGE_MIN_DELAY_MS
+)
+from backend.utils.metrics import REGISTRY, Counter, percentile
+from backend.utils.disconnect import ClientDisconnected
+
+logger = logging.getLogger(__name__)
+
+DEADLINES_EXCEEDED = REGISTRY.register(Counter(
+    "hr_deadlines_exceeded_total", "Requests that ran out of their deadline, by stage.", ("stage",)
+))
+LLM_HEDGES = REGISTRY.register(Counter(
+    "hr_llm_hedges_total", "Hedged LLM requests: fired, won/lost against the first request, or skipped by the rate cap.",
+    ("result",)
+))
+
+# A hedge may be saved up for a burst of this many slow requests
+HEDGE_BURST = 3
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"[DeadlineExceeded] deadline exceeded during {stage}")
+        self.stage = stage
+
+
+class Deadline:
+    """An absolute point in (monotonic) time by which a request must be answered."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, stage: str):
+        """Raise DeadlineExceeded if the deadline has passed."""
+        if self.expired:
+            raise DeadlineExceeded(stage)
+
+
+def record_deadline_exceeded(stage: str):
+    DEADLINES_EXCEEDED.inc(stage=stage)
+    logger.warning("Deadline exceeded during %s", stage)
+
+
+class HedgePolicy:
+    """Hedge delay from recent first-token latencies, and the hedge budget."""
+
+    def __init__(self, pct: float = HEDGE_PERCENTILE, min_samples: int = HEDGE_MIN_SAMPLES,
+                 window: int = HEDGE_WINDOW, max_rate: float = HEDGE_MAX_RATE,
+                 min_delay: float = HEDGE_MIN_DELAY_MS / 1000):
+        self.pct = pct
+        self.min_samples = min_samples
+        self.max_rate = max_rate
+        self.min_delay = min_delay
+        self._latencies = deque(maxlen=window)
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """Record the time to first token of a finished race."""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def delay(self):
+        """Seconds to wait before hedging, or None while there are too few samples."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            return max(self.min_delay, percentile(self._latencies, self.pct))
+
+    def earn(self):
+        """Called once per request: each one pays for max_rate of a hedge."""
+        with self._lock:
+            self._tokens = min(HEDGE_BURST, self._tokens + self.max_rate)
+
+    def allow_hedge(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def report(self) -> dict:
+        """Recent first-token tail latency and hedging totals of this process."""
+        with self._lock:
+            latencies = list(self._latencies)
+        fired, won = LLM_HEDGES.value(result="fired"), LLM_HEDGES.value(result="won")
+        return {
+            "samples": len(latencies),
+            "first_token_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "first_token_p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "first_token_p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "hedges_fired": fired,
+            "hedges_skipped": LLM_HEDGES.value(result="skipped"),
+            "hedge_win_rate": round(won / fired, 3) if fired else 0.0,
+        }
+
+
+def race(start, deadline: Deadline, policy: HedgePolicy = None, cancel_check=None, close=None, poll: float = 0.05):
+    """
+    Run `start()` on a background thread, hedge it with a second `start()` when
+    `policy` says so, and return (attempt, result) of the first to succeed;
+    attempt 1 is the hedge. Results of the losing or abandoned attempts are
+    passed to `close` whenever they finish.
+
+    Waits at most until `deadline` (DeadlineExceeded) and stops early when
+    `cancel_check` returns True (ClientDisconnected); the attempts' threads
+    are left to finish on their own. If every attempt fails, the first
+    error is raised.
+    """
+    results = queue.Queue()
+    lock = threading.Lock()
+    state = {"done": False}
+
+    def run(attempt):
+        try:
+            value, error = start(), None
+        except Exception as e:
+            value, error = None, e
+        with lock:
+            abandoned = state["done"]
+            if not abandoned:
+                results.put((attempt, value, error))
+        if abandoned and error is None and close is not None:
+            close(value)
+
+    def finish():
+        with lock:
+            state["done"] = True
+        while True:
+            try:
+                _, value, error = results.get_nowait()
+            except queue.Empty:
+                return
+            if error is None and close is not None:
+                close(value)
+
+    def launch(attempt):
+        threading.Thread(target=run, args=(attempt,), name=f"llm-attempt-{attempt}", daemon=True).start()
+
+    started = time.monotonic()
+    if policy is not None:
+        policy.earn()
+    delay = policy.delay() if policy is not None else None
+    hedge_at = started + delay if delay is not None else None
+    launch(0)
+    running, errors = 1, []
+
+    while True:
+        now = time.monotonic()
+        wait = min(poll, deadline.remaining())
+        if hedge_at is not None:
+            wait = min(wait, max(0.0, hedge_at - now))
+        try:
+            attempt, value, error = results.get(timeout=wait)
+        except queue.Empty:
+            if deadline.expired:
+                finish()
+                raise DeadlineExceeded("llm_first_token")
+            if cancel_check is not None and cancel_check():
+                finish()
+                raise ClientDisconnected("llm_first_token")
+            if hedge_at is not None and time.monotonic() >= hedge_at:
+                hedge_at = None
+                if policy.allow_hedge():
+                    LLM_HEDGES.inc(result="fired")
+                    logger.info("Hedging LLM request after %.0f ms", (time.monotonic() - started) * 1000)
+                    launch(1)
+                    running += 1
+                else:
+                    LLM_HEDGES.inc(result="skipped")
+            continue
+
+        if error is not None:
+            errors.append(error)
+            # Keep waiting while another attempt is still in flight
+            if len(errors) < running:
+                continue
+            finish()
+            raise errors[0]
+
+        finish()
+        if running > 1:
+            LLM_HEDGES.inc(result="won" if attempt == 1 else "lost")
+        if policy is not None:
+            policy.observe(time.monotonic() - started)
+        return attempt, value
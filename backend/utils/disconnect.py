@@ -0,0 +1,95 @@
+"""
+Client disconnect detection for long-running requests.
+
+A chat request can wait tens of seconds on the LLM. If the browser tab is
+closed meanwhile, the answer is never read, so there's no point finishing
+the completion (and paying for it) or storing it.
+
+The WSGI servers used here expose the client connection in the environ
+(werkzeug's dev server as "werkzeug.socket", gunicorn as "gunicorn.socket").
+A closed connection shows up as readable with nothing left to read: a
+non-blocking MSG_PEEK returns b"" (or the peer reset it). This doesn't
+consume any bytes, so pipelined requests on a keep-alive connection are
+left alone.
+
+Behind a proxy this only works if the proxy closes the upstream connection
+when its client goes away (nginx does by default, proxy_ignore_client_abort off).
+"""
+import time
+import socket
+import select
+import logging
+
+from flask import request
+
+from backend.configs.config import DISCONNECT_POLL_SECONDS
+from backend.utils.metrics import REGISTRY, Counter
+
+logger = logging.getLogger(__name__)
+
+CANCELLED_REQUESTS = REGISTRY.register(Counter(
+    "hr_cancelled_requests_total", "Requests abandoned because the client disconnected, by stage.", ("stage",)
+))
+
+SOCKET_ENVIRON_KEYS = ("werkzeug.socket", "gunicorn.socket")
+
+# nginx's "client closed request"; nobody reads it, but it stands out in access logs
+CLIENT_CLOSED_REQUEST = 499
+
+
+class ClientDisconnected(Exception):
+    """The client went away while its request was being processed."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"[ClientDisconnected] client disconnected during {stage}")
+        self.stage = stage
+
+
+def client_socket(environ):
+    for key in SOCKET_ENVIRON_KEYS:
+        sock = environ.get(key)
+        if sock is not None:
+            return sock
+    return None
+
+
+def socket_closed(sock) -> bool:
+    """Whether the peer has closed `sock`. Never blocks; unknown states count as connected."""
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return False
+        return sock.recv(1, socket.MSG_PEEK) == b""
+    except (ConnectionResetError, BrokenPipeError):
+        return True
+    except (OSError, ValueError):
+        # Closed/detached descriptor (OSError) or a TLS socket, which can't peek (ValueError)
+        return False
+
+
+def disconnect_check(environ=None, interval: float = DISCONNECT_POLL_SECONDS):
+    """
+    A callable returning True once the client of this request (default: the
+    current Flask request) has disconnected. Checks the socket at most every
+    `interval` seconds and stays True once it saw a disconnect. Returns None
+    when the server doesn't expose the connection.
+    """
+    sock = client_socket(environ if environ is not None else request.environ)
+    if sock is None:
+        return None
+    state = {"checked_at": float("-inf"), "gone": False}
+
+    def check() -> bool:
+        if not state["gone"]:
+            now = time.monotonic()
+            if now - state["checked_at"] >= interval:
+                state["checked_at"] = now
+                state["gone"] = socket_closed(sock)
+        return state["gone"]
+
+    return check
+
+
+def record_cancellation(stage: str):
+    CANCELLED_REQUESTS.inc(stage=stage)
+    logger.info("Client disconnected during %s; request abandoned", stage)
@@ -0,0 +1,225 @@
+"""
+Streaming export of conversations and extracted files as CSV or JSON Lines.
+
+Rows are read with a streaming cursor (`yield_per`, EXPORT_BATCH_ROWS rows
+per fetch), encoded as they arrive, and handed out in chunks of about
+EXPORT_CHUNK_KB, optionally gzip-compressed on the fly. Nothing holds more
+than one fetch and one chunk, so memory use is the same for a hundred rows
+or ten million. The same generator backs the /app/export endpoints (as a
+streamed response) and the command line.
+
+Exports:
+    conversations   every message (upload and chat) with its hints and answer,
+                    and the file of upload conversations (chat messages aren't
+                    linked to a file, so `file_id` only matches the upload row)
+    files           every extracted document with its text and size statistics
+
+Usage:
+    python -m backend.utils.export conversations --user 42 --start 2025-01-01 --end 2025-03-31 --output q1.csv
+    python -m backend.utils.export files --format jsonl --gzip --output files.jsonl.gz
+"""
+import io
+import os
+import csv
+import sys
+import zlib
+import logging
+import argparse
+from datetime import date, datetime, time as dtime, timedelta
+
+# Ensure project root is in sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import msgspec
+from sqlalchemy import select
+
+from backend import db
+from backend.database.models import Conversations, Files, FileTextStats
+from backend.configs.config import EXPORT_BATCH_ROWS, EXPORT_CHUNK_KB
+from backend.utils.metrics import EXPORTED_ROWS
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl")
+MIME_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+# Spreadsheets run a cell starting with one of these as a formula (CSV injection)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def conversations_statement():
+    return (
+        select(
+            Conversations.id.label("conversation_id"),
+            Conversations.user,
+            Conversations.time_of_message,
+            Conversations.hints,
+            Conversations.user_message,
+            Conversations.bot_message,
+            Files.id.label("file_id"),
+            Files.file_name,
+        )
+        .outerjoin(Files, Files.conversation_id == Conversations.id)
+        .order_by(Conversations.id)
+    )
+
+
+def files_statement():
+    return (
+        select(
+            Files.id.label("file_id"),
+            Files.conversation_id,
+            Conversations.user,
+            Conversations.time_of_message.label("uploaded_at"),
+            Files.file_name,
+            FileTextStats.raw_chars,
+            FileTextStats.normalized_chars,
+            Files.text_version_of_the_file.label("text"),
+        )
+        .join(Conversations, Files.conversation_id == Conversations.id)
+        .outerjoin(FileTextStats, FileTextStats.file_id == Files.id)
+        .order_by(Files.id)
+    )
+
+
+EXPORTS = {"conversations": conversations_statement, "files": files_statement}
+
+
+def export_statement(export: str, user_id: int = None, start: date = None, end: date = None, file_id: int = None):
+    """The SELECT of `export`, filtered by user, an inclusive date range and a file."""
+    statement = EXPORTS[export]()
+    if user_id is not None:
+        statement = statement.where(Conversations.user == user_id)
+    if start is not None:
+        statement = statement.where(Conversations.time_of_message >= datetime.combine(start, dtime.min))
+    if end is not None:
+        statement = statement.where(Conversations.time_of_message < datetime.combine(end + timedelta(days=1), dtime.min))
+    if file_id is not None:
+        statement = statement.where(Files.id == file_id)
+    return statement
+
+
+def escape_cell(value):
+    """`value`, with a leading ' if a spreadsheet would read it as a formula."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def encode_csv(columns, rows):
+    """CSV lines (header first) of `rows`, one string per row; text that looks like a formula is escaped."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow([escape_cell(value) for value in row])
+        yield buffer.getvalue()
+
+
+def encode_jsonl(columns, rows):
+    """JSON Lines of `rows`, one bytes object per row."""
+    encoder = msgspec.json.Encoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + b"\n"
+
+
+def chunked(pieces, size: int):
+    """Join str/bytes pieces into bytes chunks of at least `size` (the last one may be smaller)."""
+    parts, length = [], 0
+    for piece in pieces:
+        if isinstance(piece, str):
+            piece = piece.encode()
+        parts.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield b"".join(parts)
+            parts, length = [], 0
+    if parts:
+        yield b"".join(parts)
+
+
+def gzipped(chunks):
+    """Compress a stream of byte chunks into one gzip member, chunk by chunk."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(export: str, fmt: str = "jsonl", compress: bool = False, batch_rows: int = EXPORT_BATCH_ROWS,
+                  chunk_kb: int = EXPORT_CHUNK_KB, **filters):
+    """
+    Yield the encoded (and optionally gzipped) export as byte chunks. Needs an
+    app context while it is consumed; the connection is held until the end.
+
+    Raises
+    ------
+    ValueError
+        For an unknown export or format (before anything is read).
+    """
+    if export not in EXPORTS:
+        raise ValueError(f"[stream_export] Unknown export: {export}")
+    if fmt not in FORMATS:
+        raise ValueError(f"[stream_export] Unknown format: {fmt}")
+    statement = export_statement(export, **filters)
+
+    def generate():
+        count = 0
+        with db.engine.connect() as conn:
+            result = conn.execution_options(yield_per=batch_rows).execute(statement)
+            columns = list(result.keys())
+
+            def rows():
+                nonlocal count
+                for row in result:
+                    count += 1
+                    yield tuple(row)
+
+            encode = encode_csv if fmt == "csv" else encode_jsonl
+            chunks = chunked(encode(columns, rows()), chunk_kb * 1024)
+            yield from gzipped(chunks) if compress else chunks
+        EXPORTED_ROWS.inc(count, export=export, format=fmt)
+        logger.info("Exported %d %s rows as %s%s", count, export, fmt, " (gzip)" if compress else "")
+
+    return generate()
+
+
+def export_filename(export: str, fmt: str, compress: bool) -> str:
+    return f"{export}-{datetime.now():%Y%m%d-%H%M%S}.{fmt}" + (".gz" if compress else "")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Stream conversations or extracted files to CSV or JSON Lines.")
+    parser.add_argument("export", choices=sorted(EXPORTS))
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--user", type=int, default=None, help="only this user id (default: all users)")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="first day, YYYY-MM-DD")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="last day (inclusive), YYYY-MM-DD")
+    parser.add_argument("--file-id", type=int, default=None)
+    parser.add_argument("--gzip", action="store_true", help="gzip the output")
+    parser.add_argument("--output", default=None, help="file to write (default: stdout)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from backend import create_app
+    load_dotenv()
+    args = parse_args()
+
+    with create_app().app_context():
+        chunks = stream_export(args.export, args.format, args.gzip, user_id=args.user, start=args.start,
+                               end=args.end, file_id=args.file_id)
+        out = open(args.output, "wb") if args.output else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        finally:
+            if args.output:
+                out.close()
@@ -1,11 +1,20 @@
-import os
+import io
+import time
+import mmap
+import logging
 import threading
 
 from contextlib import contextmanager
 from pypdf import PdfReader   # Secure maintained fork of PyPDF2
 from werkzeug.datastructures import FileStorage
 
-from backend.configs.config import MAX_PAGES, MAX_TEXT_CHARS, MAX_PARSE_SECONDS
+from backend.configs.config import MAX_PAGES, MAX_TEXT_CHARS, MAX_PARSE_SECONDS, MAX_PDF_SIZE_MB, PDF_PRESCAN
+from backend.utils.metrics import timed
+from backend.utils.pdf_scan import classify_pdf, record_scan
+from backend.utils.logging_config import sampled
+from backend.utils.text_normalize import NormalizedText, normalize_pages
+
+logger = logging.getLogger(__name__)
 
 class TimeoutException(Exception):
     pass
@@ -28,71 +37,119 @@ def time_limit(seconds):
         timer_thread.cancel()
 
 
-def extract_text_secure(file: FileStorage, max_size_mb=None) -> str:
-    print("[extract_text_secure] Starting secure PDF extraction")
+@contextmanager
+def open_pdf_source(stream):
+    """
+    Yield a read-only memory map of a disk-backed upload so pypdf pages it in
+    from the OS cache instead of copying it. In-memory or empty streams are
+    yielded unchanged.
+    """
+    try:
+        stream.flush()
+        fileno = stream.fileno()
+    except (AttributeError, io.UnsupportedOperation, OSError):
+        yield stream
+        return
 
-    max_size_mb = max_size_mb or int(os.environ.get("MAX_PDF_SIZE_MB"))
-    max_bytes = max_size_mb * 1024 * 1024
+    if getattr(stream, "size", None) == 0:
+        yield stream
+        return
 
-    print(f"[extract_text_secure] Max allowed size: {max_size_mb} MB")
+    with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
 
-    size = getattr(file, "content_length", None)
 
-    if size:
-        print(f"[extract_text_secure] Uploaded file size: {size} bytes")
+def extract_text_secure(file: FileStorage, max_size_mb=None) -> str:
+    """Extract and normalize the text of an uploaded PDF (see extract_document)."""
+    return extract_document(file, max_size_mb).text
+
+
+def extract_document(file: FileStorage, max_size_mb=None) -> NormalizedText:
+    """
+    Extract the text of an uploaded PDF page by page, under the size, page,
+    length and time limits, and normalize it once (headers/footers, page
+    numbers, hyphenation, whitespace, duplicate blocks; see text_normalize).
+    Image-only and empty PDFs are rejected by a pre-scan of a few sampled
+    pages first (see pdf_scan); every page of the rest is extracted.
+    """
+    max_size_mb = max_size_mb or MAX_PDF_SIZE_MB
+    max_bytes = max_size_mb * 1024 * 1024
+
+    # Streamed uploads know their real size; otherwise fall back to the declared one
+    size = getattr(file.stream, "size", None) or getattr(file, "content_length", None)
+    logger.debug("Starting secure PDF extraction (size=%s bytes, limit=%s MB)", size, max_size_mb)
 
     # If size known, enforce size limit
-    if size and size > max_bytes:
+    if getattr(file.stream, "truncated", False) or (size and size > max_bytes):
         raise ValueError(f"[extract_text_secure] PDF too large ({size} bytes). Limit is {max_bytes} bytes.")
 
+    # Set once the pre-scan ran (or was skipped): what gets recorded and how much parse time it cost
+    kind, outcome, parse_started = None, "failed", None
     try:
-        with time_limit(MAX_PARSE_SECONDS):
-            print("[extract_text_secure] Parsing PDF with pypdf...")
-
-            pdf = PdfReader(file.stream)
+        with time_limit(MAX_PARSE_SECONDS), open_pdf_source(file.stream) as source:
+            pdf = PdfReader(source)
 
             if pdf.is_encrypted:
-                print("[extract_text_secure] PDF is encrypted; attempting decryption...")
+                logger.debug("PDF is encrypted; attempting decryption")
                 if not pdf.decrypt(""):
                     raise ValueError("[extract_text_secure] Encrypted PDF cannot be processed")
-                print("[extract_text_secure] Successfully decrypted PDF")
 
             num_pages = len(pdf.pages)
-            print(f"[extract_text_secure] PDF contains {num_pages} pages")
 
             if num_pages > MAX_PAGES:
                 raise ValueError(f"[extract_text_secure] PDF has too many pages ({num_pages}). Limit is {MAX_PAGES}.")
 
+            kind = "unscanned"
+            if PDF_PRESCAN:
+                with timed("prescan"):
+                    scan = classify_pdf(pdf)
+                kind = scan.kind
+                logger.debug("Pre-scan: %s (%d/%d sampled pages with text)", scan.kind, scan.text_pages, scan.sampled)
+                if not scan.has_text:
+                    outcome = "rejected"
+                    raise ValueError(
+                        f"[extract_text_secure] No extractable text found in PDF ({scan.kind} document without "
+                        "a text layer; scanned PDFs are not supported)"
+                    )
+
+            parse_started = time.perf_counter()
             parts = []
             total_chars = 0
 
+            debug = logger.isEnabledFor(logging.DEBUG)
             for idx, page in enumerate(pdf.pages):
-                print(f"[extract_text_secure] Extracting text from page {idx+1}/{num_pages}")
                 try:
-                    txt = page.extract_text() or ""
+                    with timed("extract_page"):
+                        txt = page.extract_text() or ""
                 except Exception as e:
-                    print(f"[extract_text_secure] Failed to extract text from page {idx+1}: {e}")
+                    logger.warning("Failed to extract text from page %d/%d: %s", idx + 1, num_pages, e)
                     continue
 
                 parts.append(txt)
                 total_chars += len(txt)
 
-                print(f"[extract_text_secure] Page {idx+1} extracted: {len(txt)} chars (total so far: {total_chars})")
+                if debug and sampled(idx, num_pages):
+                    logger.debug("Page %d/%d extracted: %d chars (total so far: %d)", idx + 1, num_pages, len(txt), total_chars)
 
                 if total_chars > MAX_TEXT_CHARS:
                     raise ValueError("[extract_text_secure] Extracted text exceeds maximum safe length")
 
-            text = "".join(parts)
-            if not text:
+            logger.info("Extracted %d characters from %d pages", total_chars, num_pages)
+            with timed("normalization"):
+                document = normalize_pages(parts)
+            if not document.text:
+                outcome = "no_text"
                 raise ValueError("[extract_text_secure] No extractable text found in PDF")
-
-            print(f"[extract_text_secure] Successfully extracted {len(text)} characters from PDF")
-            return text
+            outcome = "extracted"
+            return document
 
     except TimeoutException as e:
         raise RuntimeError(f"[extract_text_secure] PDF processing timed out: {e}")
     except Exception as e:
         raise RuntimeError(f"[extract_text_secure] PDF parsing failed: {e}")
+    finally:
+        if kind is not None:
+            record_scan(kind, outcome, time.perf_counter() - parse_started if parse_started else 0.0)
 
 
 
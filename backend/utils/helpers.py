@@ -1,15 +1,18 @@
 # builtin modules
 import re
-import html
 from typing import Tuple
 from typing import Optional, Union, Tuple
 # local modules
 from .file_utils import allowed_file
-from backend.configs.config import UNSAFE_UNICODE_PATTERN, MAX_HINTS_LENGTH, MAX_QUESTION_LENGTH
+from .sanitizer import sanitizer
+from backend.configs.config import MAX_PDF_SIZE_MB
 # third-party modules
 from flask import Response, render_template, flash, redirect, request
 
 
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
 # Error handling and redirection
 def handle_errors_and_redirect(
     error_message: str,
@@ -107,8 +110,7 @@ def is_valid_email(email: str) -> bool:
     bool
         True if email is valid, False otherwise
     """
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
 
 # Password strength validation
 def is_strong_password(password: str) -> bool:
@@ -150,7 +152,7 @@ def validate_file_upload(data) -> Tuple[list, list]:
         errors: list of error messages
         status_codes: list of corresponding HTTP status codes
     """
-    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    MAX_FILE_SIZE = MAX_PDF_SIZE_MB * 1024 * 1024
     errors = []
     status_codes = []
 
@@ -166,18 +168,21 @@ def validate_file_upload(data) -> Tuple[list, list]:
         status_codes.append(400)  # Bad Request
         return errors, status_codes
 
-    if not allowed_file(file.filename):
+    # Extension first, then the %PDF- header sniffed while the upload streamed in
+    if not allowed_file(file.filename) or not getattr(file.stream, "looks_like_pdf", True):
         errors.append(f"[validate_file_upload] File {file.filename} is not a PDF")
         status_codes.append(400)  # Bad Request
         return errors, status_codes
 
-    # Check file size more efficiently
-    file.seek(0, 2)  # Seek to end
-    file_size = file.tell()
-    file.seek(0)  # Reset to beginning
+    # Streamed uploads (HashingSpoolFile) already know their size; otherwise measure it
+    file_size = getattr(file.stream, "size", None)
+    if file_size is None:
+        file.seek(0, 2)  # Seek to end
+        file_size = file.tell()
+        file.seek(0)  # Reset to beginning
 
     if file_size > MAX_FILE_SIZE:
-        errors.append(f"[validate_file_upload] File {file.filename} is too large (max 10MB)")
+        errors.append(f"[validate_file_upload] File {file.filename} is too large (max {MAX_PDF_SIZE_MB}MB)")
         status_codes.append(400)  # Bad Request
         return errors, status_codes
 
@@ -186,93 +191,10 @@ def validate_file_upload(data) -> Tuple[list, list]:
 
 def sanitize_text(value: str, field_name: str) -> str:
     """
-    Perform security sanitation:
+    Perform security sanitation (see backend/utils/sanitizer.py):
     - Escape HTML/JS payloads
     - Remove dangerous Unicode
     - Collapse repeated characters
     - Remove suspicious patterns like base64 bombs
     """
-
-    if not isinstance(value, str):
-        raise ValueError(f"[validate_chat_request] Invalid type for {field_name}. Expected string.")
-
-    # Trim whitespace
-    value = value.strip()
-
-    # Reject invisible/malicious unicode
-    if UNSAFE_UNICODE_PATTERN.search(value):
-        raise ValueError(f"[validate_chat_request] {field_name} contains unsupported characters")
-
-    # Escape HTML to avoid injection (even though API returns JSON)
-    value = html.escape(value)
-
-    # Basic sanity filters — avoid pathological repetition like "AAAAA..." x 1M
-    if len(set(value)) == 1 and len(value) > 100:
-        raise ValueError(f"[validate_chat_request] {field_name} appears malicious (repetitive payload detected).")
-
-    # Avoid extremely long base64 strings or binary-like payloads
-    if re.fullmatch(r"[A-Za-z0-9+/=]{2000,}", value):
-        raise ValueError(f"[validate_chat_request] {field_name} looks like a suspicious encoded payload.")
-
-    return value
-
-
-def validate_chat_request(data: dict) -> Tuple[list, list, int, int, str, str]:
-    """Validate chat request data with security protections."""
-
-    errors = []
-    status_codes = []
-
-    if not data:
-        errors.append("[validate_chat_request] No form data provided")
-        return errors, [400], None, None, "", ""
-
-    # Extract raw input safely
-    raw_hints = data.get('hints', '')
-    raw_question = data.get('question', '')
-
-    # Required checks
-    if not raw_hints:
-        errors.append("[validate_chat_request] Hints are required")
-        status_codes.append(400)
-    if not raw_question:
-        errors.append("[validate_chat_request] Question is required")
-        status_codes.append(400)
-
-    # Extract id fields
-    file_id = data.get('file_id', '').strip()
-    conversation_id = data.get('conversation_id', '').strip()
-
-    if not file_id and not conversation_id:
-        errors.append("[validate_chat_request] Internal Server Error. Please try again.")
-        status_codes.append(500)
-
-    # Convert IDs to integers
-    try:
-        file_id = int(file_id) if file_id else None
-        conversation_id = int(conversation_id) if conversation_id else None
-    except ValueError:
-        errors.append("[validate_chat_request] Invalid type for file_id or conversation_id")
-        status_codes.append(400)
-
-    # Length validation BEFORE sanitization
-    if len(raw_hints) > MAX_HINTS_LENGTH:
-        errors.append(f"[validate_chat_request] Hints must be less than {MAX_HINTS_LENGTH} characters")
-        status_codes.append(400)
-    if len(raw_question) > MAX_QUESTION_LENGTH:
-        errors.append(f"[validate_chat_request] Question must be less than {MAX_QUESTION_LENGTH} characters")
-        status_codes.append(400)
-
-    # Sanitize inputs (secure)
-    try:
-        hints = sanitize_text(raw_hints, "hints")
-        question = sanitize_text(raw_question, "question")
-    except ValueError as e:
-        errors.append(str(e))
-        status_codes.append(400)
-        return errors, status_codes, None, None, "", ""
-
-    print(f"[validate_chat_request] Validated request: file_id={file_id}, conversation_id={conversation_id}")
-
-    return errors, status_codes, file_id, conversation_id, question, hints
-
+    return sanitizer.clean(value, field_name)
@@ -0,0 +1,106 @@
+"""
+Logging setup for the backend.
+
+Records are handed to a QueueHandler so request threads never block on
+stream I/O; a single QueueListener thread does the actual writing.
+Every record carries the id of the request that produced it, so the
+stages of one chat or upload request can be correlated.
+"""
+import re
+import sys
+import uuid
+import queue
+import atexit
+import logging
+import logging.handlers
+from contextvars import ContextVar
+
+from flask import request, g
+
+from backend.configs.config import LOG_LEVEL, LOG_LEVELS, LOG_SAMPLE_EVERY
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] [req=%(request_id)s] %(message)s"
+
+# Incoming X-Request-ID values are only trusted if they look like an id
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+_listener = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request id to every record (runs in the emitting thread)."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+def parse_levels(spec: str) -> dict:
+    """
+    Parse per-module levels, e.g. "backend.utils.file_utils=DEBUG,backend.api=WARNING".
+    Malformed entries are ignored.
+    """
+    levels = {}
+    for item in (spec or "").split(","):
+        name, _, level = item.partition("=")
+        name, level = name.strip(), level.strip().upper()
+        if name and level in logging._nameToLevel:
+            levels[name] = level
+    return levels
+
+
+def configure_logging():
+    """Route the 'backend' logger tree through a non-blocking queue. Safe to call repeatedly."""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    logger = logging.getLogger("backend")
+    logger.setLevel(LOG_LEVEL)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    for name, level in parse_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(_listener.stop)
+
+
+def sampled(index: int, total: int = 0, every: int = LOG_SAMPLE_EVERY) -> bool:
+    """True for the first, every N-th and the last iteration of a hot loop."""
+    return index == 0 or (every > 0 and index % every == 0) or index == total - 1
+
+
+def init_app(app):
+    """Assign a request id to every request and echo it back as X-Request-ID."""
+    configure_logging()
+
+    @app.before_request
+    def _assign_request_id():
+        incoming = request.headers.get("X-Request-ID", "")
+        request_id = incoming if _REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex[:16]
+        g.request_id = request_id
+        request_id_var.set(request_id)
+
+    @app.after_request
+    def _echo_request_id(response):
+        if "request_id" in g:
+            response.headers["X-Request-ID"] = g.request_id
+        return response
+
+    @app.teardown_request
+    def _clear_request_id(exc):
+        # Worker threads are reused; don't leak the id into the next request
+        request_id_var.set("-")
@@ -0,0 +1,338 @@
+"""
+In-process metrics (counters and histograms) rendered in the Prometheus
+text exposition format by the /metrics endpoint.
+
+Each worker process keeps its own registry, and a scrape of /metrics reaches
+one worker only. With METRICS_DIR set (gunicorn.conf.py does), every worker
+writes a snapshot of its values to its own file in that directory, at least
+every METRICS_FLUSH_SECONDS and whenever it serves a scrape, and /metrics
+merges the snapshots of all workers: counters and histogram buckets are
+summed, so a scrape sees the whole service whichever worker answers it.
+The snapshots of exited workers are folded into one "retired" snapshot
+(under a lock, so no scrape counts a worker twice), so counters never go
+backwards and recycled workers don't pile up files. The directory is
+cleared when the gunicorn master starts. Without METRICS_DIR
+(a single process) only the local values are rendered.
+"""
+import os
+import json
+import math
+import time
+import fcntl
+import atexit
+import secrets
+import logging
+import threading
+from contextlib import contextmanager
+
+from flask import request, g
+
+from backend.configs.config import METRICS_DIR, METRICS_FLUSH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Snapshot of the processes that have exited, in METRICS_DIR
+RETIRED_SNAPSHOT = "retired.json"
+
+# Latency buckets in seconds, from sub-millisecond DB work up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers (0 for empty lists)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct * len(ordered) / 100) - 1)]
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        return self._values.get(key, 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def merge(total: dict, values: dict):
+        for key, value in values.items():
+            total[key] = total.get(key, 0) + value
+
+    def render(self, values: dict = None):
+        items = sorted((self.snapshot() if values is None else values).items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[idx] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        state = self._values.get(key)
+        return state[-1] if state else 0
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {key: list(state) for key, state in self._values.items()}
+
+    @staticmethod
+    def merge(total: dict, values: dict):
+        for key, state in values.items():
+            if key in total:
+                total[key] = [a + b for a, b in zip(total[key], state)]
+            else:
+                total[key] = list(state)
+
+    def render(self, values: dict = None):
+        items = sorted((self.snapshot() if values is None else values).items())
+        lines = []
+        for key, state in items:
+            for bound, bucket_count in zip(self.buckets, state):
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', bound))} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._directory = None
+        self._snapshot_path = None
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"[metrics] Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def share_through(self, directory: str, flush_seconds: float = METRICS_FLUSH_SECONDS):
+        """Write this process's snapshots to `directory` and render the merge of all processes' snapshots."""
+        if self._directory == directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        self._directory, self._snapshot_path = directory, None
+        self.write_snapshot()
+
+        def flush_loop():
+            while True:
+                time.sleep(flush_seconds)
+                try:
+                    self.write_snapshot()
+                except OSError as e:
+                    logger.warning("Could not write the metrics snapshot: %s", e)
+
+        threading.Thread(target=flush_loop, name="metrics-flush", daemon=True).start()
+        atexit.register(self.write_snapshot)
+
+    def write_snapshot(self):
+        # One file per process (pid plus a random suffix, as pids are reused by later workers)
+        if self._snapshot_path is None or not os.path.basename(self._snapshot_path).startswith(f"{os.getpid()}-"):
+            self._snapshot_path = os.path.join(self._directory, f"{os.getpid()}-{secrets.token_hex(4)}.json")
+        data = {name: [[list(key), value] for key, value in metric.snapshot().items()]
+                for name, metric in list(self._metrics.items())}
+        tmp = self._snapshot_path + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, self._snapshot_path)
+
+    def _read_snapshot(self, path: str, merged: dict):
+        try:
+            with open(path) as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        for metric_name, items in data.items():
+            metric = self._metrics.get(metric_name)
+            if metric is not None:
+                metric.merge(merged.setdefault(metric_name, {}), {tuple(key): value for key, value in items})
+
+    def _retire_exited(self):
+        """Fold the snapshots of exited processes into RETIRED_SNAPSHOT. Call with the directory lock held."""
+        exited = []
+        for name in os.listdir(self._directory):
+            pid = name.split("-", 1)[0]
+            if not (name.endswith(".json") and pid.isdigit()):
+                continue
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                exited.append(os.path.join(self._directory, name))
+            except OSError:
+                pass
+        if not exited:
+            return
+        retired_path = os.path.join(self._directory, RETIRED_SNAPSHOT)
+        retired = {}
+        for path in [retired_path] + exited:
+            self._read_snapshot(path, retired)
+        data = {name: [[list(key), value] for key, value in values.items()] for name, values in retired.items()}
+        with open(retired_path + ".tmp", "w") as fh:
+            json.dump(data, fh)
+        os.replace(retired_path + ".tmp", retired_path)
+        for path in exited:
+            os.unlink(path)
+
+    def _merged(self) -> dict:
+        """Values of every metric summed over the snapshots of all processes."""
+        self.write_snapshot()
+        merged = {}
+        with open(os.path.join(self._directory, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._retire_exited()
+            for name in os.listdir(self._directory):
+                if name.endswith(".json"):
+                    self._read_snapshot(os.path.join(self._directory, name), merged)
+        return merged
+
+    def render(self) -> str:
+        merged = self._merged() if self._directory else {}
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render(merged.get(metric.name)))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "hr_request_duration_seconds", "Time spent handling a request.", ("endpoint", "method", "status")
+))
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "hr_stage_duration_seconds", "Time spent in each stage of the upload and chat paths.", ("stage",)
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "hr_llm_tokens_total", "Tokens reported by the LLM API usage field.", ("type",)
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "hr_cache_requests_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result")
+))
+ARCHIVED_ROWS = REGISTRY.register(Counter(
+    "hr_archived_rows_total", "Rows archived and deleted by the retention job.", ("table",)
+))
+EXPORTED_ROWS = REGISTRY.register(Counter(
+    "hr_exported_rows_total", "Rows written by exports, by export and format.", ("export", "format")
+))
+
+
+@contextmanager
+def timed(stage: str):
+    """Record the duration of the wrapped block under hr_stage_duration_seconds{stage=...}."""
+    with STAGE_DURATION.time(stage=stage):
+        yield
+
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_DURATION.observe(seconds, stage=stage)
+
+
+def record_tokens(usage):
+    """Add the token counts from an OpenAI `usage` object (None-safe)."""
+    if usage is None:
+        return
+    LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, type="prompt")
+    LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, type="completion")
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) if details is not None else 0
+    LLM_TOKENS.inc(cached or 0, type="cached_prompt")
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def init_app(app):
+    """Time every request by endpoint, method and status code."""
+    directory = app.config.get('METRICS_DIR', METRICS_DIR)
+    if directory:
+        REGISTRY.share_through(directory)
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        started = g.pop("_metrics_started", None)
+        if started is not None:
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                endpoint=request.endpoint or "unknown",
+                method=request.method,
+                status=response.status_code,
+            )
+        return response
@@ -0,0 +1,173 @@
+"""
+Near-duplicate detection of candidate documents with MinHash and LSH.
+
+The same candidate often arrives through several agencies with slightly
+different versions of one CV. Each upload's normalized text is cut into
+shingles of SHINGLE_WORDS words, and the shingle set is summarized by a
+MinHash signature of MINHASH_BINS values: the share of equal values in two
+signatures estimates the Jaccard similarity of the two shingle sets. The
+signature is built in one pass with one-permutation hashing: every shingle
+is hashed once, and the hash picks a bin and competes for that bin's
+minimum. Empty bins borrow from the next non-empty one (densification).
+
+For lookup, the signature is cut into LSH_BANDS bands and each band is
+hashed into a bucket key. Rows of (user, bucket) live in `lsh_buckets`, so
+the candidates of an upload are found by a single indexed query on its
+LSH_BANDS keys, however many documents the user has. The MAX_CANDIDATES
+documents sharing the most bands are then checked against their stored
+signatures. An upload whose estimated
+similarity reaches NEAR_DUPLICATE_THRESHOLD is linked to the earlier
+document (its fingerprint's `duplicate_of`, always the first version of
+the document).
+
+Everything hashes with blake2b, so fingerprints are stable across processes
+and restarts (unlike hash()).
+"""
+import re
+import struct
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from backend import db
+from backend.configs.config import NEAR_DUPLICATE_THRESHOLD, SHINGLE_WORDS, MINHASH_BINS, LSH_BANDS
+from backend.database.models import FileFingerprint, LshBucket
+from backend.utils.metrics import REGISTRY, Counter
+
+logger = logging.getLogger(__name__)
+
+NEAR_DUPLICATES_FOUND = REGISTRY.register(Counter(
+    "hr_near_duplicates_total", "Fingerprinted uploads, by whether they nearly duplicate an earlier one.", ("result",)
+))
+
+WORD_PATTERN = re.compile(r"\w+")
+HASH_BITS = 64
+# Only this many LSH candidates are compared, so a lookup stays bounded even for a huge bucket
+MAX_CANDIDATES = 50
+
+
+@dataclass
+class Fingerprint:
+    signature: tuple
+    duplicate_of: Optional[int] = None
+    similarity: Optional[float] = None
+
+
+def _hash64(data: bytes, salt: bytes = b"") -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8, salt=salt).digest(), "big")
+
+
+def shingle_hashes(text: str, words: int = SHINGLE_WORDS) -> set:
+    """64-bit hashes of the text's word n-grams (the whole text if it is shorter than one)."""
+    tokens = WORD_PATTERN.findall(text.lower())
+    if not tokens:
+        return set()
+    if len(tokens) <= words:
+        return {_hash64(" ".join(tokens).encode())}
+    return {_hash64(" ".join(tokens[i:i + words]).encode()) for i in range(len(tokens) - words + 1)}
+
+
+def minhash(hashes: set, bins: int = MINHASH_BINS) -> Optional[tuple]:
+    """One-permutation MinHash signature of a set of 64-bit hashes (None for an empty set)."""
+    if not hashes:
+        return None
+    empty = 1 << HASH_BITS
+    signature = [empty] * bins
+    for value in hashes:
+        slot, rest = value % bins, value // bins
+        if rest < signature[slot]:
+            signature[slot] = rest
+    # Densify: an empty bin takes the value of the next non-empty bin, offset by the distance
+    if empty in signature:
+        original = signature[:]
+        for slot in range(bins):
+            if original[slot] == empty:
+                distance = 1
+                while original[(slot + distance) % bins] == empty:
+                    distance += 1
+                signature[slot] = original[(slot + distance) % bins] + distance * (empty // bins)
+    return tuple(signature)
+
+
+def similarity(a: tuple, b: tuple) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    if len(a) != len(b):
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def band_keys(signature: tuple, bands: int = LSH_BANDS) -> list:
+    """One bucket key per band; 63 bits so they fit SQLite's signed INTEGER."""
+    rows = len(signature) // bands
+    return [
+        _hash64(pack(signature[band * rows:(band + 1) * rows]), salt=band.to_bytes(2, "big")) >> 1
+        for band in range(bands)
+    ]
+
+
+def pack(signature: tuple) -> bytes:
+    return struct.pack(f">{len(signature)}Q", *signature)
+
+
+def unpack(data: bytes) -> tuple:
+    return struct.unpack(f">{len(data) // 8}Q", data)
+
+
+def fingerprint_document(user_id: int, text: str, threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                         connection=None) -> Optional[Fingerprint]:
+    """
+    Fingerprint `text` and look for a near-duplicate among `user_id`'s
+    documents (one query, on `connection` if given, else the session).
+    Returns None for text without words.
+    """
+    signature = minhash(shingle_hashes(text))
+    if signature is None:
+        return None
+
+    candidates = (connection or db.session).execute(
+        db.select(FileFingerprint.file_id, FileFingerprint.signature, FileFingerprint.duplicate_of)
+        .join(LshBucket, LshBucket.file_id == FileFingerprint.file_id)
+        .where(LshBucket.user == user_id, LshBucket.bucket.in_(band_keys(signature)))
+        .group_by(FileFingerprint.file_id, FileFingerprint.signature, FileFingerprint.duplicate_of)
+        # Documents sharing the most bands are the likeliest duplicates: compare those first
+        .order_by(db.func.count().desc(), FileFingerprint.file_id)
+        .limit(MAX_CANDIDATES)
+    ).all()
+
+    fingerprint = Fingerprint(signature)
+    for file_id, stored, duplicate_of in candidates:
+        score = similarity(signature, unpack(stored))
+        if score >= threshold and (fingerprint.similarity is None or score > fingerprint.similarity):
+            # Link to the first version, not to another copy of it
+            fingerprint.duplicate_of = duplicate_of or file_id
+            fingerprint.similarity = score
+    NEAR_DUPLICATES_FOUND.inc(result="duplicate" if fingerprint.duplicate_of else "unique")
+    if fingerprint.duplicate_of:
+        logger.info("Upload of user %s is a near-duplicate of file %s (similarity %.2f)",
+                    user_id, fingerprint.duplicate_of, fingerprint.similarity)
+    return fingerprint
+
+
+def fingerprint_rows(user_id: int, file_id: int, fingerprint: Fingerprint) -> tuple:
+    """The file_fingerprints row and the lsh_buckets rows of a fingerprint."""
+    row = {
+        "file_id": file_id, "user": user_id, "signature": pack(fingerprint.signature),
+        "duplicate_of": fingerprint.duplicate_of, "similarity": fingerprint.similarity,
+    }
+    buckets = [{"user": user_id, "bucket": key, "file_id": file_id} for key in band_keys(fingerprint.signature)]
+    return row, buckets
+
+
+def store_fingerprint(user_id: int, file_id: int, fingerprint: Fingerprint):
+    """Add the fingerprint and its LSH buckets to the current session (committed by the caller)."""
+    row, buckets = fingerprint_rows(user_id, file_id, fingerprint)
+    db.session.add(FileFingerprint(**row))
+    db.session.add_all(LshBucket(**bucket) for bucket in buckets)
+
+
+def original_of(file_id: int) -> Optional[int]:
+    """The earlier document `file_id` nearly duplicates, if any."""
+    return db.session.execute(
+        db.select(FileFingerprint.duplicate_of).filter_by(file_id=file_id)
+    ).scalar_one_or_none()
@@ -0,0 +1,71 @@
+"""
+Password hashing off the request thread.
+
+Hashing and verification run on a small bounded thread pool (hashlib's
+pbkdf2/scrypt release the GIL), so a login burst can occupy at most
+PASSWORD_HASH_WORKERS cores while the rest keep serving chat. When the
+pool and its queue are full, callers get PasswordHashingBusy right away
+instead of piling up.
+
+The hash method is configurable (PASSWORD_HASH_METHOD); hashes made with
+older parameters are upgraded transparently on the next successful login.
+"""
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from backend.configs.config import (
+    PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH, PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_QUEUE, PASSWORD_HASH_TIMEOUT_SECONDS
+)
+from backend.utils.metrics import timed
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing pool is saturated or too slow to answer in time."""
+
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+# Running + queued jobs allowed at once
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE)
+
+
+def _run(fn, *args):
+    if not _slots.acquire(blocking=False):
+        raise PasswordHashingBusy("[passwords] Password hashing pool is saturated")
+    try:
+        future = _executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=PASSWORD_HASH_TIMEOUT_SECONDS)
+    except FutureTimeout as e:
+        raise PasswordHashingBusy("[passwords] Password hashing timed out") from e
+
+
+def hash_password(password: str) -> str:
+    """Hash with the configured method on the hashing pool."""
+    with timed("password_hash"):
+        return _run(generate_password_hash, password, PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH)
+
+
+def verify_password(stored_hash: str, password: str) -> bool:
+    """Check a password against its stored hash on the hashing pool."""
+    with timed("password_verify"):
+        return _run(check_password_hash, stored_hash, password)
+
+
+@lru_cache(maxsize=1)
+def _current_prefix() -> str:
+    # Werkzeug fills in default parameters (e.g. iterations), so derive the
+    # canonical "method:params" prefix from a real hash once per process.
+    return generate_password_hash("", PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH).split("$", 1)[0]
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """True when `stored_hash` was produced with other parameters than PASSWORD_HASH_METHOD."""
+    return stored_hash.split("$", 1)[0] != _current_prefix()
@@ -0,0 +1,162 @@
+"""
+Cheap pre-scan of a PDF's text layer, run before full text extraction.
+
+A scanned CV has no text layer, only page-sized images, and
+`page.extract_text()` still interprets every content stream (and loads every
+font) before it finds nothing. The pre-scan only reads resource dictionaries
+and looks for text-showing operators in the raw content streams, on up to
+PRESCAN_SAMPLE_PAGES pages spread over the document, and classifies it:
+
+    text    every sampled page has text
+    image   no sampled page has text, at least one has images
+    mixed   some sampled pages have text, some don't
+    empty   no text and no images on any sampled page
+
+"image" and "empty" documents are rejected before extraction. Scans and the
+time spent on full extraction are counted per kind and outcome, so the share
+of parse time wasted on documents that yield no text can be monitored.
+"""
+import re
+import logging
+from dataclasses import dataclass
+
+from pypdf.generic import IndirectObject
+
+from backend.configs.config import PRESCAN_SAMPLE_PAGES
+from backend.utils.metrics import REGISTRY, Counter
+
+logger = logging.getLogger(__name__)
+
+PDF_SCANS = REGISTRY.register(Counter(
+    "hr_pdf_scans_total", "PDF pre-scan classifications by kind and extraction outcome.", ("kind", "outcome")
+))
+PARSE_SECONDS = REGISTRY.register(Counter(
+    "hr_pdf_parse_seconds_total", "Seconds spent on full PDF text extraction by kind and outcome.", ("kind", "outcome")
+))
+
+# Form XObjects can nest; deeper nesting is treated as having no text
+MAX_XOBJECT_DEPTH = 3
+# A text-showing operator (Tj, TJ, ', ") after its string or array operand
+SHOW_TEXT = re.compile(rb"[)>\]]\s*(?:Tj|TJ|'|\")")
+
+KINDS = ("text", "image", "mixed", "empty", "unscanned")
+# "rejected" by the pre-scan, or extraction ran and "extracted" text, found "no_text" or "failed"
+OUTCOMES = ("extracted", "rejected", "no_text", "failed")
+
+
+@dataclass
+class ScanResult:
+    kind: str
+    pages: int
+    sampled: int
+    text_pages: int
+    image_pages: int
+
+    @property
+    def has_text(self) -> bool:
+        return self.kind in ("text", "mixed")
+
+
+def _resolve(obj):
+    return obj.get_object() if isinstance(obj, IndirectObject) else obj
+
+
+def _shows_text(data: bytes) -> bool:
+    return SHOW_TEXT.search(data) is not None
+
+
+def inspect_resources(resources, depth: int = 0) -> tuple:
+    """
+    (has_text, has_images) of the form XObjects and images in a resource
+    dictionary. A form has text when it declares fonts and its content
+    stream shows text.
+    """
+    resources = _resolve(resources)
+    has_text = has_images = False
+    if not resources:
+        return has_text, has_images
+    xobjects = _resolve(resources.get("/XObject")) or {}
+    for xobject in xobjects.values():
+        xobject = _resolve(xobject)
+        subtype = xobject.get("/Subtype")
+        if subtype == "/Image":
+            has_images = True
+        elif subtype == "/Form" and depth < MAX_XOBJECT_DEPTH:
+            form_resources = _resolve(xobject.get("/Resources"))
+            if not has_text and form_resources and form_resources.get("/Font") and _shows_text(xobject.get_data()):
+                has_text = True
+            form_text, form_images = inspect_resources(form_resources, depth + 1)
+            has_text = has_text or form_text
+            has_images = has_images or form_images
+        if has_text and has_images:
+            break
+    return has_text, has_images
+
+
+def inspect_page(page) -> tuple:
+    """
+    (has_text, has_images) of one page. Only resource dictionaries and raw
+    content streams are read; many producers declare the same fonts (and an
+    empty text object) on every page, so a page only counts as text when its
+    content stream actually shows a string.
+    """
+    resources = _resolve(page.get("/Resources"))
+    has_text, has_images = inspect_resources(resources)
+    if not has_text and resources and resources.get("/Font"):
+        contents = page.get_contents()
+        has_text = contents is not None and _shows_text(contents.get_data())
+    return has_text, has_images
+
+
+def sample_indexes(num_pages: int, sample: int = PRESCAN_SAMPLE_PAGES) -> list:
+    """Up to `sample` page indexes evenly spread from the first to the last page."""
+    if num_pages <= sample:
+        return list(range(num_pages))
+    if sample <= 1:
+        return [0]
+    step = (num_pages - 1) / (sample - 1)
+    return sorted({round(i * step) for i in range(sample)})
+
+
+def classify_pdf(pdf, sample: int = PRESCAN_SAMPLE_PAGES) -> ScanResult:
+    """Classify a PdfReader's document from the resources of a sample of its pages."""
+    num_pages = len(pdf.pages)
+    text_pages = image_pages = 0
+    indexes = sample_indexes(num_pages, sample)
+    for idx in indexes:
+        try:
+            has_text, has_images = inspect_page(pdf.pages[idx])
+        except Exception as e:
+            logger.debug("Pre-scan could not read page %d: %s", idx + 1, e)
+            has_text, has_images = True, False
+        text_pages += has_text
+        image_pages += has_images and not has_text
+
+    if text_pages == len(indexes) and indexes:
+        kind = "text"
+    elif text_pages:
+        kind = "mixed"
+    elif image_pages:
+        kind = "image"
+    else:
+        kind = "empty"
+    return ScanResult(kind, num_pages, len(indexes), text_pages, image_pages)
+
+
+def record_scan(kind: str, outcome: str, parse_seconds: float = 0.0):
+    """Count one scanned document and the full-extraction time spent on it."""
+    PDF_SCANS.inc(kind=kind, outcome=outcome)
+    if parse_seconds:
+        PARSE_SECONDS.inc(parse_seconds, kind=kind, outcome=outcome)
+
+
+def wasted_parse_share() -> float:
+    """Share of full-extraction time in this process spent on documents that yielded no text."""
+    total = wasted = 0.0
+    for kind in KINDS:
+        for outcome in OUTCOMES:
+            seconds = PARSE_SECONDS.value(kind=kind, outcome=outcome)
+            total += seconds
+            if outcome != "extracted":
+                wasted += seconds
+    return wasted / total if total else 0.0
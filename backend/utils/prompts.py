@@ -0,0 +1,70 @@
+"""
+Prompt layout for the HR assistant, ordered for provider-side prefix caching.
+
+OpenAI reuses the longest prompt prefix it has already seen (from 1024
+tokens, in 128-token steps), which cuts latency and cost of follow-up
+questions about the same document. So everything that stays the same for
+a document comes first and is byte-identical on every turn, and the parts
+that change per message come last:
+
+    1. system prompt          (constant)
+    2. document               (constant per file)
+    3. hints, then question   (change per message)
+
+Nothing variable (dates, ids, user names) may be added to 1. or 2.
+"""
+import hashlib
+import logging
+
+from backend.utils.metrics import LLM_TOKENS, record_cache
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a HR Specialist."
+
+
+def document_message(file_content: str) -> dict:
+    return {"role": "user", "content": f"Files: {file_content}"}
+
+
+def build_messages(hints: str, question: str, file_content: str) -> list:
+    """Chat messages with the cacheable prefix (system + document) first."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        document_message(file_content),
+        {"role": "user", "content": hints},
+        {"role": "user", "content": f"Question: {question}?"},
+    ]
+
+
+def prompt_cache_key(file_content: str) -> str:
+    """Stable per-document key, so requests about one document are routed to the same cache."""
+    return "doc-" + hashlib.sha256(file_content.encode("utf-8")).hexdigest()[:32]
+
+
+def record_prefix_cache(usage):
+    """
+    Count a prefix-cache hit or miss from an OpenAI `usage` object.
+
+    Returns
+    -------
+    tuple
+        (cached_tokens, prompt_tokens) of this call.
+    """
+    if usage is None:
+        return 0, 0
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+    record_cache("llm_prefix", cached_tokens > 0)
+    logger.info(
+        "Prompt cache: %d of %d prompt tokens cached (process token hit rate %.0f%%)",
+        cached_tokens, prompt_tokens, prefix_cache_hit_rate() * 100
+    )
+    return cached_tokens, prompt_tokens
+
+
+def prefix_cache_hit_rate() -> float:
+    """Share of prompt tokens served from the provider's prefix cache in this process."""
+    prompt_tokens = LLM_TOKENS.value(type="prompt")
+    return LLM_TOKENS.value(type="cached_prompt") / prompt_tokens if prompt_tokens else 0.0
@@ -0,0 +1,149 @@
+"""
+SQL query auditing on SQLAlchemy engine events.
+
+Every statement executed while a QueryStats collector is active is counted
+and timed. With QUERY_AUDIT enabled, each request gets its own collector:
+the query count is returned in X-Query-Count, slow queries are logged
+together with their EXPLAIN QUERY PLAN (SQLite), and a statement repeated
+QUERY_REPEAT_WARN times within one request is reported as a likely N+1.
+
+Tests use capture_queries() directly (see the `max_queries` fixture in
+backend/tests/conftest.py), whatever QUERY_AUDIT is set to.
+"""
+import time
+import logging
+from collections import Counter as TallyCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.configs.config import QUERY_AUDIT, QUERY_SLOW_MS, QUERY_REPEAT_WARN
+from backend.utils.metrics import REGISTRY, Histogram
+
+logger = logging.getLogger(__name__)
+
+QUERY_DURATION = REGISTRY.register(Histogram(
+    "hr_db_query_duration_seconds", "SQL statement execution time.", ("operation",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+))
+
+# Collectors recording the current context's queries (a request, a test block, or both)
+_active: ContextVar[tuple] = ContextVar("query_collectors", default=())
+
+
+class QueryStats:
+    """Statements, durations and repeat counts recorded while active."""
+
+    def __init__(self, slow_ms: float = QUERY_SLOW_MS):
+        self.slow_ms = slow_ms
+        self.queries = []            # (statement, seconds)
+        self.repeats = TallyCounter()
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(seconds for _, seconds in self.queries)
+
+    def record(self, statement: str, seconds: float):
+        self.queries.append((statement, seconds))
+        self.repeats[statement] += 1
+
+    def repeated(self, threshold: int = QUERY_REPEAT_WARN):
+        """Statements executed at least `threshold` times, most frequent first."""
+        return [(stmt, n) for stmt, n in self.repeats.most_common() if n >= threshold]
+
+    def describe(self) -> str:
+        lines = [f"{self.count} queries, {self.total_seconds * 1000:.1f} ms total"]
+        lines += [f"  {seconds * 1000:7.2f} ms  {' '.join(stmt.split())}" for stmt, seconds in self.queries]
+        return "\n".join(lines)
+
+
+@contextmanager
+def capture_queries(slow_ms: float = QUERY_SLOW_MS):
+    """Record every query executed in this context into a fresh QueryStats."""
+    stats = QueryStats(slow_ms)
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+def explain(conn, cursor, statement, parameters) -> str:
+    """EXPLAIN QUERY PLAN for a SELECT, on the raw DBAPI connection so no events fire."""
+    if conn.dialect.name != "sqlite":
+        return "(plan only available on SQLite)"
+    cursor = cursor.connection.cursor()
+    try:
+        rows = cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters or ()).fetchall()
+    except Exception as e:
+        return f"(could not explain: {e})"
+    finally:
+        cursor.close()
+    return "\n".join(f"  {row[-1]}" for row in rows)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get():
+        conn.info.setdefault("query_audit_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = _active.get()
+    starts = conn.info.get("query_audit_start")
+    if not collectors or not starts:
+        return
+    seconds = time.perf_counter() - starts.pop()
+    operation = statement.lstrip()[:6].upper()
+    QUERY_DURATION.observe(seconds, operation=operation)
+    for stats in collectors:
+        stats.record(statement, seconds)
+
+    slow_ms = min(stats.slow_ms for stats in collectors)
+    if seconds * 1000 >= slow_ms and operation == "SELECT" and not executemany:
+        logger.warning(
+            "Slow query (%.1f ms): %s\n%s",
+            seconds * 1000, " ".join(statement.split()), explain(conn, cursor, statement, parameters)
+        )
+
+
+def instrument_engines():
+    """Listen on every Engine; the listeners are no-ops unless a collector is active."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def init_app(app):
+    """With QUERY_AUDIT on, give every request its own QueryStats and report on it."""
+    instrument_engines()
+    if not app.config.get('QUERY_AUDIT', QUERY_AUDIT):
+        return
+
+    @app.before_request
+    def _start_query_audit():
+        g.query_stats = QueryStats(app.config.get('QUERY_SLOW_MS', QUERY_SLOW_MS))
+        _active.set(_active.get() + (g.query_stats,))
+
+    @app.after_request
+    def _report_query_audit(response):
+        stats = g.get("query_stats")
+        if stats is None:
+            return response
+        response.headers["X-Query-Count"] = str(stats.count)
+        for statement, n in stats.repeated(app.config.get('QUERY_REPEAT_WARN', QUERY_REPEAT_WARN)):
+            logger.warning("Possible N+1 on %s: statement ran %d times: %s", request.endpoint, n, " ".join(statement.split()))
+        logger.debug("%s %s ran %s", request.method, request.path, stats.describe())
+        return response
+
+    @app.teardown_request
+    def _stop_query_audit(exc):
+        stats = g.pop("query_stats", None)
+        if stats is not None:
+            _active.set(tuple(s for s in _active.get() if s is not stats))
@@ -0,0 +1,105 @@
+"""
+Cheap fixed-window counters used for quotas and throttling.
+
+Counts live in process memory behind one lock, so a check costs a dict
+lookup and never touches the database. With COUNTER_BACKEND=redis they
+are kept in Redis instead so that limits hold across all workers.
+"""
+import time
+import threading
+from typing import Tuple
+
+from backend.configs.config import COUNTER_BACKEND, REDIS_URL
+
+# Stale windows are purged once this many keys are tracked
+MAX_TRACKED_KEYS = 10_000
+
+
+class FixedWindowCounter:
+    """Thread-safe counters per key, reset at the start of every time window."""
+
+    def __init__(self):
+        self._counts = {}   # key -> (window index, count)
+        self._lock = threading.Lock()
+
+    def hit(self, key, window_seconds: int, amount: int = 1) -> Tuple[int, float]:
+        """
+        Add `amount` to the counter for `key` in the current window.
+
+        Returns
+        -------
+        Tuple[int, float]
+            The count in the current window (including this hit) and the
+            seconds until the window resets.
+        """
+        now = time.time()
+        window = int(now // window_seconds)
+        with self._lock:
+            stored_window, count = self._counts.get(key, (window, 0))
+            if stored_window != window:
+                count = 0
+            count += amount
+            self._counts[key] = (window, count)
+            if len(self._counts) > MAX_TRACKED_KEYS:
+                self._purge(window_seconds, now)
+        return count, (window + 1) * window_seconds - now
+
+    def reset(self, key):
+        with self._lock:
+            self._counts.pop(key, None)
+
+    def _purge(self, window_seconds, now):
+        current = int(now // window_seconds)
+        for key in [k for k, (w, _) in self._counts.items() if w != current]:
+            del self._counts[key]
+
+
+class RedisWindowCounter:
+    """Same interface as FixedWindowCounter, backed by INCRBY/EXPIRE on a shared Redis."""
+
+    def __init__(self, url: str, prefix: str = "hr:counter:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("[RedisWindowCounter] COUNTER_BACKEND=redis requires the 'redis' package") from e
+        self._redis = redis.from_url(url)
+        self.prefix = prefix
+
+    def hit(self, key, window_seconds: int, amount: int = 1) -> Tuple[int, float]:
+        now = time.time()
+        window = int(now // window_seconds)
+        name = f"{self.prefix}{key}:{window}"
+        pipe = self._redis.pipeline()
+        pipe.incrby(name, amount)
+        pipe.expire(name, window_seconds)
+        count, _ = pipe.execute()
+        return int(count), (window + 1) * window_seconds - now
+
+    def reset(self, key):
+        for name in self._redis.scan_iter(f"{self.prefix}{key}:*"):
+            self._redis.delete(name)
+
+
+def make_counter(prefix: str):
+    """Counter store selected by COUNTER_BACKEND."""
+    if COUNTER_BACKEND == "redis":
+        return RedisWindowCounter(REDIS_URL, prefix=f"hr:{prefix}:")
+    return FixedWindowCounter()
+
+
+def check_quota(counter: FixedWindowCounter, key, limit: int, window_seconds: int) -> Tuple[bool, int]:
+    """
+    Count one attempt for `key` and report whether it is within `limit`.
+
+    Returns
+    -------
+    Tuple[bool, int]
+        (allowed, retry_after_seconds)
+    """
+    count, reset_in = counter.hit(key, window_seconds)
+    return count <= limit, max(1, int(reset_in + 0.5))
+
+
+# Shared counter stores for per-user upload quotas and per-IP login throttling
+UPLOAD_COUNTER = make_counter("uploads")
+LOGIN_COUNTER = make_counter("logins")
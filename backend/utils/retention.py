@@ -0,0 +1,288 @@
+"""
+Data retention for conversations and their extracted files.
+
+Conversations older than RETENTION_DAYS are written, with their files, to
+gzip-compressed JSON Lines archives (one per month of the conversation,
+e.g. archive/conversations-2025-01.jsonl.gz) and then deleted in small
+transactions of RETENTION_BATCH_SIZE, so the write lock is only held for a
+few short DELETEs at a time. Each batch is fsync'ed to the archive before it
+is deleted; if the job dies in between, the next run archives those rows
+again, so readers should de-duplicate on the conversation id.
+
+Freed pages are returned to the filesystem with `PRAGMA incremental_vacuum`.
+New SQLite databases are created with auto_vacuum=INCREMENTAL; existing ones
+need a one-off `--enable-incremental-vacuum` (a full VACUUM) first.
+
+Usage (e.g. nightly from cron):
+    python -m backend.utils.retention --days 365
+    python -m backend.utils.retention --days 365 --dry-run
+"""
+import os
+import sys
+import gzip
+import json
+import logging
+import argparse
+import threading
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, fine for a single dev server
+    fcntl = None
+
+# Ensure project root is in sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from sqlalchemy import delete, event, func, select, update
+
+from backend import db
+from backend.configs.config import (
+    RETENTION_DAYS, RETENTION_ARCHIVE_DIR, RETENTION_BATCH_SIZE,
+    RETENTION_VACUUM_PAGES, RETENTION_INTERVAL_SECONDS
+)
+from backend.database.models import (
+    Conversations, Files, FileFingerprint, FileHash, FileSummary, FileTextStats, LshBucket
+)
+from backend.utils.metrics import ARCHIVED_ROWS
+
+logger = logging.getLogger(__name__)
+
+# sqlite "PRAGMA auto_vacuum" values
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+@contextmanager
+def job_lock(archive_dir: str):
+    """
+    Non-blocking, cross-process lock on the archive directory. Yields False
+    when another worker is already running the job.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    if fcntl is None:
+        yield True
+        return
+    fd = os.open(os.path.join(archive_dir, ".lock"), os.O_CREAT | os.O_RDWR, 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        yield True
+    finally:
+        os.close(fd)
+
+
+def archive_path(archive_dir: str, when: datetime) -> str:
+    return os.path.join(archive_dir, f"conversations-{when:%Y-%m}.jsonl.gz")
+
+
+def _jsonable(row) -> dict:
+    return {key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()}
+
+
+def write_archive(archive_dir: str, conversations, files):
+    """Append conversations (with their files nested) to their monthly archives and fsync them."""
+    files_by_conversation = {}
+    for file_row in files:
+        files_by_conversation.setdefault(file_row["conversation_id"], []).append(_jsonable(file_row))
+
+    by_path = {}
+    for row in conversations:
+        record = _jsonable(row)
+        record["files"] = files_by_conversation.get(row["id"], [])
+        by_path.setdefault(archive_path(archive_dir, row["time_of_message"]), []).append(record)
+
+    for path, records in by_path.items():
+        # Appending starts a new gzip member; gzip readers treat the file as one stream
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as archive:
+                for record in records:
+                    archive.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+
+
+def read_archive(path: str):
+    """Yield the records of one archive file."""
+    with gzip.open(path, "rt", encoding="utf-8") as archive:
+        for line in archive:
+            yield json.loads(line)
+
+
+def archive_old_conversations(cutoff: datetime, archive_dir: str, batch_size: int = RETENTION_BATCH_SIZE) -> dict:
+    """Archive and delete conversations older than `cutoff`, one short transaction per batch."""
+    conversations_table, files_table = Conversations.__table__, Files.__table__
+    counts = {"conversations": 0, "files": 0}
+    while True:
+        with db.engine.begin() as conn:
+            # Reads first (shared lock only); the write lock is taken by the first DELETE
+            rows = conn.execute(
+                select(conversations_table)
+                .where(conversations_table.c.time_of_message < cutoff)
+                .order_by(conversations_table.c.id)
+                .limit(batch_size)
+            ).mappings().all()
+            if not rows:
+                break
+            ids = [row["id"] for row in rows]
+            files = conn.execute(
+                select(files_table).where(files_table.c.conversation_id.in_(ids))
+            ).mappings().all()
+
+            write_archive(archive_dir, rows, files)
+            # Summaries and text stats are derived from the file text, so they are dropped rather than archived
+            file_ids = [file_row["id"] for file_row in files]
+            for derived in (FileSummary.__table__, FileTextStats.__table__, FileHash.__table__,
+                            FileFingerprint.__table__, LshBucket.__table__):
+                conn.execute(delete(derived).where(derived.c.file_id.in_(file_ids)))
+            # Later near-duplicates of a deleted document stay, unlinked
+            fingerprints = FileFingerprint.__table__
+            conn.execute(
+                update(fingerprints).where(fingerprints.c.duplicate_of.in_(file_ids))
+                .values(duplicate_of=None, similarity=None)
+            )
+            conn.execute(delete(files_table).where(files_table.c.conversation_id.in_(ids)))
+            conn.execute(delete(conversations_table).where(conversations_table.c.id.in_(ids)))
+
+        counts["conversations"] += len(rows)
+        counts["files"] += len(files)
+        ARCHIVED_ROWS.inc(len(rows), table="conversations")
+        ARCHIVED_ROWS.inc(len(files), table="files")
+        if len(rows) < batch_size:
+            break
+    return counts
+
+
+def count_old_conversations(cutoff: datetime) -> int:
+    return db.session.execute(
+        select(func.count()).select_from(Conversations).where(Conversations.time_of_message < cutoff)
+    ).scalar()
+
+
+def incremental_vacuum(pages_per_step: int = RETENTION_VACUUM_PAGES) -> int:
+    """Release free pages to the filesystem in small steps. Returns the number of pages freed."""
+    freed = 0
+    with db.engine.connect() as conn:
+        if conn.dialect.name != "sqlite":
+            return 0
+        if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() != AUTO_VACUUM_INCREMENTAL:
+            logger.info("auto_vacuum is not INCREMENTAL; run the retention job once with --enable-incremental-vacuum")
+            return 0
+        while True:
+            free_pages = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+            if not free_pages:
+                break
+            conn.exec_driver_sql(f"PRAGMA incremental_vacuum({int(pages_per_step)})")
+            conn.commit()
+            remaining = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+            if remaining >= free_pages:
+                break
+            freed += free_pages - remaining
+    return freed
+
+
+def enable_incremental_vacuum():
+    """One-off conversion of an existing SQLite database (rewrites the whole file)."""
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.dialect.name != "sqlite":
+            return
+        conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.exec_driver_sql("VACUUM")
+
+
+def run_retention(days: int = RETENTION_DAYS, archive_dir: str = RETENTION_ARCHIVE_DIR,
+                  batch_size: int = RETENTION_BATCH_SIZE, vacuum_pages: int = RETENTION_VACUUM_PAGES,
+                  now: datetime = None) -> dict:
+    """
+    Archive and delete everything older than `days`, then vacuum. Needs an app context.
+
+    Returns
+    -------
+    dict
+        Rows archived per table and pages vacuumed, or {"skipped": True}
+        when another process holds the job lock.
+    """
+    if days <= 0:
+        raise ValueError("[run_retention] days must be positive")
+    cutoff = (now or datetime.now()) - timedelta(days=days)
+
+    with job_lock(archive_dir) as acquired:
+        if not acquired:
+            logger.info("Retention job already running elsewhere, skipping")
+            return {"skipped": True}
+        counts = archive_old_conversations(cutoff, archive_dir, batch_size)
+        counts["vacuumed_pages"] = incremental_vacuum(vacuum_pages)
+    logger.info(
+        "Retention: archived %d conversations and %d files older than %s, vacuumed %d pages",
+        counts["conversations"], counts["files"], cutoff.date(), counts["vacuumed_pages"]
+    )
+    return counts
+
+
+def _use_incremental_auto_vacuum(dbapi_connection, connection_record):
+    # Only takes effect when the database file is created; a no-op on existing ones
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    cursor.close()
+
+
+def start_retention_worker(app, interval_seconds: int) -> threading.Event:
+    """Run the retention job every `interval_seconds` on a daemon thread. Set the returned event to stop."""
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval_seconds):
+            try:
+                with app.app_context():
+                    run_retention(app.config.get('RETENTION_DAYS', RETENTION_DAYS))
+            except Exception as e:
+                logger.warning("Retention job failed: %s", e)
+
+    threading.Thread(target=run, name="retention", daemon=True).start()
+    return stop
+
+
+def init_app(app):
+    """Create new SQLite databases with incremental auto-vacuum; optionally schedule the job in-process."""
+    with app.app_context():
+        if db.engine.dialect.name == "sqlite" and not event.contains(db.engine, "connect", _use_incremental_auto_vacuum):
+            event.listen(db.engine, "connect", _use_incremental_auto_vacuum)
+
+    days = app.config.get('RETENTION_DAYS', RETENTION_DAYS)
+    interval = app.config.get('RETENTION_INTERVAL_SECONDS', RETENTION_INTERVAL_SECONDS)
+    if days > 0 and interval > 0:
+        start_retention_worker(app, interval)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Archive and delete old conversations and files.")
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS or None, required=not RETENTION_DAYS,
+                        help="keep conversations newer than this (default: RETENTION_DAYS)")
+    parser.add_argument("--archive-dir", default=RETENTION_ARCHIVE_DIR)
+    parser.add_argument("--batch-size", type=int, default=RETENTION_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="convert an existing database to auto_vacuum=INCREMENTAL first (full VACUUM)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from backend import create_app
+    load_dotenv()
+    args = parse_args()
+
+    with create_app().app_context():
+        if args.dry_run:
+            cutoff = datetime.now() - timedelta(days=args.days)
+            print(f"{count_old_conversations(cutoff)} conversations older than {cutoff.date()} would be archived")
+        else:
+            if args.enable_incremental_vacuum:
+                print("Converting database to incremental auto-vacuum (full VACUUM)...")
+                enable_incremental_vacuum()
+            print(run_retention(args.days, args.archive_dir, args.batch_size))
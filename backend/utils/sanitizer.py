@@ -0,0 +1,77 @@
+"""
+Sanitation of free-text chat input (hints, questions).
+
+All patterns are compiled once, when a Sanitizer is built, and each input
+is only walked by C-level string operations: one regex scan for unsafe
+characters, one escape, and the repetition / encoded-payload checks, which
+are skipped below their length thresholds and stop at the first character
+that rules them out. (A single regex pass doing the escaping through a
+Python callback measured two to three times slower than this on CPython.)
+
+Rules are configurable per Sanitizer; `sanitizer` is the default one built
+from the config and used by helpers.sanitize_text().
+"""
+import re
+import html
+from dataclasses import dataclass
+
+from backend.configs.config import UNSAFE_UNICODE_PATTERN, SANITIZE_REPEAT_MAX_LENGTH, SANITIZE_ENCODED_MIN_LENGTH
+
+
+@dataclass(frozen=True)
+class SanitizeRules:
+    # Inputs containing a match are rejected (a pattern or its source string)
+    unsafe_pattern: re.Pattern = UNSAFE_UNICODE_PATTERN
+    # Escape &, <, >, " and ' (the API returns JSON, but answers end up in HTML)
+    escape_html: bool = True
+    # A single repeated character is rejected above this length (0 disables)
+    repeat_max_length: int = SANITIZE_REPEAT_MAX_LENGTH
+    # Base64-alphabet-only inputs are rejected from this length (0 disables)
+    encoded_min_length: int = SANITIZE_ENCODED_MIN_LENGTH
+
+
+class Sanitizer:
+    """Validate and escape one text field according to a SanitizeRules."""
+
+    def __init__(self, rules: SanitizeRules = None):
+        self.rules = rules or SanitizeRules()
+        # re.compile returns already compiled patterns unchanged
+        self._unsafe = re.compile(self.rules.unsafe_pattern)
+        self._encoded = re.compile(r"[A-Za-z0-9+/=]+")
+
+    def clean(self, value: str, field_name: str) -> str:
+        """
+        Return the stripped and escaped value.
+
+        Raises
+        ------
+        ValueError
+            When the value isn't a string, contains unsupported characters, or
+            looks like a repetitive or encoded payload.
+        """
+        if not isinstance(value, str):
+            raise ValueError(f"[validate_chat_request] Invalid type for {field_name}. Expected string.")
+
+        value = value.strip()
+
+        if self._unsafe.search(value):
+            raise ValueError(f"[validate_chat_request] {field_name} contains unsupported characters")
+
+        if self.rules.escape_html:
+            value = html.escape(value)
+
+        length = len(value)
+        # str.count runs in C; it replaces building a set of every character
+        if self.rules.repeat_max_length and length > self.rules.repeat_max_length \
+                and value.count(value[0]) == length:
+            raise ValueError(f"[validate_chat_request] {field_name} appears malicious (repetitive payload detected).")
+
+        # fullmatch gives up at the first character outside the alphabet (usually a space)
+        if self.rules.encoded_min_length and length >= self.rules.encoded_min_length \
+                and self._encoded.fullmatch(value):
+            raise ValueError(f"[validate_chat_request] {field_name} looks like a suspicious encoded payload.")
+
+        return value
+
+
+sanitizer = Sanitizer()
@@ -0,0 +1,64 @@
+"""
+SECRET_KEY management.
+
+Every worker (and every node) must sign sessions and login cookies with
+the same key, otherwise a request routed to another worker loses its login.
+"""
+import os
+import logging
+import secrets
+
+from backend.configs.config import APP_ENV, SECRET_KEY, SECRET_KEY_FILE, DEV_SECRET_KEY_FILE
+
+logger = logging.getLogger(__name__)
+
+
+def _read_key_file(path: str) -> str:
+    with open(path) as fh:
+        key = fh.read().strip()
+    if not key:
+        raise RuntimeError(f"[load_secret_key] Secret key file {path} is empty")
+    return key
+
+
+def _dev_key(path: str) -> str:
+    """Generate a key once and share it through a file so local workers agree on it."""
+    if os.path.exists(path):
+        return _read_key_file(path)
+    # Written to a temp file first and linked into place: link() fails if the file
+    # exists, so workers racing at boot never see a half-written key
+    tmp = f"{path}.{os.getpid()}.{secrets.token_hex(4)}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        with os.fdopen(fd, "w") as fh:
+            fh.write(secrets.token_hex(32))
+            fh.flush()
+            os.fsync(fh.fileno())
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            # Another worker created it first
+            return _read_key_file(path)
+    finally:
+        os.unlink(tmp)
+    logger.warning("Generated a development SECRET_KEY in %s; set SECRET_KEY or SECRET_KEY_FILE for production", path)
+    return _read_key_file(path)
+
+
+def load_secret_key() -> str:
+    """
+    Resolve the key in this order: SECRET_KEY, SECRET_KEY_FILE, then (outside
+    production only) a generated key persisted to DEV_SECRET_KEY_FILE.
+
+    Raises
+    ------
+    RuntimeError
+        In production when no key is configured, or when the key file is empty.
+    """
+    if SECRET_KEY:
+        return SECRET_KEY
+    if SECRET_KEY_FILE:
+        return _read_key_file(SECRET_KEY_FILE)
+    if APP_ENV == "production":
+        raise RuntimeError("[load_secret_key] SECRET_KEY or SECRET_KEY_FILE must be set when APP_ENV=production")
+    return _dev_key(DEV_SECRET_KEY_FILE)
@@ -0,0 +1,306 @@
+"""
+Local semantic index over each user's uploaded documents.
+
+Documents are split into overlapping chunks and embedded on CPU, either with
+a sentence-transformers model (SEMANTIC_MODEL, optional dependency) or with
+the built-in hashed-features embedder: word unigrams and bigrams, with common
+HR abbreviations expanded ("ML" -> "machine learning"), hashed into a
+fixed-size signed vector.
+
+Each user gets a directory under SEMANTIC_INDEX_DIR:
+
+    index.json   {"model": ..., "dim": ...} the index was built with
+    vectors.f32  contiguous float32 matrix, one L2-normalised row per chunk
+    chunks.i64   int64 rows of (file_id, start, end), the chunk's span in the file text
+
+Both data files are append-only, so indexing an upload only writes its own
+chunks (no rebuild), and they are read through np.memmap, so a search maps
+the matrix instead of loading it. Appends hold an flock on the directory;
+readers only use the rows present in both files, so a half-written append
+is never visible.
+"""
+import os
+import re
+import json
+import zlib
+import logging
+from functools import lru_cache
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are serialised by the single index worker only
+    fcntl = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from backend.configs.config import (
+    SEMANTIC_INDEX_DIR, SEMANTIC_MODEL, SEMANTIC_HASH_DIM,
+    SEMANTIC_CHUNK_CHARS, SEMANTIC_CHUNK_OVERLAP, SEMANTIC_TOP_K
+)
+from backend.utils.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Abbreviations expanded before hashing, so both spellings land on the same features
+SYNONYMS = {
+    "ml": "machine learning", "ai": "artificial intelligence", "dl": "deep learning",
+    "nlp": "natural language processing", "llm": "large language model",
+    "js": "javascript", "ts": "typescript", "py": "python", "k8s": "kubernetes",
+    "aws": "amazon web services", "gcp": "google cloud platform", "db": "database",
+    "dba": "database administrator", "qa": "quality assurance", "ux": "user experience",
+    "ui": "user interface", "pm": "project manager", "hr": "human resources",
+    "bi": "business intelligence", "devops": "development operations", "sre": "site reliability engineering",
+    "phd": "doctorate", "msc": "master of science", "bsc": "bachelor of science", "mba": "master of business administration",
+}
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or the to was were with".split()
+)
+WORD_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+# Row layout of chunks.i64
+META_COLUMNS = 3
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("[semantic_index] SEMANTIC_INDEX requires the 'numpy' package")
+
+
+class HashedEmbedder:
+    """Signed feature hashing of words and word pairs; no model download, deterministic across processes."""
+
+    def __init__(self, dim: int = SEMANTIC_HASH_DIM):
+        self.name = "hashed"
+        self.dim = dim
+
+    @staticmethod
+    def tokens(text: str) -> list:
+        words = []
+        for word in WORD_PATTERN.findall(text.lower()):
+            if word in STOPWORDS:
+                continue
+            words.extend(SYNONYMS.get(word, word).split())
+        return words
+
+    def embed(self, texts) -> "np.ndarray":
+        _require_numpy()
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = self.tokens(text)
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            if not features:
+                continue
+            hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint32, count=len(features))
+            signs = np.where(hashes & 0x80000000, 1.0, -1.0).astype(np.float32)
+            np.add.at(out[row], hashes % self.dim, signs)
+        return normalize(out)
+
+
+class SentenceTransformerEmbedder:
+    """Embeddings from a local sentence-transformers model (optional dependency)."""
+
+    def __init__(self, model_name: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                f"[semantic_index] SEMANTIC_MODEL={model_name} requires the 'sentence-transformers' package"
+            ) from e
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts) -> "np.ndarray":
+        vectors = self.model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True)
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+@lru_cache(maxsize=1)
+def get_embedder():
+    _require_numpy()
+    if SEMANTIC_MODEL == "hashed":
+        return HashedEmbedder(SEMANTIC_HASH_DIM)
+    return SentenceTransformerEmbedder(SEMANTIC_MODEL)
+
+
+def normalize(vectors: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def chunk_spans(text: str, size: int = SEMANTIC_CHUNK_CHARS, overlap: int = SEMANTIC_CHUNK_OVERLAP) -> list:
+    """(start, end) spans of about `size` chars overlapping by `overlap`, cut at whitespace where possible."""
+    spans = []
+    start, length = 0, len(text)
+    while start < length:
+        end = min(start + size, length)
+        if end < length:
+            cut = text.rfind(" ", start + size // 2, end)
+            end = cut if cut > start else end
+        if text[start:end].strip():
+            spans.append((start, end))
+        if end >= length:
+            break
+        start = max(end - overlap, start + 1)
+    return spans
+
+
+class UserIndex:
+    """The append-only vector index of one user's documents."""
+
+    def __init__(self, user_id: int, root: str = None, embedder=None):
+        self.path = os.path.join(root or SEMANTIC_INDEX_DIR, str(int(user_id)))
+        self.embedder = embedder or get_embedder()
+        self.dim = self.embedder.dim
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.path, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(self._file(".lock"), os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _check_header(self):
+        header = {"model": self.embedder.name, "dim": self.dim}
+        try:
+            with open(self._file("index.json")) as f:
+                existing = json.load(f)
+        except FileNotFoundError:
+            with open(self._file("index.json"), "w") as f:
+                json.dump(header, f)
+            return
+        if existing != header:
+            raise RuntimeError(
+                f"[UserIndex] {self.path} was built with {existing}, not {header}; delete it to rebuild"
+            )
+
+    def append(self, file_id: int, text: str) -> int:
+        """Embed and append the chunks of one document. Returns the number of chunks added."""
+        spans = chunk_spans(text)
+        if not spans:
+            return 0
+        with timed("embedding"):
+            vectors = self.embedder.embed([text[start:end] for start, end in spans])
+        meta = np.array([(file_id, start, end) for start, end in spans], dtype=np.int64)
+        with self._locked():
+            self._check_header()
+            self._truncate_to_complete_rows()
+            # Vectors first: readers take min(rows) of both files, so a crash leaves no half rows visible
+            with open(self._file("vectors.f32"), "ab") as f:
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            with open(self._file("chunks.i64"), "ab") as f:
+                f.write(meta.tobytes())
+        return len(spans)
+
+    def _rows(self) -> int:
+        """Complete rows present in both data files."""
+        try:
+            return min(
+                os.path.getsize(self._file("vectors.f32")) // (4 * self.dim),
+                os.path.getsize(self._file("chunks.i64")) // (8 * META_COLUMNS),
+            )
+        except FileNotFoundError:
+            return 0
+
+    def _truncate_to_complete_rows(self):
+        # Drop the tail of an append that died half way, so new rows stay aligned
+        rows = self._rows()
+        for name, row_bytes in (("vectors.f32", 4 * self.dim), ("chunks.i64", 8 * META_COLUMNS)):
+            path = self._file(name)
+            if os.path.exists(path) and os.path.getsize(path) != rows * row_bytes:
+                os.truncate(path, rows * row_bytes)
+
+    def load(self):
+        """(vectors, meta) as read-only memory maps, empty if nothing is indexed yet."""
+        _require_numpy()
+        empty = np.zeros((0, self.dim), dtype=np.float32), np.zeros((0, META_COLUMNS), dtype=np.int64)
+        rows = self._rows()
+        if rows == 0:
+            return empty
+        vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r", shape=(rows, self.dim))
+        meta = np.memmap(self._file("chunks.i64"), dtype=np.int64, mode="r", shape=(rows, META_COLUMNS))
+        return vectors, meta
+
+    def search(self, query_vector, k: int = SEMANTIC_TOP_K, file_id: int = None):
+        """Top-k chunks by cosine similarity as (score, file_id, start, end), optionally within one file."""
+        vectors, meta = self.load()
+        if file_id is not None:
+            rows = np.flatnonzero(meta[:, 0] == file_id)
+            vectors, meta = vectors[rows], meta[rows]
+        if len(meta) == 0:
+            return []
+        scores = vectors @ query_vector
+        top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), int(meta[i, 0]), int(meta[i, 1]), int(meta[i, 2])) for i in top]
+
+    def similar_files(self, file_id: int, k: int = SEMANTIC_TOP_K):
+        """Other documents closest to `file_id`, as (file_id, score), best first."""
+        vectors, meta = self.load()
+        own = meta[:, 0] == file_id
+        if not own.any():
+            return []
+        centroid = normalize(np.asarray(vectors[own]).mean(axis=0))
+        scores = vectors @ centroid
+        best = {}
+        for other_id, score in zip(meta[~own, 0].tolist(), scores[~own].tolist()):
+            if score > best.get(other_id, -2.0):
+                best[other_id] = score
+        return sorted(best.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+# A single worker keeps this process's appends in upload order
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="semantic-index")
+
+
+def index_file(user_id: int, file_id: int, text: str) -> int:
+    try:
+        added = UserIndex(user_id).append(file_id, text)
+        logger.debug("Indexed %d chunks of file %s for user %s", added, file_id, user_id)
+        return added
+    except Exception:
+        logger.exception("Indexing file %s failed", file_id)
+        return 0
+
+
+def enqueue_index(user_id: int, file_id: int, text: str):
+    """Append `file_id` to the user's index on the background worker."""
+    return _executor.submit(index_file, user_id, file_id, text)
+
+
+def similar_files(user_id: int, file_id: int, k: int = SEMANTIC_TOP_K):
+    return UserIndex(user_id).similar_files(file_id, k)
+
+
+def retrieve_context(user_id: int, file_id: int, question: str, text: str, k: int = SEMANTIC_TOP_K):
+    """
+    The `k` chunks of `text` most relevant to `question`, in document order,
+    or None when the file isn't indexed (the caller then sends the whole text).
+    """
+    index = UserIndex(user_id)
+    with timed("retrieval"):
+        hits = index.search(index.embedder.embed([question])[0], k, file_id=file_id)
+    if not hits:
+        return None
+    # Merge overlapping chunks back into continuous passages
+    passages = []
+    for _, _, start, end in sorted(hits, key=lambda hit: hit[2]):
+        if passages and start <= passages[-1][1]:
+            passages[-1][1] = max(passages[-1][1], end)
+        else:
+            passages.append([start, end])
+    return "\n[...]\n".join(text[start:end] for start, end in passages)
@@ -0,0 +1,197 @@
+"""
+Pluggable session storage.
+
+SESSION_BACKEND selects where session data lives:
+  - "filesystem": Flask-Session pickle files (the original behaviour)
+  - "sqlite":     one compact SQLite table in WAL mode, expired rows swept
+                  by a background thread
+  - "cookie":     Flask's signed cookie; no server-side storage, fine while
+                  the session only holds the login id and flash messages
+  - "redis":      Flask-Session on REDIS_URL, shared by every worker and node
+                  (needs the optional `redis` package)
+"""
+import os
+import time
+import sqlite3
+import secrets
+import logging
+import threading
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from backend.configs.config import SESSION_BACKEND, SESSION_SQLITE_PATH, SESSION_SWEEP_SECONDS, REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+SESSION_BACKENDS = ("filesystem", "sqlite", "cookie", "redis")
+
+# Expired rows are deleted in batches this size so the sweep never holds a long write lock
+SWEEP_BATCH_SIZE = 500
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session dict that records whether it was modified during the request."""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class SqliteSessionStore:
+    """Key/value store for sessions: one WITHOUT ROWID table, one connection per thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._serializer = TaggedJSONSerializer()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " expiry REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_expiry ON sessions (expiry)")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, sid: str):
+        row = self._connection().execute(
+            "SELECT data FROM sessions WHERE id = ? AND expiry > ?", (sid, time.time())
+        ).fetchone()
+        return self._serializer.loads(row[0]) if row else None
+
+    def set(self, sid: str, data: dict, ttl_seconds: float):
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (id, data, expiry) VALUES (?, ?, ?)",
+            (sid, self._serializer.dumps(dict(data)), time.time() + ttl_seconds),
+        )
+        conn.commit()
+
+    def delete(self, sid: str):
+        conn = self._connection()
+        conn.execute("DELETE FROM sessions WHERE id = ?", (sid,))
+        conn.commit()
+
+    def sweep(self) -> int:
+        """Delete expired sessions in small batches. Returns the number removed."""
+        conn = self._connection()
+        removed = 0
+        while True:
+            cursor = conn.execute(
+                "DELETE FROM sessions WHERE id IN "
+                "(SELECT id FROM sessions WHERE expiry <= ? LIMIT ?)",
+                (time.time(), SWEEP_BATCH_SIZE),
+            )
+            conn.commit()
+            removed += cursor.rowcount
+            if cursor.rowcount < SWEEP_BATCH_SIZE:
+                return removed
+
+
+class SqliteSessionInterface(SessionInterface):
+    """Server-side sessions keyed by a random id kept in the session cookie."""
+
+    def __init__(self, store: SqliteSessionStore):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.store.get(sid)
+            if data is not None:
+                return ServerSideSession(data, sid=sid)
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        # Only hit the store when something changed (or a permanent session needs refreshing)
+        if not (session.modified or self.should_set_cookie(app, session)):
+            return
+
+        self.store.set(session.sid, session, app.permanent_session_lifetime.total_seconds())
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def start_sweeper(store: SqliteSessionStore, interval_seconds: int) -> threading.Event:
+    """Run store.sweep() every `interval_seconds` on a daemon thread. Set the returned event to stop."""
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval_seconds):
+            try:
+                removed = store.sweep()
+                if removed:
+                    logger.info("Swept %d expired sessions", removed)
+            except sqlite3.Error as e:
+                logger.warning("Session sweep failed: %s", e)
+
+    threading.Thread(target=run, name="session-sweeper", daemon=True).start()
+    return stop
+
+
+def init_session(app):
+    """Install the session backend chosen by SESSION_BACKEND (config or app.config override)."""
+    backend = app.config.get('SESSION_BACKEND', SESSION_BACKEND)
+    if backend not in SESSION_BACKENDS:
+        raise ValueError(f"[init_session] Unknown SESSION_BACKEND '{backend}'. Use one of {SESSION_BACKENDS}.")
+
+    if backend == "filesystem":
+        from flask_session import Session
+        app.config['SESSION_TYPE'] = 'filesystem'
+        Session(app)
+    elif backend == "sqlite":
+        store = SqliteSessionStore(app.config.get('SESSION_SQLITE_PATH', SESSION_SQLITE_PATH))
+        app.session_interface = SqliteSessionInterface(store)
+        if SESSION_SWEEP_SECONDS > 0:
+            app.extensions['session_sweeper'] = start_sweeper(store, SESSION_SWEEP_SECONDS)
+    elif backend == "redis":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("[init_session] SESSION_BACKEND=redis requires the 'redis' package") from e
+        from flask_session import Session
+        app.config['SESSION_TYPE'] = 'redis'
+        app.config['SESSION_REDIS'] = redis.from_url(app.config.get('REDIS_URL', REDIS_URL))
+        Session(app)
+    # "cookie": keep Flask's default SecureCookieSessionInterface
+
+    logger.debug("Using %s session backend", backend)
@@ -0,0 +1,107 @@
+"""
+Precomputed document summaries.
+
+With PRECOMPUTE_SUMMARIES on, every upload gets a FileSummary row in state
+"pending" and a summary is generated on a small background pool
+(SUMMARY_WORKERS). "Summarize this candidate"-style requests are then
+answered straight from storage. With SUMMARY_AS_CONTEXT, broad questions
+and other questions about a summary ("Summarize their Python experience")
+are sent to the LLM with the summary instead of the full document; without
+it they get the full document like any other question.
+
+Summaries are best effort: while one is pending (or if generation failed,
+or the worker restarted) chat falls back to the full document.
+"""
+import re
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from backend import db
+from backend.configs.config import SUMMARY_WORKERS
+from backend.database.models import FileSummary
+from backend.utils.assistant import assistant
+from backend.utils.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_HINTS = (
+    "Write a concise candidate summary for a recruiter: current role, total years of experience, "
+    "key skills, notable employers and projects, education and languages. Use short bullet points."
+)
+SUMMARY_QUESTION = "Can you summarize this candidate"
+
+# Requests for a summary of the whole document, answered verbatim by the stored summary
+SUMMARY_QUESTION_PATTERN = re.compile(r"""
+    ^\s*(please\s+)?((can|could|would)\s+you\s+)?(please\s+)?
+    (
+        (summari[sz]e|recap)(\s+(this|the)\s+(cv|resume|candidate|document|profile|file))?
+      | (give|show|write)\s+(me\s+)?(an?\s+)?((quick|short|brief)\s+)?(summary|overview|recap)
+            (\s+of\s+(this|the)\s+(cv|resume|candidate|document|profile|file))?
+      | summary | overview | tl;?dr
+    )
+    (\s+please)?[\s?.!]*$
+""", re.IGNORECASE | re.VERBOSE)
+# Other questions about a summary ("Summarize their Python experience"), context with SUMMARY_AS_CONTEXT
+SUMMARY_MENTION_PATTERN = re.compile(
+    r"\b(summar(y|ise|ize|izing|ising)|overview|tl;?dr|recap)\b", re.IGNORECASE
+)
+# Broad questions the summary carries enough context for
+BROAD_QUESTION_PATTERN = re.compile(
+    r"\b(overall|in general|strengths?|weaknesses|(good|best|right) fit|suitab(le|ility)|"
+    r"profile|background|tell me about)\b", re.IGNORECASE
+)
+
+_executor = ThreadPoolExecutor(max_workers=SUMMARY_WORKERS, thread_name_prefix="summary")
+
+
+def is_summary_question(question: str) -> bool:
+    return bool(SUMMARY_QUESTION_PATTERN.match(question))
+
+
+def mentions_summary(question: str) -> bool:
+    return bool(SUMMARY_MENTION_PATTERN.search(question))
+
+
+def is_broad_question(question: str) -> bool:
+    return bool(BROAD_QUESTION_PATTERN.search(question))
+
+
+def generate_summary(file_id: int):
+    """Generate and store the summary of one file. Needs an app context."""
+    record = db.session.execute(
+        db.select(FileSummary).filter_by(file_id=file_id)
+    ).scalar_one_or_none()
+    if record is None or record.status == "ready":
+        return
+    try:
+        record.summary = assistant(SUMMARY_HINTS, SUMMARY_QUESTION, record.file.text_version_of_the_file)
+        record.status = "ready"
+    except Exception as e:
+        logger.warning("Summary generation failed for file %s: %s", file_id, e)
+        record.status = "failed"
+    record.updated_at = datetime.now()
+    db.session.commit()
+
+
+def enqueue_summary(app, file_id: int):
+    """Generate the summary of `file_id` on the background pool. The FileSummary row must be committed."""
+
+    def run():
+        with app.app_context():
+            try:
+                generate_summary(file_id)
+            except Exception:
+                db.session.rollback()
+                logger.exception("Summary job crashed for file %s", file_id)
+
+    return _executor.submit(run)
+
+
+def ready_summary(file_id: int):
+    """The stored summary of `file_id`, or None if it isn't available (yet)."""
+    summary = db.session.execute(
+        db.select(FileSummary.summary).filter_by(file_id=file_id, status="ready")
+    ).scalar_one_or_none()
+    record_cache("summary", summary is not None)
+    return summary
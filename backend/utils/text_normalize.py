@@ -0,0 +1,152 @@
+"""
+Normalization of extracted PDF text, run once at upload.
+
+Raw pypdf output carries layout noise that is paid for as prompt tokens on
+every question: running headers/footers repeated on each page, page
+numbers, words hyphenated across line breaks, runs of whitespace and
+duplicated boilerplate blocks. normalize_pages() removes them and reports
+how many characters and (estimated) tokens were saved.
+"""
+import re
+import logging
+import unicodedata
+from dataclasses import dataclass
+from collections import Counter as TallyCounter
+
+from backend.utils.metrics import REGISTRY, Counter
+
+logger = logging.getLogger(__name__)
+
+EXTRACTED_CHARS = REGISTRY.register(Counter(
+    "hr_extracted_chars_total", "Characters of extracted PDF text before and after normalization.", ("stage",)
+))
+
+# Lines within this many of a page's top/bottom are header/footer candidates
+EDGE_LINES = 3
+# A header/footer must repeat on at least this share of pages (and on 3 pages or more)
+REPEAT_SHARE = 0.5
+# Paragraphs shorter than this are never treated as duplicate boilerplate
+MIN_BOILERPLATE_CHARS = 40
+
+PAGE_NUMBER_LINE = re.compile(
+    r"^\s*(page\s*)?[-\u2013\u2014(\[]?\s*\d{1,3}\s*[-\u2013\u2014)\]]?\s*((/|of)\s*\d{1,3})?\s*$", re.IGNORECASE
+)
+HYPHENATED_BREAK = re.compile(r"([A-Za-z])-\n[ \t]*([a-z])")
+CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\u00ad\u200b-\u200d\ufeff]")
+SPACE_RUNS = re.compile(r"[ \t\u00a0\u2000-\u200a\u3000]+")
+BLANK_LINE_RUNS = re.compile(r"\n{3,}")
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+DIGITS = re.compile(r"\d+")
+
+
+@dataclass
+class NormalizedText:
+    text: str
+    raw_chars: int
+    raw_tokens: int
+    tokens: int
+
+    @property
+    def chars(self) -> int:
+        return len(self.text)
+
+    @property
+    def char_reduction(self) -> float:
+        return 1 - self.chars / self.raw_chars if self.raw_chars else 0.0
+
+    @property
+    def token_reduction(self) -> float:
+        return 1 - self.tokens / self.raw_tokens if self.raw_tokens else 0.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough BPE token count: words and punctuation marks (no tokenizer dependency)."""
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def _clean_line(line: str) -> str:
+    return SPACE_RUNS.sub(" ", CONTROL_CHARS.sub("", line)).strip()
+
+
+def _edges(lines) -> dict:
+    """
+    Map the indexes of the first and last EDGE_LINES non-empty lines of a page
+    to a key: the line's slot (from the top or bottom) and its text with digits
+    masked, so "Page 3 of 10" and "Page 4 of 10" in the same place match.
+    """
+    filled = [i for i, line in enumerate(lines) if line]
+    edges = {}
+    for slot, i in enumerate(reversed(filled[-EDGE_LINES:])):
+        edges[i] = ("bottom", slot, DIGITS.sub("#", lines[i].lower()))
+    for slot, i in enumerate(filled[:EDGE_LINES]):
+        edges[i] = ("top", slot, DIGITS.sub("#", lines[i].lower()))
+    return edges
+
+
+def strip_headers_and_footers(pages: list) -> list:
+    """
+    Drop page-number lines and lines repeated at the top/bottom of most pages.
+    The first copy of a repeated line is kept: a running header is often the candidate's name.
+    """
+    pages = [[_clean_line(line) for line in page.splitlines()] for page in pages]
+
+    repeated = set()
+    if len(pages) >= 3:
+        seen = TallyCounter()
+        for lines in pages:
+            seen.update(set(_edges(lines).values()))
+        needed = max(3, REPEAT_SHARE * len(pages))
+        repeated = {key for key, count in seen.items() if count >= needed}
+
+    result = []
+    kept_once = set()
+    for lines in pages:
+        edges = _edges(lines)
+        page = []
+        for i, line in enumerate(lines):
+            if i in edges:
+                if PAGE_NUMBER_LINE.match(line):
+                    continue
+                key = edges[i]
+                if key in repeated:
+                    if key in kept_once:
+                        continue
+                    kept_once.add(key)
+            page.append(line)
+        result.append("\n".join(page))
+    return result
+
+
+def dedupe_paragraphs(text: str) -> str:
+    """Remove repeated copies of long paragraphs (disclaimers, repeated contact blocks)."""
+    seen = set()
+    kept = []
+    for paragraph in text.split("\n\n"):
+        key = " ".join(paragraph.lower().split())
+        if len(key) >= MIN_BOILERPLATE_CHARS:
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(paragraph)
+    return "\n\n".join(kept)
+
+
+def normalize_pages(pages: list) -> NormalizedText:
+    """Normalize the per-page text of one document."""
+    raw = "".join(pages)
+    # NFKC folds ligatures ("ﬁ" -> "fi") and full-width characters
+    pages = [unicodedata.normalize("NFKC", page) for page in pages]
+    text = "\n\n".join(page for page in strip_headers_and_footers(pages) if page.strip())
+    text = HYPHENATED_BREAK.sub(r"\1\2", text)
+    text = BLANK_LINE_RUNS.sub("\n\n", text)
+    text = dedupe_paragraphs(text).strip()
+
+    result = NormalizedText(text=text, raw_chars=len(raw), raw_tokens=estimate_tokens(raw), tokens=estimate_tokens(text))
+    EXTRACTED_CHARS.inc(result.raw_chars, stage="raw")
+    EXTRACTED_CHARS.inc(result.chars, stage="normalized")
+    logger.info(
+        "Normalized text: %d -> %d chars (-%.1f%%), ~%d -> ~%d tokens (-%.1f%%)",
+        result.raw_chars, result.chars, result.char_reduction * 100,
+        result.raw_tokens, result.tokens, result.token_reduction * 100
+    )
+    return result
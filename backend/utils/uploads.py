@@ -0,0 +1,139 @@
+"""
+Streaming handling of multipart file uploads.
+
+Werkzeug's default stream factory keeps uploads under 500KB in memory and
+spools larger ones to a temporary file. Here every file part is written
+chunk by chunk straight to an anonymous temp file on disk, hashed
+incrementally, and capped at MAX_PDF_SIZE_MB while it streams: bytes past
+the limit are discarded instead of stored.
+
+Oversized requests are rejected even earlier, by RequestSizeGuard at the
+WSGI layer, from the Content-Length header alone.
+"""
+import json
+import hashlib
+import tempfile
+
+from flask import Request
+
+from backend.configs.config import MAX_PDF_SIZE_MB, MAX_REQUEST_OVERHEAD_KB, UPLOAD_TMP_DIR
+from backend.utils.metrics import REGISTRY, Counter
+
+# PDF files must carry this marker within their first 1024 bytes
+PDF_MAGIC = b"%PDF-"
+PDF_HEADER_WINDOW = 1024
+HASH_BLOCK = 1024 * 1024
+
+REJECTED_UPLOADS = REGISTRY.register(Counter(
+    "hr_rejected_uploads_total", "Uploads rejected before extraction, by reason.", ("reason",)
+))
+
+
+def max_request_bytes() -> int:
+    """Largest request body accepted: one maximum-size PDF plus multipart overhead."""
+    return MAX_PDF_SIZE_MB * 1024 * 1024 + MAX_REQUEST_OVERHEAD_KB * 1024
+
+
+def stream_sha256(stream) -> str:
+    """SHA-256 of a seekable stream's whole content; the stream is rewound afterwards."""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for block in iter(lambda: stream.read(HASH_BLOCK), b""):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+class HashingSpoolFile:
+    """
+    Write-through temp file that tracks size and SHA-256 of what was written.
+
+    Once more than `max_bytes` have been received the file is marked
+    `truncated` and further data is dropped, so memory and disk use are
+    bounded no matter what the client sends. The same happens as soon as
+    the first 1024 bytes show the content is not a PDF.
+    """
+
+    def __init__(self, max_bytes: int, dir: str = None):
+        self._file = tempfile.TemporaryFile(dir=dir)
+        self._hash = hashlib.sha256()
+        self._head = b""
+        self.max_bytes = max_bytes
+        self.size = 0           # bytes received, including discarded ones
+        self.truncated = False
+        self.not_pdf = False
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.truncated or self.not_pdf:
+            return len(data)
+        if self.size > self.max_bytes:
+            self.truncated = True
+            return len(data)
+
+        if len(self._head) < PDF_HEADER_WINDOW:
+            self._head += data[:PDF_HEADER_WINDOW - len(self._head)]
+            if len(self._head) >= PDF_HEADER_WINDOW and PDF_MAGIC not in self._head:
+                self.not_pdf = True
+                return len(data)
+
+        self._hash.update(data)
+        return self._file.write(data)
+
+    @property
+    def looks_like_pdf(self) -> bool:
+        """Header sniff; empty files are left for the parser to report."""
+        return not self.not_pdf and (self.size == 0 or PDF_MAGIC in self._head)
+
+    @property
+    def sha256(self) -> str:
+        """Hex digest of the stored content (meaningless when truncated)."""
+        return self._hash.hexdigest()
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def __getattr__(self, name):
+        # read/seek/tell/fileno/flush/close... go to the underlying temp file
+        return getattr(self._file, name)
+
+
+class UploadRequest(Request):
+    """Request class that streams uploaded files through HashingSpoolFile."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingSpoolFile(MAX_PDF_SIZE_MB * 1024 * 1024, dir=UPLOAD_TMP_DIR)
+
+
+class RequestSizeGuard:
+    """
+    WSGI middleware that rejects requests whose declared Content-Length is
+    over the limit before Flask (or Werkzeug's form parser) reads any of
+    the body. Requests without a length are still capped by MAX_CONTENT_LENGTH
+    while their body is read.
+    """
+
+    def __init__(self, wsgi_app, max_bytes: int):
+        self.wsgi_app = wsgi_app
+        self.max_bytes = max_bytes
+
+    def __call__(self, environ, start_response):
+        try:
+            declared = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            declared = 0
+
+        if declared > self.max_bytes:
+            REJECTED_UPLOADS.inc(reason="too_large")
+            body = json.dumps({
+                "status": "error",
+                "message": f"Request is too large (max {MAX_PDF_SIZE_MB}MB)"
+            }).encode()
+            start_response("413 Request Entity Too Large", [
+                ("Content-Type", "application/json"),
+                ("Content-Length", str(len(body))),
+                ("Connection", "close"),
+            ])
+            return [body]
+
+        return self.wsgi_app(environ, start_response)
@@ -0,0 +1,154 @@
+"""
+Cache for the identity Flask-Login loads on every authenticated request.
+
+Only plain identity fields are cached (never ORM instances, which are
+bound to a request's DB session). Entries expire after USER_CACHE_TTL_SECONDS
+and are dropped on logout or whenever a User row is updated or deleted.
+
+USER_CACHE_BACKEND chooses the store:
+  - "memory":     per-worker LRU dict (default)
+  - "filesystem": cachelib FileSystemCache in USER_CACHE_DIR, shared by the workers of one node
+  - "redis":      cachelib RedisCache on REDIS_URL, shared by every node
+  - "none":       no caching
+"""
+import time
+import threading
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+
+from backend.configs.config import (
+    USER_CACHE_BACKEND, USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_SIZE, USER_CACHE_DIR, REDIS_URL
+)
+from backend.utils.metrics import record_cache
+
+
+class CachedUser(UserMixin):
+    """Detached, read-only stand-in for User with just the identity fields."""
+
+    def __init__(self, id: int, username: str, email: str):
+        self.id = id
+        self.username = username
+        self.email = email
+
+    def __repr__(self):
+        return f"CachedUser('{self.username}', '{self.email}')"
+
+
+class LRUTTLCache:
+    """Thread-safe in-process cache bounded by size (LRU eviction) and age (TTL)."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class UserCache:
+    """Look users up by id through a cache, falling back to a loader on miss."""
+
+    def __init__(self, backend: str = USER_CACHE_BACKEND):
+        self.backend = backend
+        self._store = self._make_store(backend)
+
+    @staticmethod
+    def _make_store(backend):
+        if backend == "none":
+            return None
+        if backend == "memory":
+            return LRUTTLCache(USER_CACHE_MAX_SIZE, USER_CACHE_TTL_SECONDS)
+        if backend == "filesystem":
+            from cachelib import FileSystemCache
+            return FileSystemCache(USER_CACHE_DIR, threshold=USER_CACHE_MAX_SIZE, default_timeout=USER_CACHE_TTL_SECONDS)
+        if backend == "redis":
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("[UserCache] USER_CACHE_BACKEND=redis requires the 'redis' package") from e
+            from cachelib import RedisCache
+            return RedisCache(host=redis.from_url(REDIS_URL), key_prefix="hr:user:", default_timeout=USER_CACHE_TTL_SECONDS)
+        raise ValueError(f"[UserCache] Unknown USER_CACHE_BACKEND '{backend}'")
+
+    def load(self, user_id: int, loader):
+        """
+        Return the CachedUser for `user_id`, calling `loader(user_id)` (which
+        returns a User or None) on a cache miss.
+        """
+        if self._store is None:
+            return loader(user_id)
+
+        key = str(user_id)
+        fields = self._store.get(key)
+        record_cache("user", fields is not None)
+        if fields is not None:
+            return CachedUser(*fields)
+
+        user = loader(user_id)
+        if user is None:
+            return None
+        fields = (user.id, user.username, user.email)
+        self._store.set(key, fields)
+        return CachedUser(*fields)
+
+    def invalidate(self, user_id):
+        if self._store is not None:
+            self._store.delete(str(user_id))
+
+    def clear(self):
+        if self._store is not None:
+            self._store.clear()
+
+
+def get_user_cache():
+    """The current app's UserCache, or None outside an app context."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('user_cache')
+
+
+def _invalidate_user(mapper, connection, target):
+    cache = get_user_cache()
+    if cache is not None:
+        cache.invalidate(target.id)
+
+
+def init_app(app, user_model):
+    """Attach a UserCache to the app and drop entries whenever a User row changes or is deleted."""
+    from sqlalchemy import event
+
+    cache = UserCache(app.config.get('USER_CACHE_BACKEND', USER_CACHE_BACKEND))
+    app.extensions['user_cache'] = cache
+
+    if not event.contains(user_model, "after_update", _invalidate_user):
+        event.listen(user_model, "after_update", _invalidate_user)
+        event.listen(user_model, "after_delete", _invalidate_user)
+    return cache
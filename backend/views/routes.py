@@ -1,19 +1,25 @@
 
+# builtin modules
+import logging
 # third-party modules
 from flask import (
     Blueprint,
     render_template, request, redirect, 
     url_for, flash,
     )
-from flask_login import login_user, logout_user, login_required
-from werkzeug.security import generate_password_hash,check_password_hash
+from flask_login import login_user, logout_user, login_required, current_user
 
 # local modules
 from backend.database.models import User
 from backend import db
 from backend.utils.helpers import validate_registration_data
+from backend.utils.user_cache import get_user_cache
+from backend.utils.passwords import hash_password, verify_password, needs_rehash, PasswordHashingBusy
+from backend.utils.rate_limit import LOGIN_COUNTER, check_quota
+from backend.configs.config import LOGIN_ATTEMPTS_PER_IP, LOGIN_WINDOW_SECONDS
 
 routes_bp = Blueprint('routes', __name__)
+logger = logging.getLogger(__name__)
 
 @routes_bp.route('/')
 def home():
@@ -25,6 +31,12 @@ def login():
     if request.method == "GET":
         return render_template("login.html")
 
+    # Per-IP throttling before any DB lookup or hashing, so a brute-force burst costs almost nothing
+    allowed, retry_after = check_quota(LOGIN_COUNTER, request.remote_addr, LOGIN_ATTEMPTS_PER_IP, LOGIN_WINDOW_SECONDS)
+    if not allowed:
+        flash('Too many login attempts. Please try again later.', 'error')
+        return render_template("login.html"), 429, {"Retry-After": str(retry_after)}
+
     # Support JSON and form-data
     if request.is_json:
         data = request.get_json(silent=True)
@@ -43,8 +55,22 @@ def login():
 
     # Find user by email
     user = User.query.filter_by(email=email).first()
-    # Check if user exists and password is correct
-    if user and check_password_hash(user.password, password):
+    # Check if user exists and password is correct (hashing runs on the bounded pool)
+    try:
+        valid = user is not None and verify_password(user.password, password)
+    except PasswordHashingBusy:
+        flash('The server is busy. Please try again in a moment.', 'error')
+        return render_template("login.html"), 503
+
+    if valid:
+        # Transparently upgrade hashes made with older parameters
+        if needs_rehash(user.password):
+            try:
+                user.password = hash_password(password)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning("Could not rehash password for user %s: %s", user.id, e)
         login_user(user, remember=remember)
         flash('Login successful!', 'success')
         return redirect(url_for("chat.dashboard"))
@@ -95,7 +121,7 @@ def register():
         new_user = User(
             email=email,
             username=username,
-            password=generate_password_hash(password, method="pbkdf2:sha256")
+            password=hash_password(password)
         )
         db.session.add(new_user)
         db.session.commit()
@@ -112,5 +138,6 @@ def register():
 @routes_bp.route("/logout", methods=["POST"])
 @login_required
 def logout():
+    get_user_cache().invalidate(current_user.id)
     logout_user()
     return redirect(url_for("routes.login"))
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Gunicorn configuration for production:
+
+    APP_ENV=production SECRET_KEY_FILE=/run/secrets/hr_key SESSION_BACKEND=sqlite gunicorn app:app
+
+Chat requests spend most of their time waiting on the LLM, so workers use
+threads (gthread) to keep serving while a request is blocked upstream.
+"""
+import os
+import shutil
+import multiprocessing
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+
+# One process per core plus one, overridable with WEB_CONCURRENCY
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Longer than the slowest acceptable LLM call, so gunicorn doesn't kill a worker mid-answer
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically to cap memory growth from large PDF parses
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = 100
+
+# Not preloaded: create_app() starts background threads (log listener, session
+# sweeper) that would not survive the fork into workers
+preload_app = False
+
+# Trust X-Forwarded-Proto from the proxy in front so force_https sees https
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1")
+# Behind a reverse proxy, set TRUSTED_PROXY_HOPS (read by the workers' create_app) so the app
+# takes the client address from X-Forwarded-For. It is not defaulted: with gunicorn reachable
+# directly, any client could then choose its own address and slip past per-IP login throttling.
+
+# Workers merge their /metrics values through this directory (see backend/utils/metrics.py)
+os.environ.setdefault("METRICS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "metrics_data"))
+
+
+def on_starting(server):
+    # Counters restart from zero with the master: drop the previous run's worker snapshots
+    shutil.rmtree(os.environ["METRICS_DIR"], ignore_errors=True)
+
+
+accesslog = "-"
+errorlog = "-"
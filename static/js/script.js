@@ -85,17 +85,23 @@ async function uploadFile() {
 
         showLoading(true);
 
-        // Build form data for file upload
-        const formData = new FormData();
-        formData.append('files', files[0]);
-        formData.append('conversation_id', currentConversationId);
-
-        // POST to upload endpoint
-        const response = await fetch('/app/upload', {
-            method: 'POST',
-            body: formData,
-            credentials: 'include'
-        });
+        let response;
+        if (files[0].size >= CHUNKED_UPLOAD_MIN_BYTES) {
+            // Large files: resumable chunked upload
+            response = await uploadChunked(files[0]);
+        } else {
+            // Build form data for file upload
+            const formData = new FormData();
+            formData.append('files', files[0]);
+            formData.append('conversation_id', currentConversationId);
+
+            // POST to upload endpoint
+            response = await fetch('/app/upload', {
+                method: 'POST',
+                body: formData,
+                credentials: 'include'
+            });
+        }
 
         const data = await response.json();
         showLoading(false);
@@ -108,7 +114,10 @@ async function uploadFile() {
         }
         currentFileId = data.file_id;
         // Show success notification
-        const successMessage = `✅ File uploaded successfully! File ID: ${currentFileId}. You can now ask questions about this file.`;
+        let successMessage = `✅ File uploaded successfully! File ID: ${currentFileId}. You can now ask questions about this file.`;
+        if (data.duplicate_of) {
+            successMessage += ` It looks like another version of file ${data.duplicate_of} (${Math.round(data.similarity * 100)}% similar).`;
+        }
         showSuccess(successMessage);
 
         // Clear previous chat messages and reveal response area
@@ -128,6 +137,94 @@ async function uploadFile() {
     }
 }
 
+// Resumable chunked upload: open an upload, PUT the chunks in parallel (each with
+// its SHA-256, retried on failure), then complete it. The upload id is kept in
+// sessionStorage, so picking the same file again after a dropped connection only
+// sends the chunks the server doesn't have yet.
+const CHUNKED_UPLOAD_MIN_BYTES = 2 * 1024 * 1024;
+const UPLOAD_PARALLELISM = 4;
+const CHUNK_RETRIES = 3;
+
+async function sha256Hex(buffer) {
+    // crypto.subtle only exists on https (and localhost); the checksum is optional
+    if (!window.crypto || !window.crypto.subtle) return null;
+    const digest = await window.crypto.subtle.digest('SHA-256', buffer);
+    return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+}
+
+async function openChunkedUpload(file, resumeKey) {
+    const previousId = sessionStorage.getItem(resumeKey);
+    if (previousId) {
+        const status = await fetch(`/app/uploads/${previousId}`, { credentials: 'include' });
+        if (status.ok) return status.json();
+        sessionStorage.removeItem(resumeKey);
+    }
+    const response = await fetch('/app/uploads', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ conversation_id: currentConversationId, file_name: file.name, size: file.size }),
+        credentials: 'include'
+    });
+    const data = await response.json();
+    if (!response.ok) throw new Error(data.message || 'Could not start the upload.');
+    sessionStorage.setItem(resumeKey, data.upload_id);
+    return data;
+}
+
+async function putChunk(file, upload, index) {
+    const blob = file.slice(index * upload.chunk_size, (index + 1) * upload.chunk_size);
+    const buffer = await blob.arrayBuffer();
+    const checksum = await sha256Hex(buffer);
+    const headers = { 'Content-Type': 'application/octet-stream' };
+    if (checksum) headers['X-Chunk-SHA256'] = checksum;
+
+    for (let attempt = 1; ; attempt++) {
+        let response = null;
+        try {
+            response = await fetch(`/app/uploads/${upload.upload_id}/chunks/${index}`, {
+                method: 'PUT', headers, body: buffer, credentials: 'include'
+            });
+        } catch (error) {
+            // Network error: retried below
+        }
+        if (response && response.ok) return;
+        // Retry dropped connections, server errors, throttling and corrupted chunks (422);
+        // other client errors (not a PDF, wrong size, ...) won't get better
+        const retryable = !response || response.status >= 500 || response.status === 429 || response.status === 422;
+        if (!retryable || attempt >= CHUNK_RETRIES) {
+            const data = response ? await response.json().catch(() => ({})) : {};
+            throw new Error(data.message || `Chunk ${index} could not be uploaded.`);
+        }
+        await new Promise(resolve => setTimeout(resolve, 500 * 2 ** attempt));
+    }
+}
+
+async function uploadChunked(file) {
+    const resumeKey = `chunked-upload:${currentConversationId}:${file.name}:${file.size}:${file.lastModified}`;
+    const upload = await openChunkedUpload(file, resumeKey);
+    const received = new Set(upload.received);
+    const pending = [];
+    for (let index = 0; index < upload.chunks; index++) {
+        if (!received.has(index)) pending.push(index);
+    }
+
+    // A few workers pull chunk indexes from the shared queue
+    const worker = async () => {
+        while (pending.length > 0) {
+            await putChunk(file, upload, pending.shift());
+        }
+    };
+    await Promise.all(Array.from({ length: Math.min(UPLOAD_PARALLELISM, pending.length) }, worker));
+
+    const response = await fetch(`/app/uploads/${upload.upload_id}/complete`, {
+        method: 'POST',
+        credentials: 'include'
+    });
+    // Completed or failed, the server has discarded the upload; only an incomplete one can be resumed
+    if (response.status !== 409) sessionStorage.removeItem(resumeKey);
+    return response;
+}
+
 // askAssistant function
 async function askAssistant() {
     try {